@@ -0,0 +1,189 @@
+# api-negocio/app/cache_busca.py
+
+"""
+Cache de resultados da busca de produtos.
+
+A chave é (query normalizada, codfilial, ordenar_por, limit, versão do
+catálogo). A versão vem de `versoes_dados` — triggers em produtos,
+produto_itens e produto_precos incrementam 'catalogo' a cada carga do ETL, e
+unidade_aliases tem a sua — então um preço novo nunca é servido do cache: a
+chave simplesmente muda e as entradas antigas saem por LRU/TTL.
+
+Backends (BUSCA_CACHE_BACKEND):
+- "memoria": LRU por processo limitado em bytes (BUSCA_CACHE_MAX_BYTES);
+- "redis": compartilhado entre os workers do uvicorn (serviço `redis` do
+  docker-compose, profile "cache"); o limite de bytes é o maxmemory do Redis;
+- "desligado".
+Falhas do backend nunca derrubam a busca: ela segue sem cache.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+_ESPACOS = re.compile(r"\s+")
+_TABELAS_VERSIONADAS = ("catalogo", "unidade_aliases")
+
+
+def normalizar_query(query: str) -> str:
+    # Só minúsculas e espaços: a FTS não remove acentos da query, então "café" != "cafe"
+    return _ESPACOS.sub(" ", (query or "").lower()).strip()
+
+
+class BackendMemoria:
+    def __init__(self, max_bytes: int, ttl_segundos: float):
+        self.max_bytes = max_bytes
+        self.ttl_segundos = ttl_segundos
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()  # chave -> (gravado_em, valor)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            if time.monotonic() - item[0] >= self.ttl_segundos:
+                self._remover(chave)
+                return None
+            self._itens.move_to_end(chave)
+            return item[1]
+
+    def guardar(self, chave: str, valor: bytes):
+        if len(valor) > self.max_bytes:
+            return
+        with self._lock:
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (time.monotonic(), valor)
+            self._bytes += len(valor)
+            while self._bytes > self.max_bytes:
+                self._remover(next(iter(self._itens)))
+                self.evictions += 1
+
+    def _remover(self, chave: str):
+        _, valor = self._itens.pop(chave)
+        self._bytes -= len(valor)
+
+    def estatisticas(self) -> dict:
+        return {"itens": len(self._itens), "bytes": self._bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class BackendRedis:
+    def __init__(self, url: str, ttl_segundos: float):
+        import redis  # dependência só deste backend
+
+        self.ttl_segundos = ttl_segundos
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        return self._cliente.get(chave)
+
+    def guardar(self, chave: str, valor: bytes):
+        self._cliente.set(chave, valor, ex=max(1, int(self.ttl_segundos)))
+
+    def estatisticas(self) -> dict:
+        info = self._cliente.info("memory")
+        return {"bytes": info.get("used_memory"), "max_bytes": info.get("maxmemory")}
+
+
+def _criar_backend():
+    if settings.BUSCA_CACHE_BACKEND == "redis":
+        return BackendRedis(settings.BUSCA_CACHE_REDIS_URL, settings.BUSCA_CACHE_TTL_SEGUNDOS)
+    if settings.BUSCA_CACHE_BACKEND == "memoria":
+        return BackendMemoria(settings.BUSCA_CACHE_MAX_BYTES, settings.BUSCA_CACHE_TTL_SEGUNDOS)
+    return None
+
+
+def chave_versao(versoes: dict) -> Optional[str]:
+    """Ex.: 'catalogo:42,unidade_aliases:3'; None se faltar a versão de alguma tabela."""
+    # Sem uma das versões (ex.: migração 002 não aplicada), mudanças nela não mudariam a chave
+    if any(nome not in versoes for nome in _TABELAS_VERSIONADAS):
+        return None
+    return ",".join(f"{nome}:{versoes[nome]}" for nome in sorted(_TABELAS_VERSIONADAS))
+
+
+def versao_catalogo(db: Session) -> Optional[str]:
+    """Versão atual do catálogo; None se o banco não tiver versoes_dados completo."""
+    try:
+        rows = db.execute(
+            text("SELECT nome, versao FROM versoes_dados WHERE nome = ANY(:nomes)"),
+            {"nomes": list(_TABELAS_VERSIONADAS)},
+        ).fetchall()
+    except Exception:
+        db.rollback()
+        return None
+    return chave_versao({row.nome: row.versao for row in rows})
+
+
+def chave_busca(query: str, codfilial: int, ordenar_por: str, limit: int, versao: str) -> str:
+    partes = json.dumps([normalizar_query(query), codfilial, ordenar_por, limit, versao])
+    return "busca:" + hashlib.sha1(partes.encode("utf-8")).hexdigest()
+
+
+class CacheBusca:
+    def __init__(self, backend):
+        self.backend = backend
+        self.acertos = 0
+        self.faltas = 0
+        self.sem_versao = 0  # buscas feitas sem cache por falta de versoes_dados
+        self.erros_backend = 0
+
+    def obter_ou_buscar(self, db: Session, query: str, codfilial: int, ordenar_por: str, limit: int,
+                        buscar: Callable[[], dict]) -> dict:
+        if self.backend is None:
+            return buscar()
+        versao = versao_catalogo(db)
+        if versao is None:
+            self.sem_versao += 1
+            return buscar()
+
+        chave = chave_busca(query, codfilial, ordenar_por, limit, versao)
+        try:
+            valor = self.backend.obter(chave)
+        except Exception as e:
+            self.erros_backend += 1
+            print(f"Cache de busca indisponível ({e}); buscando no banco.")
+            return buscar()
+        if valor is not None:
+            self.acertos += 1
+            return json.loads(valor)
+
+        self.faltas += 1
+        resultado = buscar()
+        try:
+            self.backend.guardar(chave, json.dumps(resultado, default=str, separators=(",", ":")).encode("utf-8"))
+        except Exception as e:
+            self.erros_backend += 1
+            print(f"Não foi possível gravar no cache de busca: {e}")
+        return resultado
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.faltas
+        estatisticas = {
+            "backend": settings.BUSCA_CACHE_BACKEND,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            "sem_versao": self.sem_versao,
+            "erros_backend": self.erros_backend,
+        }
+        if self.backend is not None:
+            try:
+                estatisticas.update(self.backend.estatisticas())
+            except Exception as e:
+                estatisticas["erro"] = str(e)
+        return estatisticas
+
+
+cache_busca = CacheBusca(_criar_backend())
@@ -0,0 +1,83 @@
+# api-negocio/app/cache_carrinho.py
+
+"""
+Cache curto do carrinho por sessão.
+
+O gav-autonomo lê o carrinho várias vezes na mesma conversa (ver carrinho,
+apresentação, confirmação); entre uma escrita e outra o conteúdo não muda.
+Cada leitura fica guardada por CARRINHO_CACHE_TTL_SEGUNDOS e a escrita de
+item invalida a sessão.
+
+Cada leitura em andamento tem um marcador por sessão e a invalidação o
+descarta: uma leitura que começou antes da escrita não grava o resultado
+antigo depois dela. O cache é por processo: com vários workers, outro
+worker pode servir o carrinho anterior por até um TTL.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from .config import settings
+
+
+class CacheCarrinho:
+    def __init__(self, ttl_segundos: float, max_itens: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()  # sessao_id -> (gravado_em, carrinho)
+        self._leituras: dict[str, object] = {}  # sessao_id -> marcador da leitura em andamento
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.invalidacoes = 0
+
+    def obter_ou_buscar(self, sessao_id: str, buscar: Callable[[], dict]) -> dict:
+        if self.ttl_segundos <= 0:
+            return buscar()
+        with self._lock:
+            item = self._itens.get(sessao_id)
+            if item is not None and time.monotonic() - item[0] < self.ttl_segundos:
+                self._itens.move_to_end(sessao_id)
+                self.acertos += 1
+                return copy.deepcopy(item[1])
+            marcador = self._leituras[sessao_id] = object()
+            self.faltas += 1
+
+        try:
+            carrinho = buscar()
+        except Exception:
+            with self._lock:
+                if self._leituras.get(sessao_id) is marcador:
+                    del self._leituras[sessao_id]
+            raise
+        with self._lock:
+            if self._leituras.get(sessao_id) is marcador:
+                del self._leituras[sessao_id]
+                self._itens[sessao_id] = (time.monotonic(), copy.deepcopy(carrinho))
+                self._itens.move_to_end(sessao_id)
+                while len(self._itens) > self.max_itens:
+                    self._itens.popitem(last=False)
+        return carrinho
+
+    def invalidar(self, sessao_id: str):
+        with self._lock:
+            self._itens.pop(sessao_id, None)
+            self._leituras.pop(sessao_id, None)
+            self.invalidacoes += 1
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.faltas
+        return {
+            "ttl_segundos": self.ttl_segundos,
+            "itens": len(self._itens),
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            "invalidacoes": self.invalidacoes,
+        }
+
+
+cache_carrinho = CacheCarrinho(settings.CARRINHO_CACHE_TTL_SEGUNDOS, settings.CARRINHO_CACHE_MAX_ITENS)
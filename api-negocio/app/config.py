@@ -13,10 +13,38 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int
     POSTGRES_DB: str
 
+    # Segundos entre consultas à versão de unidade_aliases (recompila o extrator se mudou)
+    ALIASES_INTERVALO_VERIFICACAO: float = 5.0
+
+    # Cache de resultados da busca (app/cache_busca.py): memoria | redis | desligado
+    BUSCA_CACHE_BACKEND: str = "memoria"
+    BUSCA_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    BUSCA_CACHE_TTL_SEGUNDOS: float = 3600.0
+    BUSCA_CACHE_REDIS_URL: str = "redis://redis:6379/0"
+
+    # Cache curto do carrinho por sessão (app/cache_carrinho.py); 0 desliga
+    CARRINHO_CACHE_TTL_SEGUNDOS: float = 5.0
+    CARRINHO_CACHE_MAX_ITENS: int = 10_000
+
+    # Pool de conexões (vale para o engine síncrono e para o assíncrono, cada um com o seu)
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SEGUNDOS: float = 10.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SEGUNDOS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 5000  # 0 = sem limite
+
+    # Endpoints quentes (busca, carrinho, contexto, prompts) em async def sobre asyncpg
+    DB_ASYNC_ATIVO: bool = False
+
     # Gera a URL de conexão do banco de dados automaticamente
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def DATABASE_URL_ASYNC(self) -> str:
+        return self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 # Cria uma instância única das configurações para ser usada em toda a aplicação
 settings = Settings()
\ No newline at end of file
@@ -4,7 +4,9 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from . import esquemas
-import re      # ✅ ADICIONAR ESTA LINHA
+from .extrator_atributos import registro_extrator
+from .cache_busca import cache_busca
+from .cache_carrinho import cache_carrinho
 import json    # ✅ ADICIONAR ESTA LINHA (usada em criar_log_interacao)
 
 # ---------------------------------------------
@@ -72,53 +74,26 @@ def get_all_unidade_aliases(db: Session) -> List[Dict[str, Any]]:
     ).mappings().all()
     return [dict(r) for r in rows]
 
-# Dicionário em memória para "cachear" os aliases de unidade e evitar buscas repetidas no banco
-_aliases_de_unidade_cache = None
-
-def _get_aliases_de_unidade(db: Session) -> dict:
-    """Busca os aliases da tabela e os armazena em cache na memória."""
-    global _aliases_de_unidade_cache
-    if _aliases_de_unidade_cache is None:
-        print("Buscando e cacheando aliases de unidade do banco de dados...")
-        stmt = text("SELECT alias, unidade_principal FROM unidade_aliases WHERE ativo = TRUE")
-        resultados = db.execute(stmt).fetchall()
-        _aliases_de_unidade_cache = {row.alias: row.unidade_principal for row in resultados}
-    return _aliases_de_unidade_cache
-
-
 def _extrair_atributos_da_query(db: Session, query: str) -> (str, dict):
     """
-    Usa regex e a tabela de aliases para extrair atributos da query.
+    Extrai unidades (via aliases) e volume da query numa única passada,
+    com o matcher compilado para a versão atual de unidade_aliases.
     """
-    filtros = {}
-    query_limpa = query.lower() # Normaliza para minúsculas
-    
-    # 1. Extrai aliases de unidade (ex: caixa, lata, pack)
-    aliases_map = _get_aliases_de_unidade(db)
-    unidades_encontradas = set()
-    for alias, unidade_principal in aliases_map.items():
-        # \b -> word boundary, para não pegar 'caixao' quando busca por 'caixa'
-        padrao_alias = re.compile(r'\b' + re.escape(alias) + r's?\b', re.IGNORECASE)
-        if padrao_alias.search(query_limpa):
-            unidades_encontradas.add(unidade_principal)
-            query_limpa = padrao_alias.sub('', query_limpa)
-
-    if unidades_encontradas:
-        filtros['unidades'] = list(unidades_encontradas)
-
-    # 2. Extrai volumes (ex: 500ml)
-    padrao_volume = re.compile(r'(\d+)\s?(ml|l|g|kg)\b', re.IGNORECASE)
-    match = padrao_volume.search(query_limpa)
-    if match:
-        valor = match.group(1)
-        unidade_vol = match.group(2).lower()
-        filtros['volume'] = f"%{valor}{unidade_vol}%"
-        query_limpa = padrao_volume.sub('', query_limpa)
-
-    return query_limpa.strip(), filtros
+    return registro_extrator.obter(db).extrair(query)
 
 
 def buscar_produtos(db: Session, query: str, codfilial: int, ordenar_por: str = "relevancia", limit: int = 10):
+    """
+    Busca de produtos com cache por (query normalizada, codfilial, ordenar_por,
+    limit, versão do catálogo). Ver app/cache_busca.py.
+    """
+    return cache_busca.obter_ou_buscar(
+        db, query, codfilial, ordenar_por, limit,
+        lambda: _buscar_produtos_no_banco(db, query, codfilial, ordenar_por, limit),
+    )
+
+
+def _buscar_produtos_no_banco(db: Session, query: str, codfilial: int, ordenar_por: str = "relevancia", limit: int = 10):
     """
     Executa a busca em até duas etapas e retorna os resultados junto com um status da busca.
     """
@@ -150,13 +125,17 @@ def buscar_produtos(db: Session, query: str, codfilial: int, ordenar_por: str =
 
 
 def _executar_busca(db: Session, query_para_fts: str, filtros: dict, codfilial: int, ordenar_por: str, limit: int, estrita: bool, usar_trigrama: bool = False):
-    """Função auxiliar que executa a lógica de busca no banco de dados."""
+    """
+    Função auxiliar que executa a lógica de busca no banco de dados.
+    Produtos, itens e preços vêm numa única consulta: os itens de cada produto
+    são agregados com LATERAL + json_agg (antes era uma consulta por produto).
+    """
     query_fts_formatada = " & ".join(query_para_fts.split()) if query_para_fts else None
 
     params = {'limit': limit, 'codfilial': codfilial}
     where_clauses = []
     join_clauses = ["LEFT JOIN produto_itens pi ON p.id = pi.produto_id"]
-    order_by_clause = ""
+    order_by_expr = ""
     group_by_clause = "GROUP BY p.id"
 
     # ... (toda a lógica de montagem de join, select, order by, etc. que já tínhamos) ...
@@ -170,13 +149,14 @@ def _executar_busca(db: Session, query_para_fts: str, filtros: dict, codfilial:
         # Adiciona a condição de similaridade e ordena por ela
         where_clauses.append("similarity(public.unaccent_immutable(p.descricao), :query_trg) > 0.2")
         params['query_trg'] = query_para_fts # Usa a query original
-        order_by_clause = f"ORDER BY similarity({campo_busca_trigrama}, :query_trg) DESC"
+        order_by_expr = f"similarity({campo_busca_trigrama}, :query_trg) DESC"
     elif query_fts_formatada:
-        select_clause = "p.*, MAX(ts_rank(produtos_fts_document(p.descricaoweb, p.descricao, p.marca, p.categoria, p.departamento), to_tsquery('portuguese', :query_fts))) as rank"
+        rank_expr = "MAX(ts_rank(produtos_fts_document(p.descricaoweb, p.descricao, p.marca, p.categoria, p.departamento), to_tsquery('portuguese', :query_fts)))"
+        select_clause = f"p.*, {rank_expr} as rank"
         where_clauses.append("produtos_fts_document(p.descricaoweb, p.descricao, p.marca, p.categoria, p.departamento) @@ to_tsquery('portuguese', :query_fts)")
         params['query_fts'] = query_fts_formatada
-        if not order_by_clause:
-            order_by_clause = "ORDER BY rank DESC"
+        if not order_by_expr:
+            order_by_expr = f"{rank_expr} DESC"
     else: select_clause = "p.*"
     
     if 'volume' in filtros:
@@ -186,45 +166,43 @@ def _executar_busca(db: Session, query_para_fts: str, filtros: dict, codfilial:
         where_clauses.append("pi.unidade = ANY(:unidades)")
         params['unidades'] = filtros['unidades']
 
-    if not order_by_clause:
-        order_by_clause = "ORDER BY p.id"
+    # Desempate por id: a numeração (_ordem) e o LIMIT precisam da mesma ordem
+    order_by_expr = f"{order_by_expr}, p.id" if order_by_expr else "p.id"
 
     if not where_clauses: return []
 
+    # Na busca estrita, só os itens da unidade pedida; no fallback, todas as opções
+    item_where_clause = "AND pi.unidade = ANY(:unidades)" if estrita and 'unidades' in filtros else ""
+
     sql = f"""
-        SELECT {select_clause} FROM produtos p {" ".join(join_clauses)}
-        WHERE {" AND ".join(where_clauses)} {group_by_clause} {order_by_clause} LIMIT :limit
+        WITH base AS (
+            SELECT {select_clause}, ROW_NUMBER() OVER (ORDER BY {order_by_expr}) AS _ordem
+            FROM produtos p {" ".join(join_clauses)}
+            WHERE {" AND ".join(where_clauses)} {group_by_clause}
+            ORDER BY {order_by_expr} LIMIT :limit
+        )
+        SELECT base.*, itens.itens
+        FROM base
+        CROSS JOIN LATERAL (
+            SELECT json_agg(json_build_object(
+                       'id', pi.id, 'unidade', pi.unidade, 'qtunit', pi.qtunit,
+                       'pvenda', pp.pvenda, 'poferta', pp.poferta
+                   ) ORDER BY pi.id) AS itens
+            FROM produto_itens pi LEFT JOIN produto_precos pp ON pi.id = pp.item_id AND pp.codfilial = :codfilial
+            WHERE pi.produto_id = base.id {item_where_clause}
+        ) itens
+        WHERE itens.itens IS NOT NULL
+        ORDER BY base._ordem
     """
     
     resultados = db.execute(text(sql), params).fetchall()
     
+    # Produtos sem itens (após o filtro de unidade) já ficam de fora no SQL
     produtos_encontrados = []
     for row in resultados:
         produto_dict = dict(row._mapping)
-        item_params = {"pid": produto_dict['id'], "codfilial": codfilial}
-        item_where_clauses = ["pi.produto_id = :pid"]
-        
-        if estrita and 'unidades' in filtros:
-            item_where_clauses.append("pi.unidade = ANY(:unidades)")
-            item_params['unidades'] = filtros['unidades']
-
-        # Se a busca original (estrita) tinha um filtro de unidade, agora na exibição nós o ignoramos
-        # para mostrar todas as opções disponíveis no fallback.
-        # if 'unidades' in filtros:
-        #     item_where_clauses.append("pi.unidade = ANY(:unidades)")
-        #     item_params['unidades'] = filtros['unidades']
-
-        stmt_itens_sql = f"""
-            SELECT pi.id, pi.unidade, pi.qtunit, pp.pvenda, pp.poferta
-            FROM produto_itens pi LEFT JOIN produto_precos pp ON pi.id = pp.item_id AND pp.codfilial = :codfilial
-            WHERE {" AND ".join(item_where_clauses)} ORDER BY pi.id
-        """
-        
-        itens_result = db.execute(text(stmt_itens_sql), item_params).fetchall()
-        produto_dict['itens'] = [dict(item_row._mapping) for item_row in itens_result]
-        
-        if produto_dict['itens']:
-            produtos_encontrados.append(produto_dict)
+        del produto_dict['_ordem']
+        produtos_encontrados.append(produto_dict)
             
     return produtos_encontrados
 
@@ -315,36 +293,43 @@ def adicionar_item_ao_carrinho(db: Session, carrinho_id: int, item_data: esquema
     db.commit()
 
 
-def get_carrinho_detalhado(db: Session, carrinho_id: int):
+def get_carrinho_por_sessao(db: Session, sessao_id: str) -> dict:
     """
-    Busca um carrinho e todos os seus itens com detalhes dos produtos.
+    Carrinho aberto da sessão com itens e valor total, sem escrever nada.
+    Sessão sem carrinho recebe um carrinho virtual vazio (id None). Leituras
+    passam pelo cache curto de app/cache_carrinho.py.
     """
-    # Buscamos o carrinho principal
-    carrinho = db.execute(text("SELECT * FROM carrinhos WHERE id = :id"), {"id": carrinho_id}).first()
-    if not carrinho:
-        return None
+    return cache_carrinho.obter_ou_buscar(sessao_id, lambda: _buscar_carrinho_no_banco(db, sessao_id))
 
-    # Buscamos os itens, juntando com as tabelas de produto para obter a descrição
-    stmt_itens = text("""
-        SELECT 
-            ci.item_id,
-            ci.quantidade,
-            ci.preco_unitario_registrado,
-            (ci.quantidade * ci.preco_unitario_registrado) as subtotal,
-            p.descricao as descricao_produto
-        FROM carrinho_itens ci
-        JOIN produto_itens pi ON ci.item_id = pi.id
-        JOIN produtos p ON pi.produto_id = p.id
-        WHERE ci.carrinho_id = :carrinho_id;
+
+def _buscar_carrinho_no_banco(db: Session, sessao_id: str) -> dict:
+    # Uma consulta: o carrinho e, via LATERAL, os itens (json_agg) e o total
+    stmt = text("""
+        SELECT c.id, c.sessao_id, c.status,
+               COALESCE(itens.itens, '[]'::json) AS itens,
+               COALESCE(itens.valor_total, 0) AS valor_total
+        FROM carrinhos c
+        LEFT JOIN LATERAL (
+            SELECT
+                json_agg(json_build_object(
+                    'item_id', ci.item_id,
+                    'quantidade', ci.quantidade,
+                    'preco_unitario_registrado', ci.preco_unitario_registrado,
+                    'subtotal', ci.quantidade * ci.preco_unitario_registrado,
+                    'descricao_produto', p.descricao
+                ) ORDER BY ci.id) AS itens,
+                SUM(ci.quantidade * ci.preco_unitario_registrado) AS valor_total
+            FROM carrinho_itens ci
+            JOIN produto_itens pi ON ci.item_id = pi.id
+            JOIN produtos p ON pi.produto_id = p.id
+            WHERE ci.carrinho_id = c.id
+        ) itens ON TRUE
+        WHERE c.sessao_id = :sessao_id AND c.status = 'aberto';
     """)
-    itens = db.execute(stmt_itens, {"carrinho_id": carrinho_id}).fetchall()
-    
-    # Monta o objeto final
-    carrinho_dict = dict(carrinho._mapping)
-    carrinho_dict['itens'] = [dict(item._mapping) for item in itens]
-    carrinho_dict['valor_total'] = sum(item['subtotal'] for item in carrinho_dict['itens'])
-    
-    return carrinho_dict
+    carrinho = db.execute(stmt, {"sessao_id": sessao_id}).mappings().first()
+    if not carrinho:
+        return {"id": None, "sessao_id": sessao_id, "status": "aberto", "itens": [], "valor_total": 0}
+    return dict(carrinho)
 
 def get_prompt_ativo_por_nome(db: Session, nome: str) -> str:
     """Busca o template de um prompt ativo pelo seu nome único."""
@@ -424,6 +409,8 @@ def create_prompt_exemplo(db: Session, prompt_id: int, exemplo: esquemas.PromptE
         RETURNING *;
     """)
     result = db.execute(stmt, {"prompt_id": prompt_id, **exemplo.model_dump()})
+    # Toca o prompt para que os caches do orquestrador (versionados por atualizado_em) recarreguem os exemplos
+    db.execute(text("UPDATE prompt_templates SET atualizado_em = NOW() WHERE id = :prompt_id"), {"prompt_id": prompt_id})
     db.commit()
     return result.first()._mapping
 
@@ -484,7 +471,11 @@ def buscar_contexto_sessao(db: Session, sessao_id: str) -> Optional[Dict]:
     
     return {
         "tipo_contexto": result.tipo_contexto,
-        "contexto_estruturado": json.loads(result.contexto_estruturado),
+        # JSONB já chega como dict (psycopg2 e asyncpg); str se a coluna for TEXT
+        "contexto_estruturado": (
+            json.loads(result.contexto_estruturado)
+            if isinstance(result.contexto_estruturado, str) else result.contexto_estruturado
+        ),
         "mensagem_original": result.mensagem_original,
         "resposta_apresentada": result.resposta_apresentada,
         "criado_em": result.criado_em
@@ -1,15 +1,117 @@
 # api-negocio/app/database.py
 
-from sqlalchemy import create_engine, text
+import statistics
+import time
+from collections import deque
+
+from sqlalchemy import create_engine, exc, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
 
+
+class MetricasPool:
+    """Espera por conexão (checkout) e ocupação de um pool."""
+
+    def __init__(self, max_amostras: int = 2000):
+        self._esperas = deque(maxlen=max_amostras)  # segundos, últimas N
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def registrar(self, espera: float):
+        self.checkouts += 1
+        self._esperas.append(espera)
+
+    def estatisticas(self, pool) -> dict:
+        capacidade = pool.size() + settings.DB_POOL_MAX_OVERFLOW
+        esperas = sorted(self._esperas)
+        estatisticas = {
+            "tamanho": pool.size(),
+            "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+            "em_uso": pool.checkedout(),
+            "ociosas": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "saturacao": round(pool.checkedout() / capacidade, 4) if capacidade else 0.0,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+        }
+        if esperas:
+            estatisticas["espera_ms"] = {
+                "p50": round(statistics.median(esperas) * 1000, 3),
+                "p99": round(esperas[min(len(esperas) - 1, int(len(esperas) * 0.99))] * 1000, 3),
+                "max": round(esperas[-1] * 1000, 3),
+            }
+        return estatisticas
+
+
+class _CheckoutMedido:
+    """Mede o tempo até o pool entregar uma conexão (fila + conexão nova, se houver)."""
+
+    metricas: MetricasPool
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            self.metricas.timeouts += 1
+            raise
+        self.metricas.registrar(time.perf_counter() - inicio)
+        return conexao
+
+
+# As métricas ficam na classe: o SQLAlchemy recria o pool (recreate) após falhas de conexão
+class PoolMedido(_CheckoutMedido, QueuePool):
+    metricas = MetricasPool()
+
+
+class PoolAsyncMedido(_CheckoutMedido, AsyncAdaptedQueuePool):
+    metricas = MetricasPool()
+
+
+def _opcoes_pool() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SEGUNDOS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SEGUNDOS,
+    }
+
+
 # Cria o "motor" de conexão com o banco de dados usando a URL do nosso config
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=PoolMedido,
+    connect_args={"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"},
+    **_opcoes_pool(),
+)
 
 # Cria uma fábrica de sessões que usaremos para interagir com o banco
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono (asyncpg), só com DB_ASYNC_ATIVO: asyncpg é importado ao criar o engine
+engine_async = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ATIVO:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine_async = create_async_engine(
+        settings.DATABASE_URL_ASYNC,
+        poolclass=PoolAsyncMedido,
+        connect_args={"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}},
+        **_opcoes_pool(),
+    )
+    AsyncSessionLocal = async_sessionmaker(engine_async, autoflush=False, expire_on_commit=False)
+
+
+def estatisticas_pool() -> dict:
+    estatisticas = {"sync": PoolMedido.metricas.estatisticas(engine.pool)}
+    if engine_async is not None:
+        estatisticas["async"] = PoolAsyncMedido.metricas.estatisticas(engine_async.sync_engine.pool)
+    return estatisticas
+
+
 # Função para testar a conexão
 def testar_conexao():
     try:
@@ -19,4 +121,4 @@ def testar_conexao():
         return "connected"
     except Exception as e:
         print(f"Erro ao conectar ao banco de dados: {e}")
-        return "connection_failed"
\ No newline at end of file
+        return "connection_failed"
@@ -75,7 +75,7 @@ class ItemCarrinho(BaseModel):
 
 class Carrinho(BaseModel):
     # A representação completa do carrinho
-    id: int
+    id: Optional[int] = None  # None: carrinho virtual, a linha só é criada no primeiro item
     sessao_id: str
     status: str
     itens: List[ItemCarrinho]
@@ -97,6 +97,7 @@ class PromptUpdate(BaseModel):
 
 class Prompt(PromptCreate):
     id: int
+    espaco: Optional[str] = None
     criado_em: datetime
     atualizado_em: datetime
 
@@ -0,0 +1,111 @@
+# api-negocio/app/extrator_atributos.py
+
+"""
+Extração de atributos (unidades e volume) da query de busca.
+
+Todos os aliases de `unidade_aliases` viram uma única regex de alternância,
+compilada uma vez por versão da tabela; unidades e volume saem numa só
+passada pela query. A versão vem de `versoes_dados`, incrementada por
+trigger a cada alteração em unidade_aliases, e é consultada no máximo a cada
+ALIASES_INTERVALO_VERIFICACAO segundos.
+"""
+
+import re
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+_PADRAO_VOLUME = r"(?P<valor>\d+)\s?(?P<medida>ml|l|g|kg)\b"
+
+
+class ExtratorAtributos:
+    """Matcher compilado para um conjunto de aliases (alias -> unidade_principal)."""
+
+    def __init__(self, aliases: dict, versao: Optional[int] = None):
+        self.versao = versao
+        self._unidade_por_alias = {alias.lower(): unidade for alias, unidade in aliases.items()}
+        # Aliases mais longos primeiro: a alternância fica com o maior que casar
+        alternativas = "|".join(re.escape(a) for a in sorted(self._unidade_por_alias, key=len, reverse=True))
+        partes = [rf"\b(?P<alias>{alternativas})s?\b"] if alternativas else []
+        partes.append(_PADRAO_VOLUME)
+        self._padrao = re.compile("|".join(partes), re.IGNORECASE)
+
+    def extrair(self, query: str) -> (str, dict):
+        """Retorna a query sem os atributos reconhecidos e os filtros extraídos."""
+        unidades = []
+        volumes = []
+
+        def _remover(m: re.Match) -> str:
+            alias = m.groupdict().get("alias")
+            if alias:
+                unidade = self._unidade_por_alias[alias.lower()]
+                if unidade not in unidades:
+                    unidades.append(unidade)
+            else:
+                volumes.append(f"%{m.group('valor')}{m.group('medida').lower()}%")
+            return ""
+
+        query_limpa = self._padrao.sub(_remover, query.lower())
+
+        filtros = {}
+        if unidades:
+            filtros['unidades'] = unidades
+        if volumes:
+            filtros['volume'] = volumes[0]  # como antes: vale o primeiro volume da query
+        return query_limpa.strip(), filtros
+
+
+def _versao_aliases(db: Session) -> Optional[int]:
+    try:
+        return db.execute(
+            text("SELECT versao FROM versoes_dados WHERE nome = 'unidade_aliases'")
+        ).scalar()
+    except Exception as e:
+        # Banco sem a migração de versoes_dados: compila uma vez e não invalida
+        db.rollback()
+        print(f"Versão de unidade_aliases indisponível ({e.__class__.__name__}); usando aliases sem invalidação.")
+        return None
+
+
+class RegistroExtrator:
+    """Mantém o extrator da versão atual de unidade_aliases, recompilando quando ela muda."""
+
+    def __init__(self, intervalo_verificacao: float):
+        self.intervalo_verificacao = intervalo_verificacao
+        self._extrator: Optional[ExtratorAtributos] = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+        self.recompilacoes = 0
+
+    def obter(self, db: Session) -> ExtratorAtributos:
+        extrator = self._extrator
+        if extrator is not None and time.monotonic() - self._verificado_em < self.intervalo_verificacao:
+            return extrator
+
+        # O banco é consultado fora do lock: nos endpoints async (AsyncSession.run_sync) a
+        # consulta cede o event loop, e outra requisição na mesma thread travaria no lock.
+        # Na virada de versão, requisições simultâneas podem compilar em dobro; vale a última.
+        versao = _versao_aliases(db)
+        if extrator is None or (versao is not None and versao != extrator.versao):
+            rows = db.execute(
+                text("SELECT alias, unidade_principal FROM unidade_aliases WHERE ativo = TRUE")
+            ).fetchall()
+            extrator = ExtratorAtributos({row.alias: row.unidade_principal for row in rows}, versao)
+            with self._lock:
+                self._extrator = extrator
+                self.recompilacoes += 1
+            print(f"Extrator de atributos compilado com {len(rows)} aliases de unidade (versão {versao}).")
+        self._verificado_em = time.monotonic()
+        return extrator
+
+    def invalidar(self):
+        with self._lock:
+            self._extrator = None
+
+
+registro_extrator = RegistroExtrator(settings.ALIASES_INTERVALO_VERIFICACAO)
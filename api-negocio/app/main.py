@@ -6,6 +6,9 @@ from sqlalchemy.orm import Session
 
 from . import database, esquemas
 from . import crud  # agora existe (vide arquivo novo)
+from .cache_busca import cache_busca
+from .cache_carrinho import cache_carrinho
+from .config import settings
 
 app = FastAPI(
     title="API de Negócio - G.A.V.",
@@ -13,6 +16,11 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Com DB_ASYNC_ATIVO, as rotas async (registradas primeiro) atendem busca, carrinho, contexto e prompts
+if settings.DB_ASYNC_ATIVO:
+    from . import rotas_async
+    app.include_router(rotas_async.router)
+
 # --- Dependência para obter a sessão do banco ---
 # Este é o padrão do FastAPI para gerenciar sessões de banco de dados por requisição.
 def get_db():
@@ -65,22 +73,17 @@ def endpoint_adicionar_item(sessao_id: str, item: esquemas.ItemCarrinhoEntrada,
         return {"status": "item adicionado", "carrinho_id": carrinho['id']}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    finally:
+        cache_carrinho.invalidar(sessao_id)
 
 
 @app.get("/carrinhos/{sessao_id}", response_model=esquemas.Carrinho, tags=["Carrinho"])
 def endpoint_ver_carrinho(sessao_id: str, db: Session = Depends(get_db)):
     """
     Retorna o conteúdo detalhado do carrinho de uma sessão.
+    Sem carrinho aberto, responde um carrinho vazio (id null) sem criá-lo.
     """
-    carrinho_base = crud.get_ou_criar_carrinho_por_sessao(db, sessao_id=sessao_id)
-    if not carrinho_base:
-        raise HTTPException(status_code=404, detail="Carrinho não encontrado.")
-        
-    carrinho_detalhado = crud.get_carrinho_detalhado(db, carrinho_id=carrinho_base['id'])
-    if not carrinho_detalhado:
-        raise HTTPException(status_code=404, detail="Detalhes do carrinho não encontrados.")
-        
-    return carrinho_detalhado
+    return crud.get_carrinho_por_sessao(db, sessao_id=sessao_id)
 
 @app.get("/prompts/{nome}", tags=["Prompts"])
 def endpoint_get_prompt(nome: str, db: Session = Depends(get_db)):
@@ -101,6 +104,21 @@ def endpoint_get_unidade_aliases(db: Session = Depends(get_db)):
     return {row["alias"]: row["unidade_principal"] for row in rows}
 
 # --- Endpoints de ADMIN ---
+@app.get("/admin/cache/busca", tags=["Admin"])
+def admin_cache_busca():
+    """Acertos, faltas e ocupação do cache de resultados da busca (deste worker)."""
+    return cache_busca.estatisticas()
+
+@app.get("/admin/cache/carrinho", tags=["Admin"])
+def admin_cache_carrinho():
+    """Acertos e invalidações do cache curto de carrinhos (deste worker)."""
+    return cache_carrinho.estatisticas()
+
+@app.get("/admin/db/pool", tags=["Admin"])
+def admin_db_pool():
+    """Ocupação dos pools de conexão e espera por conexão (p50/p99/máx), deste worker."""
+    return database.estatisticas_pool()
+
 @app.get("/admin/prompts/buscar", tags=["Admin"])
 def admin_buscar_prompt(nome: str, espaco: str = "legacy", versao: str = "v1", db: Session = Depends(get_db)):
     """
@@ -0,0 +1,103 @@
+# api-negocio/app/rotas_async.py
+
+"""
+Versões async dos endpoints quentes (busca, carrinho, contexto e prompts).
+
+Com DB_ASYNC_ATIVO, este router é incluído antes das rotas síncronas do
+main.py e atende os mesmos caminhos: as requisições deixam de disputar o
+threadpool do FastAPI e ficam limitadas só pelo pool do engine asyncpg.
+
+As consultas continuam sendo as do crud.py, executadas com
+`AsyncSession.run_sync`: o SQLAlchemy roda a função síncrona sobre a conexão
+asyncpg e cede o event loop a cada ida ao banco. Operações que faziam várias
+chamadas ao crud rodam num único run_sync. O backend "redis" do cache de
+busca continua síncrono (timeouts de 0,2s) e, neste caminho, segura o loop
+enquanto responde.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, database, esquemas
+from .cache_carrinho import cache_carrinho
+
+# Mesmo contrato das rotas síncronas, que continuam documentando estes caminhos
+router = APIRouter(include_in_schema=False)
+
+
+async def get_db_async():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+
+@router.post("/produtos/busca", response_model=esquemas.BuscaResultado)
+async def async_buscar_produtos(query: esquemas.BuscaQuery, db: AsyncSession = Depends(get_db_async)):
+    return await db.run_sync(lambda s: crud.buscar_produtos(
+        s, query=query.query, limit=query.limit,
+        ordenar_por=query.ordenar_por, codfilial=query.codfilial
+    ))
+
+
+@router.post("/carrinhos/{sessao_id}/itens", status_code=201)
+async def async_adicionar_item(sessao_id: str, item: esquemas.ItemCarrinhoEntrada, db: AsyncSession = Depends(get_db_async)):
+    def _adicionar(s):
+        carrinho = crud.get_ou_criar_carrinho_por_sessao(s, sessao_id=sessao_id)
+        if not carrinho:
+            raise HTTPException(status_code=404, detail="Não foi possível criar ou encontrar o carrinho.")
+        try:
+            crud.adicionar_item_ao_carrinho(s, carrinho_id=carrinho['id'], item_data=item)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return {"status": "item adicionado", "carrinho_id": carrinho['id']}
+
+    try:
+        return await db.run_sync(_adicionar)
+    finally:
+        cache_carrinho.invalidar(sessao_id)
+
+
+@router.get("/carrinhos/{sessao_id}", response_model=esquemas.Carrinho)
+async def async_ver_carrinho(sessao_id: str, db: AsyncSession = Depends(get_db_async)):
+    return await db.run_sync(lambda s: crud.get_carrinho_por_sessao(s, sessao_id=sessao_id))
+
+
+@router.get("/prompts/{nome}")
+async def async_get_prompt(nome: str, db: AsyncSession = Depends(get_db_async)):
+    template = await db.run_sync(lambda s: crud.get_prompt_ativo_por_nome(s, nome=nome))
+    if not template:
+        raise HTTPException(status_code=404, detail="Prompt não encontrado.")
+    return {"nome": nome, "template": template}
+
+
+@router.get("/admin/prompts/buscar")
+async def async_admin_buscar_prompt(nome: str, espaco: str = "legacy", versao: str = "v1", db: AsyncSession = Depends(get_db_async)):
+    tpl = await db.run_sync(lambda s: crud.get_prompt_ativo_por_nome_espaco_versao(s, nome=nome, espaco=espaco, versao=versao))
+    if not tpl:
+        raise HTTPException(status_code=404, detail="Prompt não encontrado para os filtros informados.")
+    return tpl
+
+
+@router.get("/admin/prompts/{prompt_id}/exemplos/ativos")
+async def async_admin_listar_exemplos_ativos(prompt_id: int, db: AsyncSession = Depends(get_db_async)):
+    return await db.run_sync(lambda s: crud.get_prompt_exemplos_ativos(s, prompt_id=prompt_id))
+
+
+@router.post("/contexto/{sessao_id}", status_code=201)
+async def async_salvar_contexto(sessao_id: str, contexto: esquemas.ContextoEntrada, db: AsyncSession = Depends(get_db_async)):
+    contexto_id = await db.run_sync(lambda s: crud.salvar_contexto_sessao(
+        s,
+        sessao_id=sessao_id,
+        tipo_contexto=contexto.tipo_contexto,
+        contexto_estruturado=contexto.contexto_estruturado,
+        mensagem_original=contexto.mensagem_original,
+        resposta_apresentada=contexto.resposta_apresentada
+    ))
+    return {"contexto_id": contexto_id, "status": "contexto salvo"}
+
+
+@router.get("/contexto/{sessao_id}")
+async def async_buscar_contexto(sessao_id: str, db: AsyncSession = Depends(get_db_async)):
+    contexto = await db.run_sync(lambda s: crud.buscar_contexto_sessao(s, sessao_id=sessao_id))
+    if not contexto:
+        raise HTTPException(status_code=404, detail="Contexto não encontrado para esta sessão")
+    return contexto
@@ -0,0 +1,176 @@
+# api-negocio/benchmarks/bench_busca.py
+
+"""
+Benchmark da busca de produtos: consulta única (LATERAL + json_agg) contra o
+N+1 anterior (uma consulta de itens por produto).
+
+Use um banco descartável com o schema.sql aplicado:
+
+1. Gerar um catálogo sintético (departamento 'BENCH'):
+    python -m benchmarks.bench_busca popular [--produtos 100000]
+
+2. Medir p50/p99 e o número de consultas SQL por busca:
+    python -m benchmarks.bench_busca medir [--limits 10 50 200] [--repeticoes 30]
+
+3. Remover o catálogo sintético:
+    python -m benchmarks.bench_busca limpar
+
+Execute a partir de api-negocio/ (usa o mesmo .env da aplicação).
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.database import SessionLocal, engine
+
+CODPROD_BASE = 900_000_000
+CONSULTAS = ["refrigerante", "cerveja lata", "sabao", "arroz 5kg", "detergente caixa"]
+
+SQL_POPULAR = [
+    """
+    INSERT INTO produtos (codprod, descricao, descricaoweb, departamento, categoria, marca)
+    SELECT :base + g,
+           upper(tipo || ' ' || marca || ' ' || volume || ' ' || g),
+           initcap(tipo || ' ' || marca || ' ' || volume),
+           'BENCH', tipo, marca
+    FROM generate_series(1, :n) g,
+    LATERAL (SELECT
+        (ARRAY['refrigerante','cerveja','sabao','detergente','arroz','feijao','cafe','leite','biscoito','oleo'])[1 + g % 10] AS tipo,
+        (ARRAY['alfa','beta','gama','delta','omega','sol','lua','mar','rio','serra'])[1 + (g / 10) % 10] AS marca,
+        (ARRAY['350ml','2l','1kg','5kg','500g'])[1 + g % 5] AS volume
+    ) a
+    """,
+    """
+    INSERT INTO produto_itens (produto_id, unidade, qtunit)
+    SELECT p.id, u.unidade, u.qtunit
+    FROM produtos p
+    CROSS JOIN (VALUES ('UN', 1, 1), ('CX', 12, 2), ('FD', 6, 3), ('LT', 1, 4)) u(unidade, qtunit, variantes)
+    WHERE p.departamento = 'BENCH' AND p.codprod % 4 < u.variantes
+    """,
+    """
+    INSERT INTO produto_precos (item_id, codfilial, pvenda, poferta)
+    SELECT pi.id, 2, round((1 + random() * 80)::numeric, 2),
+           CASE WHEN random() < 0.2 THEN round((1 + random() * 60)::numeric, 2) END
+    FROM produto_itens pi JOIN produtos p ON p.id = pi.produto_id
+    WHERE p.departamento = 'BENCH'
+    """,
+]
+
+
+def _executar_busca_n_mais_1(db: Session, query_para_fts: str, filtros: dict, codfilial: int, ordenar_por: str, limit: int, estrita: bool, usar_trigrama: bool = False):
+    """Implementação anterior (só a busca estrita FTS, que é o caminho medido)."""
+    query_fts_formatada = " & ".join(query_para_fts.split()) if query_para_fts else None
+    params = {'limit': limit, 'codfilial': codfilial}
+    where_clauses = []
+    select_clause = "p.*"
+    order_by_clause = "ORDER BY p.id"
+    if query_fts_formatada:
+        select_clause = "p.*, MAX(ts_rank(produtos_fts_document(p.descricaoweb, p.descricao, p.marca, p.categoria, p.departamento), to_tsquery('portuguese', :query_fts))) as rank"
+        where_clauses.append("produtos_fts_document(p.descricaoweb, p.descricao, p.marca, p.categoria, p.departamento) @@ to_tsquery('portuguese', :query_fts)")
+        params['query_fts'] = query_fts_formatada
+        order_by_clause = "ORDER BY rank DESC"
+    if 'volume' in filtros:
+        where_clauses.append("(p.descricao ILIKE :volume OR p.descricaoweb ILIKE :volume)")
+        params['volume'] = filtros['volume']
+    if 'unidades' in filtros:
+        where_clauses.append("pi.unidade = ANY(:unidades)")
+        params['unidades'] = filtros['unidades']
+    if not where_clauses:
+        return []
+
+    sql = f"""
+        SELECT {select_clause} FROM produtos p LEFT JOIN produto_itens pi ON p.id = pi.produto_id
+        WHERE {" AND ".join(where_clauses)} GROUP BY p.id {order_by_clause} LIMIT :limit
+    """
+    produtos_encontrados = []
+    for row in db.execute(text(sql), params).fetchall():
+        produto_dict = dict(row._mapping)
+        item_params = {"pid": produto_dict['id'], "codfilial": codfilial}
+        item_where_clauses = ["pi.produto_id = :pid"]
+        if estrita and 'unidades' in filtros:
+            item_where_clauses.append("pi.unidade = ANY(:unidades)")
+            item_params['unidades'] = filtros['unidades']
+        itens = db.execute(text(f"""
+            SELECT pi.id, pi.unidade, pi.qtunit, pp.pvenda, pp.poferta
+            FROM produto_itens pi LEFT JOIN produto_precos pp ON pi.id = pp.item_id AND pp.codfilial = :codfilial
+            WHERE {" AND ".join(item_where_clauses)} ORDER BY pi.id
+        """), item_params).fetchall()
+        produto_dict['itens'] = [dict(i._mapping) for i in itens]
+        if produto_dict['itens']:
+            produtos_encontrados.append(produto_dict)
+    return produtos_encontrados
+
+
+def popular(n: int):
+    with engine.begin() as conn:
+        for sql in SQL_POPULAR:
+            conn.execute(text(sql), {"base": CODPROD_BASE, "n": n})
+        conn.execute(text("ANALYZE produtos; ANALYZE produto_itens; ANALYZE produto_precos"))
+    print(f"{n} produtos sintéticos criados (departamento 'BENCH')")
+
+
+def limpar():
+    with engine.begin() as conn:
+        apagados = conn.execute(text("DELETE FROM produtos WHERE departamento = 'BENCH'")).rowcount
+    print(f"{apagados} produtos sintéticos removidos")
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def medir(limits: list[int], repeticoes: int):
+    consultas_sql = 0
+
+    def _contar(*_):
+        nonlocal consultas_sql
+        consultas_sql += 1
+
+    event.listen(engine, "before_cursor_execute", _contar)
+    implementacoes = {"n+1": _executar_busca_n_mais_1, "lateral": crud._executar_busca}
+
+    print(f"{'limit':>5} {'implementação':<13} {'p50 (ms)':>9} {'p99 (ms)':>9} {'consultas':>10} {'produtos':>9}")
+    with SessionLocal() as db:
+        extraidas = [crud._extrair_atributos_da_query(db, q) for q in CONSULTAS]
+        for limit in limits:
+            for nome, fn in implementacoes.items():
+                fn(db, *extraidas[0], 2, "relevancia", limit, estrita=True)  # aquece cache/plano
+                latencias, produtos = [], 0
+                consultas_sql = 0
+                for _ in range(repeticoes):
+                    for query_fts, filtros in extraidas:
+                        inicio = time.perf_counter()
+                        produtos += len(fn(db, query_fts, filtros, 2, "relevancia", limit, estrita=True))
+                        latencias.append((time.perf_counter() - inicio) * 1000)
+                n = repeticoes * len(extraidas)
+                print(f"{limit:>5} {nome:<13} {statistics.median(latencias):>9.1f} {_percentil(latencias, 0.99):>9.1f}"
+                      f" {consultas_sql / n:>10.1f} {produtos / n:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_popular = sub.add_parser("popular")
+    p_popular.add_argument("--produtos", type=int, default=100_000)
+    p_medir = sub.add_parser("medir")
+    p_medir.add_argument("--limits", type=int, nargs="+", default=[10, 50, 200])
+    p_medir.add_argument("--repeticoes", type=int, default=30)
+    sub.add_parser("limpar")
+    args = parser.parse_args()
+
+    if args.comando == "popular":
+        popular(args.produtos)
+    elif args.comando == "medir":
+        medir(args.limits, args.repeticoes)
+    else:
+        limpar()
+
+
+if __name__ == "__main__":
+    main()
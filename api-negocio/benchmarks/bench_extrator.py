@@ -0,0 +1,98 @@
+# api-negocio/benchmarks/bench_extrator.py
+
+"""
+Micro-benchmark da extração de atributos da query (unidades e volume).
+
+Compara o laço anterior (re.compile + search + sub por alias, a cada busca)
+com o ExtratorAtributos (uma regex de alternância compilada por versão dos
+aliases), com 10, 100 e 1000 aliases. Não precisa de banco.
+
+Uso (a partir de api-negocio/):
+    python -m benchmarks.bench_extrator [--n 2000] [--aliases 10 100 1000]
+"""
+
+import argparse
+import os
+import re
+import time
+
+# O extrator lê o Settings da aplicação; o benchmark não acessa o banco
+for _var, _valor in {"POSTGRES_USER": "x", "POSTGRES_PASSWORD": "x", "POSTGRES_HOST": "x",
+                     "POSTGRES_PORT": "5432", "POSTGRES_DB": "x"}.items():
+    os.environ.setdefault(_var, _valor)
+
+from app.extrator_atributos import ExtratorAtributos  # noqa: E402
+
+ALIASES_REAIS = {
+    "caixa": "CX", "unidade": "UN", "fardo": "FD", "pack": "PK", "pacote": "PC", "kilo": "KG",
+    "lata": "LT", "display": "DP", "conjunto": "CJ", "saco": "SC", "duzia": "DZ",
+}
+QUERIES = [
+    "coca cola 2l",
+    "cerveja skol lata 350ml",
+    "caixa de leite integral",
+    "sabao em po omo 1kg pacote",
+    "fardo agua mineral 500ml",
+    "detergente ype",
+]
+
+
+def _aliases(n: int) -> dict:
+    aliases = dict(list(ALIASES_REAIS.items())[:n])
+    for i in range(n - len(aliases)):
+        aliases[f"embalagem{i}"] = f"E{i % 100}"
+    return aliases
+
+
+def _extrair_antigo(aliases_map: dict, query: str):
+    """Implementação anterior, sem o acesso ao banco."""
+    filtros = {}
+    query_limpa = query.lower()
+    unidades_encontradas = set()
+    for alias, unidade_principal in aliases_map.items():
+        padrao_alias = re.compile(r'\b' + re.escape(alias) + r's?\b', re.IGNORECASE)
+        if padrao_alias.search(query_limpa):
+            unidades_encontradas.add(unidade_principal)
+            query_limpa = padrao_alias.sub('', query_limpa)
+    if unidades_encontradas:
+        filtros['unidades'] = list(unidades_encontradas)
+    padrao_volume = re.compile(r'(\d+)\s?(ml|l|g|kg)\b', re.IGNORECASE)
+    match = padrao_volume.search(query_limpa)
+    if match:
+        filtros['volume'] = f"%{match.group(1)}{match.group(2).lower()}%"
+        query_limpa = padrao_volume.sub('', query_limpa)
+    return query_limpa.strip(), filtros
+
+
+def _normalizar(resultado):
+    query, filtros = resultado
+    return " ".join(query.split()), {k: sorted(v) if isinstance(v, list) else v for k, v in filtros.items()}
+
+
+def _medir(fn, n: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(n):
+        fn(QUERIES[i % len(QUERIES)])
+    return (time.perf_counter() - inicio) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--aliases", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'aliases':>7} {'antigo (µs)':>12} {'compilado (µs)':>15} {'ganho':>7}")
+    for n_aliases in args.aliases:
+        aliases = _aliases(n_aliases)
+        extrator = ExtratorAtributos(aliases)
+        for q in QUERIES:
+            assert _normalizar(extrator.extrair(q)) == _normalizar(_extrair_antigo(aliases, q)), q
+        re.purge()  # o laço antigo dependia do cache interno do módulo re
+        antigo = _medir(lambda q: _extrair_antigo(aliases, q), max(1, args.n // max(1, n_aliases // 10)))
+        compilado = _medir(extrator.extrair, args.n)
+        print(f"{n_aliases:>7} {antigo:>12.1f} {compilado:>15.1f} {antigo / compilado:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# api-negocio/benchmarks/carga_db.py
+
+"""
+Teste de carga dos endpoints quentes da api-negocio com N clientes simultâneos.
+
+Cada cliente repete, pelo tempo pedido, o ciclo busca -> contexto -> prompt ->
+carrinho (como o gav-autonomo faz a cada mensagem). Ao final, mostra
+requisições/s, latências por endpoint e o estado dos pools (/admin/db/pool).
+
+Para comparar os caminhos, rode uma vez com a api-negocio subida com
+DB_ASYNC_ATIVO=false (rotas síncronas no threadpool) e outra com
+DB_ASYNC_ATIVO=true (asyncpg), com os mesmos DB_POOL_*. Use
+BUSCA_CACHE_BACKEND=desligado para medir o banco e não o cache.
+
+Uso (com a api-negocio no ar; requer httpx):
+    python -m benchmarks.carga_db [--url http://localhost:8001] [--clientes 100] [--segundos 30]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+CONSULTAS = ["refrigerante", "cerveja lata", "sabao", "arroz 5kg", "detergente caixa"]
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def _cliente(cliente: httpx.AsyncClient, indice: int, fim: float, latencias: dict, erros: list):
+    sessao_id = f"carga-db-{indice}"
+    requisicoes = [
+        ("busca", lambda i: cliente.post("/produtos/busca", json={"query": CONSULTAS[i % len(CONSULTAS)], "limit": 10, "codfilial": 2})),
+        ("contexto", lambda i: cliente.get(f"/contexto/{sessao_id}")),
+        ("prompt", lambda i: cliente.get("/admin/prompts/buscar", params={"nome": "prompt_mestre", "espaco": "autonomo", "versao": "1"})),
+        ("carrinho", lambda i: cliente.get(f"/carrinhos/{sessao_id}")),
+    ]
+    i = indice
+    while time.perf_counter() < fim:
+        for nome, requisitar in requisicoes:
+            inicio = time.perf_counter()
+            try:
+                resp = await requisitar(i)
+                if resp.status_code >= 500:
+                    erros.append(f"{nome}: HTTP {resp.status_code}")
+            except Exception as e:
+                erros.append(f"{nome}: {e}")
+            latencias[nome].append(time.perf_counter() - inicio)
+        i += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--clientes", type=int, default=100)
+    parser.add_argument("--segundos", type=float, default=30)
+    args = parser.parse_args()
+
+    latencias: dict[str, list[float]] = defaultdict(list)
+    erros: list[str] = []
+    limites = httpx.Limits(max_connections=args.clientes, max_keepalive_connections=args.clientes)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limites) as cliente:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(
+            _cliente(cliente, i, inicio + args.segundos, latencias, erros) for i in range(args.clientes)
+        ))
+        duracao = time.perf_counter() - inicio
+        status_pool = (await cliente.get("/admin/db/pool")).json()
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"{args.clientes} clientes, {duracao:.1f}s: {total} requisições")
+    print(f"Vazão: {total / duracao:.1f} req/s   erros: {len(erros)}")
+    print(f"{'endpoint':<10} {'req':>7} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for nome, valores in latencias.items():
+        print(f"{nome:<10} {len(valores):>7} {statistics.median(valores) * 1000:>9.1f} {_percentil(valores, 0.99) * 1000:>9.1f}")
+    if erros:
+        print("Primeiros erros:", erros[:5])
+    print("Pools:", json.dumps(status_pool, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+# api-negocio/tests/conftest.py
+
+"""
+Testes dos módulos puros da api-negocio (sem PostgreSQL).
+
+Uso, a partir de api-negocio/:
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+# Settings exige as variáveis do banco; nenhum teste abre conexão
+for nome, valor in {
+    "POSTGRES_USER": "gav", "POSTGRES_PASSWORD": "gav", "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432", "POSTGRES_DB": "gav",
+}.items():
+    os.environ.setdefault(nome, valor)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,144 @@
+# api-negocio/tests/test_cache_busca.py
+
+from collections import namedtuple
+
+import pytest
+
+from app import cache_busca as modulo
+from app.cache_busca import BackendMemoria, CacheBusca, chave_busca, chave_versao, normalizar_query, versao_catalogo
+
+Linha = namedtuple("Linha", "nome versao")
+
+
+class SessaoFalsa:
+    """Responde só ao SELECT de versoes_dados."""
+
+    def __init__(self, versoes: dict):
+        self.versoes = versoes
+        self.rollbacks = 0
+
+    def execute(self, *_):
+        linhas = [Linha(nome, versao) for nome, versao in self.versoes.items()]
+        return type("Resultado", (), {"fetchall": lambda _: linhas})()
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class SessaoSemTabela(SessaoFalsa):
+    def execute(self, *_):
+        raise RuntimeError('relation "versoes_dados" does not exist')
+
+
+VERSOES = {"catalogo": 42, "unidade_aliases": 3}
+
+
+def test_normalizar_query():
+    assert normalizar_query("  Coca   COLA\t2L ") == "coca cola 2l"
+    assert normalizar_query(None) == ""
+    assert normalizar_query("café") != normalizar_query("cafe")
+
+
+def test_chave_versao_exige_todas_as_tabelas():
+    assert chave_versao(VERSOES) == "catalogo:42,unidade_aliases:3"
+    assert chave_versao({"catalogo": 42}) is None
+    assert chave_versao({}) is None
+
+
+def test_versao_catalogo():
+    assert versao_catalogo(SessaoFalsa(VERSOES)) == "catalogo:42,unidade_aliases:3"
+    assert versao_catalogo(SessaoFalsa({"catalogo": 42})) is None
+    sessao = SessaoSemTabela({})
+    assert versao_catalogo(sessao) is None
+    assert sessao.rollbacks == 1
+
+
+def test_chave_busca():
+    base = chave_busca("Coca  Cola", 2, "relevancia", 10, "catalogo:1,unidade_aliases:1")
+    assert base == chave_busca("coca cola", 2, "relevancia", 10, "catalogo:1,unidade_aliases:1")
+    assert base.startswith("busca:")
+    variacoes = [
+        chave_busca("coca cola", 3, "relevancia", 10, "catalogo:1,unidade_aliases:1"),
+        chave_busca("coca cola", 2, "preco_asc", 10, "catalogo:1,unidade_aliases:1"),
+        chave_busca("coca cola", 2, "relevancia", 5, "catalogo:1,unidade_aliases:1"),
+        chave_busca("coca cola", 2, "relevancia", 10, "catalogo:2,unidade_aliases:1"),
+        chave_busca("coca cola", 2, "relevancia", 10, "catalogo:1,unidade_aliases:2"),
+    ]
+    assert len({base, *variacoes}) == 6
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(modulo.time, "monotonic", relogio)
+    return relogio
+
+
+def test_backend_memoria_lru_por_bytes(relogio):
+    backend = BackendMemoria(max_bytes=10, ttl_segundos=60)
+    backend.guardar("a", b"1234")
+    backend.guardar("b", b"1234")
+    backend.obter("a")  # "b" passa a ser a menos usada
+    backend.guardar("c", b"1234")
+    assert backend.obter("b") is None
+    assert backend.obter("a") == b"1234" and backend.obter("c") == b"1234"
+    assert backend.estatisticas() == {"itens": 2, "bytes": 8, "max_bytes": 10, "evictions": 1}
+
+    backend.guardar("grande", b"x" * 11)
+    assert backend.obter("grande") is None
+
+
+def test_backend_memoria_ttl(relogio):
+    backend = BackendMemoria(max_bytes=100, ttl_segundos=60)
+    backend.guardar("a", b"1")
+    relogio.agora += 60
+    assert backend.obter("a") is None
+    assert backend.estatisticas()["bytes"] == 0
+
+
+def _buscar(chamadas):
+    def buscar():
+        chamadas.append(1)
+        return {"resultados": [{"descricao": "Coca"}], "status_busca": "sucesso"}
+    return buscar
+
+
+def test_obter_ou_buscar_usa_o_cache_na_mesma_versao(relogio):
+    cache, chamadas = CacheBusca(BackendMemoria(10_000, 60)), []
+    for query in ("coca", "Coca "):
+        resultado = cache.obter_ou_buscar(SessaoFalsa(VERSOES), query, 2, "relevancia", 10, _buscar(chamadas))
+        assert resultado["resultados"][0]["descricao"] == "Coca"
+    assert len(chamadas) == 1
+    assert (cache.acertos, cache.faltas) == (1, 1)
+
+    nova_versao = SessaoFalsa({**VERSOES, "catalogo": 43})
+    cache.obter_ou_buscar(nova_versao, "coca", 2, "relevancia", 10, _buscar(chamadas))
+    assert len(chamadas) == 2
+
+
+def test_obter_ou_buscar_sem_versao_completa_nao_usa_cache(relogio):
+    cache, chamadas = CacheBusca(BackendMemoria(10_000, 60)), []
+    for _ in range(2):
+        cache.obter_ou_buscar(SessaoFalsa({"catalogo": 42}), "coca", 2, "relevancia", 10, _buscar(chamadas))
+    assert len(chamadas) == 2
+    assert cache.sem_versao == 2
+    assert cache.backend.estatisticas()["itens"] == 0
+
+
+def test_falha_do_backend_nao_derruba_a_busca(relogio):
+    class BackendQuebrado:
+        def obter(self, chave):
+            raise ConnectionError("redis fora")
+
+    cache, chamadas = CacheBusca(BackendQuebrado()), []
+    resultado = cache.obter_ou_buscar(SessaoFalsa(VERSOES), "coca", 2, "relevancia", 10, _buscar(chamadas))
+    assert resultado["status_busca"] == "sucesso"
+    assert cache.erros_backend == 1
@@ -0,0 +1,145 @@
+# gav-autonomo/app/adaptadores/agendador_llm.py
+
+"""
+Agendador das gerações no Ollama.
+
+Sem controle, cada mensagem dispara sua chamada ao /api/generate e todas
+disputam o servidor de modelo ao mesmo tempo. O agendador:
+
+- limita as gerações simultâneas a OLLAMA_NUM_PARALLEL (o `num_parallel` do
+  servidor) por host do pool — o restante espera aqui, não na fila opaca do
+  Ollama;
+- libera as vagas por prioridade: Selector antes do processador de contexto
+  e do reparo, e estes antes do Apresentador (quem já tem dados para mostrar
+  pode esperar; quem ainda nem decidiu a ferramenta, não);
+- junta requisições idênticas em voo (mesmo payload) numa única geração.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+from app.config.settings import config
+from app.adaptadores.clientes_http import HOSTS_OLLAMA
+from app.adaptadores.coalescencia import SingleFlight
+from app.metricas import registrar_etapa
+
+PRIORIDADE_SELETOR = 0
+PRIORIDADE_CONTEXTO = 1
+PRIORIDADE_APRESENTADOR = 2
+
+
+class AgendadorLLM:
+    def __init__(self, paralelismo: int):
+        self.paralelismo = paralelismo  # <= 0: sem limite (só coalescência)
+        self._em_execucao = 0
+        self._fila: list[tuple[int, int, asyncio.Future]] = []  # heap (prioridade, ordem, vaga)
+        self._ordem = itertools.count()
+        self._voos = SingleFlight("geracoes_llm")
+        self.pico_fila = 0
+        self.geracoes = 0
+        self._esperas: dict[int, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])  # [n, soma, máx]
+
+    async def _adquirir(self, prioridade: int):
+        inicio = time.perf_counter()
+        if (self.paralelismo <= 0 or self._em_execucao < self.paralelismo) and not self._fila:
+            self._em_execucao += 1
+        else:
+            vaga = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._fila, (prioridade, next(self._ordem), vaga))
+            self.pico_fila = max(self.pico_fila, len(self._fila))
+            try:
+                await vaga
+            except asyncio.CancelledError:
+                if vaga.done() and not vaga.cancelled():
+                    self._liberar()  # a vaga chegou junto com o cancelamento: devolve
+                raise
+        espera = time.perf_counter() - inicio
+        registrar_etapa("fila_llm", espera)
+        estat = self._esperas[prioridade]
+        estat[0] += 1
+        estat[1] += espera
+        estat[2] = max(estat[2], espera)
+
+    def _liberar(self):
+        # Passa a vaga direto ao próximo da fila (sem decrementar), pulando cancelados
+        while self._fila:
+            _, _, vaga = heapq.heappop(self._fila)
+            if not vaga.done():
+                vaga.set_result(None)
+                return
+        self._em_execucao -= 1
+
+    async def executar(self, fabrica: Callable[[], Awaitable], prioridade: int = PRIORIDADE_CONTEXTO, chave=None):
+        """
+        Executa `fabrica()` quando houver vaga. Chamadas com a mesma `chave`
+        enquanto a primeira está na fila ou em execução recebem o mesmo resultado.
+        """
+        async def _gerar():
+            await self._adquirir(prioridade)
+            try:
+                self.geracoes += 1
+                return await fabrica()
+            finally:
+                self._liberar()
+
+        if chave is None:
+            return await _gerar()
+        # A geração compartilhada roda na própria task: o cancelamento de um
+        # dos interessados não derruba a resposta dos demais
+        return await self._voos.executar(chave, _gerar)
+
+    def tentar_vaga(self) -> bool:
+        """Ocupa uma vaga só se houver uma livre agora (sem fila); devolver com `liberar_vaga`."""
+        if (self.paralelismo <= 0 or self._em_execucao < self.paralelismo) and not self._fila:
+            self._em_execucao += 1
+            self.geracoes += 1
+            return True
+        return False
+
+    def liberar_vaga(self):
+        self._liberar()
+
+    def vaga(self, prioridade: int = PRIORIDADE_CONTEXTO) -> "_Vaga":
+        """Context manager assíncrono para gerações em streaming (não coalescíveis)."""
+        return _Vaga(self, prioridade)
+
+    def estatisticas(self) -> dict:
+        return {
+            "paralelismo": self.paralelismo,
+            "em_execucao": self._em_execucao,
+            "profundidade_fila": sum(1 for _, _, v in self._fila if not v.done()),
+            "pico_fila": self.pico_fila,
+            "geracoes": self.geracoes,
+            "coalescidas": self._voos.coalescidas,
+            "espera_por_prioridade": {
+                str(p): {
+                    "chamadas": n,
+                    "media_ms": round(soma / n * 1000, 1) if n else 0.0,
+                    "max_ms": round(maximo * 1000, 1),
+                }
+                for p, (n, soma, maximo) in sorted(self._esperas.items())
+            },
+        }
+
+
+class _Vaga:
+    def __init__(self, agendador: AgendadorLLM, prioridade: int):
+        self.agendador = agendador
+        self.prioridade = prioridade
+
+    async def __aenter__(self):
+        await self.agendador._adquirir(self.prioridade)
+        self.agendador.geracoes += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.agendador._liberar()
+        return False
+
+
+# num_parallel vale por servidor: com vários hosts no pool, as vagas somam
+agendador_llm = AgendadorLLM(paralelismo=config.OLLAMA_NUM_PARALLEL * len(HOSTS_OLLAMA))
@@ -1,35 +1,61 @@
+import asyncio
 import httpx
 from app.config.settings import config
+from app.adaptadores.clientes_http import obter_cliente, obter_cliente_async
+from app.adaptadores.coalescencia import voo
 
 API_NEGOCIO_URL = config.API_NEGOCIO_URL
 
 def obter_prompt_por_nome(nome: str, espaco: str = "autonomo", versao: int = 2) -> dict:
-    url = f"{API_NEGOCIO_URL}/admin/prompts/buscar"
-    r = httpx.get(url, params={"nome": nome, "espaco": espaco, "versao": versao}, timeout=10.0)
+    r = obter_cliente("negocio").get("/admin/prompts/buscar", params={"nome": nome, "espaco": espaco, "versao": versao})
     r.raise_for_status()
     return r.json()
 
 def listar_exemplos_prompt(prompt_id: int) -> list[dict]:
-    url = f"{API_NEGOCIO_URL}/admin/prompts/{prompt_id}/exemplos/ativos"
-    r = httpx.get(url, timeout=10.0)
+    r = obter_cliente("negocio").get(f"/admin/prompts/{prompt_id}/exemplos/ativos")
+    r.raise_for_status()
+    return r.json()
+
+async def obter_prompt_por_nome_async(nome: str, espaco: str = "autonomo", versao: int = 2) -> dict:
+    async def _buscar():
+        r = await obter_cliente_async("negocio").get("/admin/prompts/buscar", params={"nome": nome, "espaco": espaco, "versao": versao})
+        r.raise_for_status()
+        return r.json()
+    # Pedidos simultâneos do mesmo prompt viram uma única chamada
+    return await voo("prompts").executar((nome, espaco, str(versao)), _buscar)
+
+async def listar_exemplos_prompt_async(prompt_id: int) -> list[dict]:
+    async def _buscar():
+        r = await obter_cliente_async("negocio").get(f"/admin/prompts/{prompt_id}/exemplos/ativos")
+        r.raise_for_status()
+        return r.json()
+    return await voo("exemplos").executar(prompt_id, _buscar)
+
+async def obter_contexto_async(sessao_id: str) -> dict | None:
+    """Contexto salvo da sessão, ou None se não houver."""
+    async def _buscar():
+        r = await obter_cliente_async("negocio").get(f"/contexto/{sessao_id}")
+        return r.json() if r.is_success else None
+    # O contexto é alterado por quem o lê: cada um recebe sua cópia
+    return await voo("contexto", copiar=True).executar(sessao_id, _buscar)
+
+async def salvar_contexto_async(sessao_id: str, payload: dict) -> dict:
+    r = await obter_cliente_async("negocio").post(f"/contexto/{sessao_id}", json=payload)
     r.raise_for_status()
     return r.json()
 
 def buscar_produtos(query: str, ordenar_por: str | None = None) -> dict:
-    url = f"{API_NEGOCIO_URL}/produtos/busca"
-    r = httpx.post(url, json={"query": query, "ordenar_por": ordenar_por}, timeout=15.0)
+    r = obter_cliente("negocio").post("/produtos/busca", json={"query": query, "ordenar_por": ordenar_por})
     r.raise_for_status()
     return r.json()
 
 def adicionar_ao_carrinho(sessao_id: str, **payload) -> dict:
-    url = f"{API_NEGOCIO_URL}/carrinhos/{sessao_id}/itens"
-    r = httpx.post(url, json=payload, timeout=10.0)
+    r = obter_cliente("negocio").post(f"/carrinhos/{sessao_id}/itens", json=payload)
     r.raise_for_status()
     return r.json()
 
 def ver_carrinho(sessao_id: str) -> dict:
-    url = f"{API_NEGOCIO_URL}/carrinhos/{sessao_id}"
-    r = httpx.get(url, timeout=10.0)
+    r = obter_cliente("negocio").get(f"/carrinhos/{sessao_id}")
     r.raise_for_status()
     return r.json()
 
@@ -39,38 +65,38 @@ async def buscar_manifesto_completo() -> list[dict]:
     Esta função é chamada apenas na inicialização para popular o cache.
     """
     url_prompts = f"{API_NEGOCIO_URL}/admin/prompts"
-    
-    async with httpx.AsyncClient() as client:
-        # 1. Buscar todos os prompts
-        print(f"Buscando todos os prompts de {url_prompts}...")
-        resp_prompts = await client.get(url_prompts, params={"limit": 500}, timeout=30.0)
-        resp_prompts.raise_for_status()
-        prompts = resp_prompts.json()
-        print(f"Encontrados {len(prompts)} prompts.")
-
-        # 2. Para cada prompt, buscar seus exemplos em paralelo
-        tarefas_exemplos = []
-        for p in prompts:
-            if p.get("ativo"):
-                url_exemplos = f"{API_NEGOCIO_URL}/admin/prompts/{p['id']}/exemplos/ativos"
-                tarefas_exemplos.append(client.get(url_exemplos, timeout=10.0))
-
-        if not tarefas_exemplos:
-            return []
-
-        print(f"Buscando exemplos para {len(tarefas_exemplos)} prompts ativos...")
-        respostas_exemplos = await asyncio.gather(*tarefas_exemplos, return_exceptions=True)
-
-        # 3. Combinar os resultados
-        manifesto_final = []
-        prompts_ativos = [p for p in prompts if p.get("ativo")]
-
-        for i, p in enumerate(prompts_ativos):
-            resposta = respostas_exemplos[i]
-            if isinstance(resposta, httpx.Response) and resposta.status_code == 200:
-                p['examples'] = resposta.json()
-            else:
-                p['examples'] = [] # Garante que a chave 'examples' sempre exista
-            manifesto_final.append(p)
-            
+    client = obter_cliente_async("negocio")
+
+    # 1. Buscar todos os prompts
+    print(f"Buscando todos os prompts de {url_prompts}...")
+    resp_prompts = await client.get(url_prompts, params={"limit": 500}, timeout=30.0)
+    resp_prompts.raise_for_status()
+    prompts = resp_prompts.json()
+    print(f"Encontrados {len(prompts)} prompts.")
+
+    # 2. Para cada prompt, buscar seus exemplos em paralelo
+    tarefas_exemplos = []
+    for p in prompts:
+        if p.get("ativo"):
+            url_exemplos = f"{API_NEGOCIO_URL}/admin/prompts/{p['id']}/exemplos/ativos"
+            tarefas_exemplos.append(client.get(url_exemplos))
+
+    if not tarefas_exemplos:
+        return []
+
+    print(f"Buscando exemplos para {len(tarefas_exemplos)} prompts ativos...")
+    respostas_exemplos = await asyncio.gather(*tarefas_exemplos, return_exceptions=True)
+
+    # 3. Combinar os resultados
+    manifesto_final = []
+    prompts_ativos = [p for p in prompts if p.get("ativo")]
+
+    for i, p in enumerate(prompts_ativos):
+        resposta = respostas_exemplos[i]
+        if isinstance(resposta, httpx.Response) and resposta.status_code == 200:
+            p['examples'] = resposta.json()
+        else:
+            p['examples'] = [] # Garante que a chave 'examples' sempre exista
+        manifesto_final.append(p)
+        
     return manifesto_final
\ No newline at end of file
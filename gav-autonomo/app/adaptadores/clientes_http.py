@@ -0,0 +1,277 @@
+# gav-autonomo/app/adaptadores/clientes_http.py
+
+"""
+Clientes HTTP compartilhados por upstream (api-negocio e Ollama).
+
+Cada upstream tem um cliente síncrono e um assíncrono de longa duração, com
+pool de conexões keep-alive, limites e timeout próprios (vindos do Settings).
+Assim cada chamada reaproveita uma conexão TCP aberta em vez de abrir uma nova.
+Os clientes são fechados no shutdown do FastAPI (lifespan) e expõem
+estatísticas do pool para dimensionamento.
+"""
+
+import importlib.util
+from dataclasses import dataclass
+from typing import Callable
+
+import httpx
+
+from app.config.settings import config
+
+
+@dataclass(frozen=True)
+class ConfigUpstream:
+    base_url: str
+    timeout: float
+    max_conexoes: int
+    max_keepalive: int
+    http2: bool
+
+
+# Hosts do pool de LLM: "ollama" é o primeiro; os demais viram "ollama_1", "ollama_2", ...
+HOSTS_OLLAMA = [h.strip().rstrip("/") for h in (config.OLLAMA_HOSTS or config.OLLAMA_HOST).split(",") if h.strip()]
+
+UPSTREAMS = {
+    "negocio": ConfigUpstream(
+        base_url=config.API_NEGOCIO_URL.rstrip("/"),
+        timeout=config.NEGOCIO_TIMEOUT_SEGUNDOS,
+        max_conexoes=config.NEGOCIO_MAX_CONEXOES,
+        max_keepalive=config.NEGOCIO_MAX_KEEPALIVE,
+        http2=config.NEGOCIO_HTTP2,
+    ),
+    "ollama": ConfigUpstream(
+        base_url=HOSTS_OLLAMA[0],
+        timeout=config.OLLAMA_TIMEOUT_SEGUNDOS,
+        max_conexoes=config.OLLAMA_MAX_CONEXOES,
+        max_keepalive=config.OLLAMA_MAX_KEEPALIVE,
+        http2=config.OLLAMA_HTTP2,
+    ),
+    **{
+        f"ollama_{i}": ConfigUpstream(
+            base_url=host,
+            timeout=config.OLLAMA_TIMEOUT_SEGUNDOS,
+            max_conexoes=config.OLLAMA_MAX_CONEXOES,
+            max_keepalive=config.OLLAMA_MAX_KEEPALIVE,
+            http2=config.OLLAMA_HTTP2,
+        )
+        for i, host in enumerate(HOSTS_OLLAMA[1:], start=1)
+    },
+}
+
+_H2_DISPONIVEL = importlib.util.find_spec("h2") is not None
+
+
+class EstatisticasPool:
+    """Contadores de uso de um pool (um por cliente)."""
+
+    def __init__(self, max_conexoes: int):
+        self.max_conexoes = max_conexoes
+        self.requisicoes = 0
+        self.em_voo = 0
+        self.pico_em_voo = 0
+        self.esperas = 0  # requisições que chegaram com o pool cheio e sem conexão ociosa
+        self._transporte = None
+
+    def _estado_conexoes(self) -> tuple[int, int]:
+        # httpcore não expõe isso publicamente; lê o pool de forma defensiva
+        pool = getattr(self._transporte, "_pool", None)
+        conexoes = list(getattr(pool, "connections", None) or [])
+        return len(conexoes), sum(1 for c in conexoes if c.is_idle())
+
+    def _inicio(self):
+        abertas, ociosas = self._estado_conexoes()
+        if ociosas == 0 and abertas >= self.max_conexoes:
+            self.esperas += 1
+        self.requisicoes += 1
+        self.em_voo += 1
+        self.pico_em_voo = max(self.pico_em_voo, self.em_voo)
+
+    def _fim(self):
+        self.em_voo -= 1
+
+    def resumo(self) -> dict:
+        abertas, ociosas = self._estado_conexoes()
+        return {
+            "conexoes_abertas": abertas,
+            "conexoes_ociosas": ociosas,
+            "max_conexoes": self.max_conexoes,
+            "requisicoes": self.requisicoes,
+            "em_voo": self.em_voo,
+            "pico_em_voo": self.pico_em_voo,
+            "esperas": self.esperas,
+        }
+
+
+class _StreamMedido(httpx.SyncByteStream):
+    """Corpo da resposta que só encerra a requisição (em_voo) quando é fechado."""
+
+    def __init__(self, interno: httpx.SyncByteStream, fim: Callable[[], None]):
+        self._interno = interno
+        self._fim = fim
+        self._fechado = False
+
+    def __iter__(self):
+        yield from self._interno
+
+    def close(self):
+        try:
+            self._interno.close()
+        finally:
+            if not self._fechado:
+                self._fechado = True
+                self._fim()
+
+
+class _StreamMedidoAsync(httpx.AsyncByteStream):
+    """Versão async: streams longos (ex.: /api/generate) contam até o aclose()."""
+
+    def __init__(self, interno: httpx.AsyncByteStream, fim: Callable[[], None]):
+        self._interno = interno
+        self._fim = fim
+        self._fechado = False
+
+    async def __aiter__(self):
+        async for parte in self._interno:
+            yield parte
+
+    async def aclose(self):
+        try:
+            await self._interno.aclose()
+        finally:
+            if not self._fechado:
+                self._fechado = True
+                self._fim()
+
+
+class _TransporteMedido(httpx.BaseTransport):
+    def __init__(self, interno: httpx.HTTPTransport, stats: EstatisticasPool):
+        self._interno = interno
+        self._stats = stats
+        stats._transporte = interno
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats._inicio()
+        try:
+            response = self._interno.handle_request(request)
+        except BaseException:
+            self._stats._fim()
+            raise
+        if response.is_closed:  # corpo já em memória (ex.: MockTransport): nada mais a ler
+            self._stats._fim()
+        else:
+            response.stream = _StreamMedido(response.stream, self._stats._fim)
+        return response
+
+    def close(self):
+        self._interno.close()
+
+
+class _TransporteMedidoAsync(httpx.AsyncBaseTransport):
+    def __init__(self, interno: httpx.AsyncHTTPTransport, stats: EstatisticasPool):
+        self._interno = interno
+        self._stats = stats
+        stats._transporte = interno
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats._inicio()
+        try:
+            response = await self._interno.handle_async_request(request)
+        except BaseException:
+            self._stats._fim()
+            raise
+        if response.is_closed:  # corpo já em memória (ex.: MockTransport): nada mais a ler
+            self._stats._fim()
+        else:
+            response.stream = _StreamMedidoAsync(response.stream, self._stats._fim)
+        return response
+
+    async def aclose(self):
+        await self._interno.aclose()
+
+
+def _parametros_transporte(cfg: ConfigUpstream, nome: str) -> dict:
+    http2 = cfg.http2
+    if http2 and not _H2_DISPONIVEL:
+        print(f"❌ HTTP/2 pedido para '{nome}' mas o pacote h2 não está instalado; usando HTTP/1.1")
+        http2 = False
+    return {
+        "limits": httpx.Limits(
+            max_connections=cfg.max_conexoes,
+            max_keepalive_connections=cfg.max_keepalive,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRACAO,
+        ),
+        "http2": http2,
+    }
+
+
+class GerenciadorClientes:
+    """Dono dos clientes httpx de longa duração, um par (sync/async) por upstream."""
+
+    def __init__(self, upstreams: dict[str, ConfigUpstream]):
+        self.upstreams = upstreams
+        self._sync: dict[str, httpx.Client] = {}
+        self._async: dict[str, httpx.AsyncClient] = {}
+        self._stats: dict[tuple[str, str], EstatisticasPool] = {}
+
+    def cliente(self, upstream: str) -> httpx.Client:
+        cliente = self._sync.get(upstream)
+        if cliente is None or cliente.is_closed:
+            cfg = self.upstreams[upstream]
+            stats = self._stats[(upstream, "sync")] = EstatisticasPool(cfg.max_conexoes)
+            transporte = httpx.HTTPTransport(**_parametros_transporte(cfg, upstream))
+            cliente = httpx.Client(
+                base_url=cfg.base_url,
+                timeout=cfg.timeout,
+                transport=_TransporteMedido(transporte, stats),
+            )
+            self._sync[upstream] = cliente
+        return cliente
+
+    def cliente_async(self, upstream: str) -> httpx.AsyncClient:
+        cliente = self._async.get(upstream)
+        if cliente is None or cliente.is_closed:
+            cfg = self.upstreams[upstream]
+            stats = self._stats[(upstream, "async")] = EstatisticasPool(cfg.max_conexoes)
+            transporte = httpx.AsyncHTTPTransport(**_parametros_transporte(cfg, upstream))
+            cliente = httpx.AsyncClient(
+                base_url=cfg.base_url,
+                timeout=cfg.timeout,
+                transport=_TransporteMedidoAsync(transporte, stats),
+            )
+            self._async[upstream] = cliente
+        return cliente
+
+    async def fechar(self):
+        for cliente in self._async.values():
+            await cliente.aclose()
+        for cliente in self._sync.values():
+            cliente.close()
+        self._async.clear()
+        self._sync.clear()
+
+    def estatisticas(self) -> dict:
+        saida: dict[str, dict] = {}
+        for (upstream, tipo), stats in self._stats.items():
+            saida.setdefault(upstream, {})[tipo] = stats.resumo()
+        return saida
+
+
+gerenciador_clientes = GerenciadorClientes(dict(UPSTREAMS))
+
+
+def obter_cliente(upstream: str) -> httpx.Client:
+    """Cliente síncrono compartilhado do upstream."""
+    return gerenciador_clientes.cliente(upstream)
+
+
+def obter_cliente_async(upstream: str) -> httpx.AsyncClient:
+    """AsyncClient compartilhado do upstream."""
+    return gerenciador_clientes.cliente_async(upstream)
+
+
+async def fechar_clientes():
+    await gerenciador_clientes.fechar()
+
+
+def estatisticas_pools() -> dict:
+    return gerenciador_clientes.estatisticas()
@@ -0,0 +1,63 @@
+# gav-autonomo/app/adaptadores/coalescencia.py
+
+"""
+Single-flight: chamadas concorrentes com a mesma chave compartilham uma só
+execução.
+
+Com o worker frio (ou logo após invalidar um cache), uma rajada de mensagens
+pede o mesmo prompt, os mesmos exemplos e o mesmo contexto à api-negocio ao
+mesmo tempo. Cada grupo (`voo("prompts")`, `voo("contexto")`, ...) guarda a
+task em andamento por chave; quem chega depois aguarda a mesma task.
+
+A execução roda na própria task: se um dos interessados for cancelado, os
+demais continuam recebendo o resultado. Erros também são compartilhados.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self, nome: str, copiar: bool = False):
+        self.nome = nome
+        self.copiar = copiar  # cada interessado recebe sua cópia (resultado mutável)
+        self._em_voo: dict[Hashable, asyncio.Future] = {}
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    async def executar(self, chave: Hashable, fabrica: Callable[[], Awaitable]) -> Any:
+        tarefa = self._em_voo.get(chave)
+        if tarefa is not None:
+            self.coalescidas += 1
+        else:
+            tarefa = asyncio.ensure_future(fabrica())
+            self._em_voo[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_voo.pop(chave, None))
+            self.execucoes += 1
+        resultado = await asyncio.shield(tarefa)
+        return copy.deepcopy(resultado) if self.copiar else resultado
+
+    def estatisticas(self) -> dict:
+        total = self.execucoes + self.coalescidas
+        return {
+            "execucoes": self.execucoes,
+            "coalescidas": self.coalescidas,
+            "em_voo": len(self._em_voo),
+            "taxa_coalescencia": round(self.coalescidas / total, 4) if total else 0.0,
+        }
+
+
+_grupos: dict[str, SingleFlight] = {}
+
+
+def voo(nome: str, copiar: bool = False) -> SingleFlight:
+    """Grupo single-flight compartilhado pelo nome (criado no primeiro uso)."""
+    grupo = _grupos.get(nome)
+    if grupo is None:
+        grupo = _grupos[nome] = SingleFlight(nome, copiar)
+    return grupo
+
+
+def estatisticas() -> dict:
+    return {nome: grupo.estatisticas() for nome, grupo in _grupos.items()}
@@ -1,34 +1,123 @@
-import httpx, json
+import json
+import threading
+from typing import AsyncIterator
 from app.config.settings import config
+from app.adaptadores.clientes_http import obter_cliente
+from app.adaptadores.agendador_llm import agendador_llm, PRIORIDADE_CONTEXTO
+from app.adaptadores.pool_llm import pool_llm
+from app.adaptadores.montagem_prompt import montar_prompt, chave_prompt
+from app.servicos.extrator_json import carregar_json_tolerante
+from app.metricas import etapa, registrar_uso_llm
 
 OLLAMA_URL = config.OLLAMA_HOST.rstrip("/")
 OLLAMA_MODEL = config.OLLAMA_MODEL_NAME.rstrip("/")
 
-def _montar_prompt(sistema: str, entrada_usuario: str, exemplos: list[dict]) -> str:
-    partes = [sistema.strip()]
-    for ex in (exemplos or []):
-        partes.append("Exemplo de entrada:\n" + (ex.get("exemplo_input") or "").strip())
-        partes.append("Exemplo de saída (JSON):\n" + (ex.get("exemplo_output_json") or "").strip())
-    partes.append("Entrada do usuário:\n" + (entrada_usuario or "").strip())
-    return "\n\n".join(partes)
-
-def completar_para_json(sistema: str, entrada_usuario: str, exemplos: list[dict] | None = None, modelo: str | None = None) -> dict:
-    prompt_texto = _montar_prompt(sistema, entrada_usuario, exemplos or [])
-    resp = httpx.post(
-        f"{OLLAMA_URL}/api/generate",
-        json={
-            "model": OLLAMA_MODEL,
-            "prompt": prompt_texto,
-            "format": "json",     # força JSON
-            "stream": False,
-            "options": {"temperature": 0.1}
-        },
-        timeout=60.0
+def _montar_prompt(sistema: str, entrada_usuario: str, exemplos: list[dict], prompt: dict | None = None,
+                   selecionados: list[dict] | None = None) -> str:
+    # Prefixo (sistema + exemplos) memoizado por prompt/versão; só o sufixo muda
+    chave = chave_prompt(prompt)
+    if chave is not None and selecionados is not None:
+        # Prefixo só com o núcleo fixo: a chave distingue do prefixo com todos os exemplos
+        chave = (*chave, tuple(ex.get("id") for ex in exemplos))
+    return montar_prompt(sistema, entrada_usuario, exemplos, chave, selecionados)
+
+def _payload_generate(prompt_texto: str) -> dict:
+    return {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt_texto,
+        "format": "json",     # força JSON
+        "stream": False,
+        "keep_alive": config.OLLAMA_KEEP_ALIVE,  # mantém o modelo (e o KV-cache do prefixo) carregado
+        "options": {"temperature": 0.1}
+    }
+
+class UsoLLM:
+    """Acumula, por prompt, os contadores que o Ollama devolve em cada geração."""
+
+    CAMPOS = ("prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration", "load_duration", "total_duration")
+
+    def __init__(self):
+        self._por_prompt: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nome_prompt: str | None, data: dict):
+        registrar_uso_llm(nome_prompt, data)
+        with self._lock:
+            agregado = self._por_prompt.setdefault(
+                nome_prompt or "desconhecido", {"chamadas": 0, **{c: 0 for c in self.CAMPOS}}
+            )
+            agregado["chamadas"] += 1
+            for campo in self.CAMPOS:
+                agregado[campo] += data.get(campo) or 0
+            agregado["ultima"] = {c: data.get(c) for c in self.CAMPOS}
+
+    def resumo(self) -> dict:
+        saida = {}
+        for nome, agregado in self._por_prompt.items():
+            n = agregado["chamadas"] or 1
+            saida[nome] = {
+                **agregado,
+                "media_prompt_eval_count": round(agregado["prompt_eval_count"] / n, 1),
+                "media_prompt_eval_ms": round(agregado["prompt_eval_duration"] / n / 1e6, 1),
+                "media_eval_ms": round(agregado["eval_duration"] / n / 1e6, 1),
+            }
+        return saida
+
+uso_llm = UsoLLM()
+
+def _extrair_json(data: dict) -> dict:
+    conteudo = data.get("response") or data.get("output") or ""
+    dado = carregar_json_tolerante(conteudo)
+    if dado is None:
+        raise ValueError("LLM não retornou JSON válido. Ajuste o template/exemplos.")
+    return dado
+
+def completar_para_json(sistema: str, entrada_usuario: str, exemplos: list[dict] | None = None, modelo: str | None = None, prompt: dict | None = None) -> dict:
+    prompt_texto = _montar_prompt(sistema, entrada_usuario, exemplos or [], prompt)
+    resp = obter_cliente("ollama").post(
+        "/api/generate",
+        json=_payload_generate(prompt_texto)
     )
     resp.raise_for_status()
     data = resp.json()
-    conteudo = data.get("response") or data.get("output") or ""
-    try:
-        return json.loads(conteudo)
-    except json.JSONDecodeError:
-        raise ValueError("LLM não retornou JSON válido. Ajuste o template/exemplos.")
\ No newline at end of file
+    uso_llm.registrar((prompt or {}).get("nome"), data)
+    return _extrair_json(data)
+
+async def completar_para_json_async(sistema: str, entrada_usuario: str, exemplos: list[dict] | None = None, modelo: str | None = None, prompt: dict | None = None,
+                                    selecionados: list[dict] | None = None, prioridade: int = PRIORIDADE_CONTEXTO) -> dict:
+    """
+    Versão não bloqueante de `completar_para_json` (cliente Ollama compartilhado).
+    `prompt` é o registro vindo da api-negocio: identifica o prefixo a memoizar
+    e o nome usado nas estatísticas de prompt_eval. `selecionados` são exemplos
+    escolhidos para esta entrada, colocados fora do prefixo estável.
+    A geração passa pelo agendador_llm; payloads idênticos em voo são gerados uma vez.
+    O host Ollama (retry, failover, hedge) é escolhido pelo pool_llm.
+    """
+    prompt_texto = _montar_prompt(sistema, entrada_usuario, exemplos or [], prompt, selecionados)
+    payload = _payload_generate(prompt_texto)
+
+    async def _gerar() -> dict:
+        data = await pool_llm.gerar(payload)
+        uso_llm.registrar((prompt or {}).get("nome"), data)
+        return data
+
+    with etapa("llm", (prompt or {}).get("nome")):
+        data = await agendador_llm.executar(_gerar, prioridade, chave=json.dumps(payload, sort_keys=True))
+    return _extrair_json(data)
+
+async def completar_stream_async(sistema: str, entrada_usuario: str, exemplos: list[dict] | None = None, modelo: str | None = None, prompt: dict | None = None,
+                                 prioridade: int = PRIORIDADE_CONTEXTO) -> AsyncIterator[str]:
+    """Gera os fragmentos de texto da resposta à medida que o Ollama os produz."""
+    prompt_texto = _montar_prompt(sistema, entrada_usuario, exemplos or [], prompt)
+    payload = {**_payload_generate(prompt_texto), "stream": True}
+    with etapa("llm_stream", (prompt or {}).get("nome")):
+        async with agendador_llm.vaga(prioridade), pool_llm.stream(payload) as resp:
+            async for linha in resp.aiter_lines():
+                if not linha.strip():
+                    continue
+                data = json.loads(linha)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    uso_llm.registrar((prompt or {}).get("nome"), data)
+                    break
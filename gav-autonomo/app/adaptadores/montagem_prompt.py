@@ -0,0 +1,72 @@
+# gav-autonomo/app/adaptadores/montagem_prompt.py
+
+"""
+Montagem de prompts com prefixo estável.
+
+O template do sistema e os exemplos few-shot de um prompt não mudam entre
+chamadas: o prefixo é montado uma única vez por (prompt, versão) e
+reaproveitado byte a byte. Com o modelo mantido carregado (keep_alive), o
+Ollama reaproveita o KV-cache do maior prefixo em comum com a requisição
+anterior, e só a entrada do usuário (sufixo) é avaliada de novo.
+
+Quando os exemplos são escolhidos por relevância (`seletor_exemplos`), só o
+núcleo fixo entra no prefixo; os selecionados para a mensagem vão no sufixo.
+"""
+
+import threading
+from collections import OrderedDict
+
+SEPARADOR = "\n\n"
+MAX_PREFIXOS = 256
+
+_prefixos: OrderedDict[tuple, str] = OrderedDict()
+_lock = threading.Lock()
+
+
+def chave_prompt(prompt: dict | None) -> tuple | None:
+    """Identidade de um prompt da api-negocio: muda quando ele é editado."""
+    if not prompt or prompt.get("id") is None:
+        return None
+    return (prompt.get("id"), str(prompt.get("versao")), prompt.get("atualizado_em"))
+
+
+def _partes_exemplos(exemplos: list[dict]) -> list[str]:
+    partes = []
+    for ex in (exemplos or []):
+        partes.append("Exemplo de entrada:\n" + (ex.get("exemplo_input") or "").strip())
+        partes.append("Exemplo de saída (JSON):\n" + (ex.get("exemplo_output_json") or "").strip())
+    return partes
+
+
+def _construir_prefixo(sistema: str, exemplos: list[dict]) -> str:
+    return SEPARADOR.join([sistema.strip(), *_partes_exemplos(exemplos)])
+
+
+def montar_prefixo(sistema: str, exemplos: list[dict], chave: tuple | None = None) -> str:
+    """Sistema + exemplos; memoizado por `chave` quando informada."""
+    if chave is None:
+        return _construir_prefixo(sistema, exemplos)
+    with _lock:
+        prefixo = _prefixos.get(chave)
+        if prefixo is not None:
+            _prefixos.move_to_end(chave)
+            return prefixo
+    prefixo = _construir_prefixo(sistema, exemplos)
+    with _lock:
+        _prefixos[chave] = prefixo
+        while len(_prefixos) > MAX_PREFIXOS:
+            _prefixos.popitem(last=False)
+    return prefixo
+
+
+def montar_sufixo(entrada_usuario: str, selecionados: list[dict] | None = None) -> str:
+    return SEPARADOR.join([*_partes_exemplos(selecionados), "Entrada do usuário:\n" + (entrada_usuario or "").strip()])
+
+
+def montar_prompt(sistema: str, entrada_usuario: str, exemplos: list[dict], chave: tuple | None = None,
+                  selecionados: list[dict] | None = None) -> str:
+    return montar_prefixo(sistema, exemplos, chave) + SEPARADOR + montar_sufixo(entrada_usuario, selecionados)
+
+
+def estatisticas() -> dict:
+    return {"prefixos_memoizados": len(_prefixos), "max_prefixos": MAX_PREFIXOS}
@@ -0,0 +1,255 @@
+# gav-autonomo/app/adaptadores/pool_llm.py
+
+"""
+Pool de hosts Ollama para as gerações.
+
+Com OLLAMA_HOSTS listando vários servidores, cada geração vai para o host
+com menos requisições em andamento. Um host sai da rotação quando:
+
+- o health check periódico (GET /api/tags) falha, ou
+- acumula LLM_CIRCUITO_FALHAS falhas seguidas (circuito aberto): fica de fora
+  por LLM_CIRCUITO_ABERTO_SEGUNDOS e depois volta para uma tentativa.
+
+Falhas de conexão, 5xx e 429 são repetidas em outro host conforme o bloco
+`retry` do manifesto (max_tentativas, backoff_segundos). Com `retry.hedge`
+ativo, uma geração que passa do percentil de latência recente é disparada
+também em um segundo host, e vale a primeira resposta. O hedge ocupa uma
+vaga do agendador_llm; sem vaga livre ele não é disparado.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Mapping
+
+import httpx
+
+from app.adaptadores.agendador_llm import agendador_llm
+from app.adaptadores.clientes_http import HOSTS_OLLAMA, obter_cliente_async
+from app.config.manifesto import registro_manifesto
+from app.config.settings import config
+
+
+def _repetivel(erro: Exception) -> bool:
+    if isinstance(erro, httpx.HTTPStatusError):
+        return erro.response.status_code >= 500 or erro.response.status_code == 429
+    return isinstance(erro, httpx.TransportError)
+
+
+class HostLLM:
+    def __init__(self, upstream: str, url: str):
+        self.upstream = upstream
+        self.url = url
+        self.em_voo = 0
+        self.saudavel = True
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+        self.requisicoes = 0
+        self.erros = 0
+
+    def disponivel(self, agora: float) -> bool:
+        return self.saudavel and agora >= self.aberto_ate
+
+    def registrar_sucesso(self):
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+
+    def registrar_falha(self):
+        self.erros += 1
+        self.falhas_seguidas += 1
+        if self.falhas_seguidas >= config.LLM_CIRCUITO_FALHAS:
+            if time.monotonic() >= self.aberto_ate:
+                print(f"❌ Circuito do host LLM {self.url} aberto após {self.falhas_seguidas} falhas")
+            self.aberto_ate = time.monotonic() + config.LLM_CIRCUITO_ABERTO_SEGUNDOS
+
+    def resumo(self) -> dict:
+        return {
+            "url": self.url,
+            "em_voo": self.em_voo,
+            "saudavel": self.saudavel,
+            "circuito_aberto": time.monotonic() < self.aberto_ate,
+            "falhas_seguidas": self.falhas_seguidas,
+            "requisicoes": self.requisicoes,
+            "erros": self.erros,
+        }
+
+
+class PoolLLM:
+    def __init__(self, hosts: list[str]):
+        self.hosts = [HostLLM("ollama" if i == 0 else f"ollama_{i}", url) for i, url in enumerate(hosts)]
+        self._latencias: deque[float] = deque(maxlen=500)  # gerações bem-sucedidas (s)
+        self._tarefa_saude: asyncio.Task | None = None
+        self.repeticoes = 0
+        self.hedges = 0
+        self.hedges_vencedores = 0
+        self.hedges_sem_vaga = 0
+
+    # --- escolha de host ---
+
+    def escolher(self, excluir: set[HostLLM] = frozenset()) -> HostLLM | None:
+        """Host disponível com menos requisições em andamento (ou, se nenhum estiver, qualquer um)."""
+        agora = time.monotonic()
+        candidatos = [h for h in self.hosts if h not in excluir]
+        disponiveis = [h for h in candidatos if h.disponivel(agora)] or candidatos
+        # Empate (comum com pouca carga): o que atendeu menos, para revezar
+        return min(disponiveis, key=lambda h: (h.em_voo, h.requisicoes)) if disponiveis else None
+
+    # --- health check ---
+
+    def iniciar(self):
+        if self._tarefa_saude is None or self._tarefa_saude.done():
+            self._tarefa_saude = asyncio.create_task(self._verificar_saude())
+
+    async def encerrar(self):
+        if self._tarefa_saude is not None:
+            self._tarefa_saude.cancel()
+            try:
+                await self._tarefa_saude
+            except asyncio.CancelledError:
+                pass
+            self._tarefa_saude = None
+
+    async def _verificar_saude(self):
+        while True:
+            await asyncio.gather(*(self._checar(h) for h in self.hosts))
+            await asyncio.sleep(config.LLM_SAUDE_INTERVALO_SEGUNDOS)
+
+    async def _checar(self, host: HostLLM):
+        try:
+            resp = await obter_cliente_async(host.upstream).get("/api/tags", timeout=5.0)
+            saudavel = resp.is_success
+        except Exception:
+            saudavel = False
+        if saudavel != host.saudavel:
+            print(("✅" if saudavel else "❌") + f" Host LLM {host.url} {'voltou' if saudavel else 'falhou no health check'}")
+        host.saudavel = saudavel
+
+    # --- geração ---
+
+    def _politica(self) -> tuple[int, float, Mapping]:
+        cfg = registro_manifesto.obter().secao("retry", {})
+        return max(1, int(cfg.get("max_tentativas", 1))), float(cfg.get("backoff_segundos", 0)), cfg.get("hedge", {})
+
+    def _atraso_hedge(self, cfg_hedge: Mapping) -> float | None:
+        if not cfg_hedge.get("ativo") or len(self.hosts) < 2 or len(self._latencias) < cfg_hedge.get("min_amostras", 20):
+            return None
+        ordenadas = sorted(self._latencias)
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * cfg_hedge.get("percentil", 0.95)))]
+
+    async def _requisitar(self, host: HostLLM, payload: dict) -> dict:
+        host.em_voo += 1
+        host.requisicoes += 1
+        inicio = time.perf_counter()
+        try:
+            resp = await obter_cliente_async(host.upstream).post("/api/generate", json=payload)
+            resp.raise_for_status()
+            data = resp.json()
+        except asyncio.CancelledError:
+            raise  # perdeu o hedge: não conta como falha do host
+        except Exception:
+            host.registrar_falha()
+            raise
+        finally:
+            host.em_voo -= 1
+        host.registrar_sucesso()
+        self._latencias.append(time.perf_counter() - inicio)
+        return data
+
+    async def _com_hedge(self, host: HostLLM, payload: dict, cfg_hedge: Mapping) -> dict:
+        atraso = self._atraso_hedge(cfg_hedge)
+        primeira = asyncio.ensure_future(self._requisitar(host, payload))
+        if atraso is None:
+            return await primeira
+
+        pendentes = {primeira}
+        try:
+            feitas, pendentes = await asyncio.wait(pendentes, timeout=atraso)
+            reserva = None if feitas else self.escolher(excluir={host})
+            if reserva is None:
+                return await primeira
+            # A chamada original já tem sua vaga; a segunda não pode passar do limite do agendador
+            if not agendador_llm.tentar_vaga():
+                self.hedges_sem_vaga += 1
+                return await primeira
+            self.hedges += 1
+            segunda = asyncio.ensure_future(self._requisitar(reserva, payload))
+            segunda.add_done_callback(lambda _: agendador_llm.liberar_vaga())
+            pendentes.add(segunda)
+            erro: Exception | None = None
+            while pendentes:
+                feitas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in feitas:
+                    if tarefa.exception() is None:
+                        if tarefa is segunda:
+                            self.hedges_vencedores += 1
+                        return tarefa.result()
+                    erro = tarefa.exception()
+            raise erro
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+
+    async def gerar(self, payload: dict) -> dict:
+        """POST /api/generate (sem stream) com escolha de host, retry e hedge."""
+        tentativas, backoff, cfg_hedge = self._politica()
+        falharam: set[HostLLM] = set()
+        for tentativa in range(tentativas):
+            host = self.escolher(excluir=falharam) or self.escolher()
+            try:
+                return await self._com_hedge(host, payload, cfg_hedge)
+            except Exception as e:
+                if not _repetivel(e) or tentativa == tentativas - 1:
+                    raise
+                print(f"❌ Geração falhou em {host.url} ({e}); tentando de novo")
+                falharam.add(host)
+                self.repeticoes += 1
+                await asyncio.sleep(backoff * 2 ** tentativa)
+
+    @asynccontextmanager
+    async def stream(self, payload: dict) -> AsyncIterator[httpx.Response]:
+        """
+        POST /api/generate em stream. Só a abertura (antes do primeiro byte) é
+        repetida em outro host; depois disso o erro sobe para quem consome.
+        """
+        tentativas, backoff, _ = self._politica()
+        falharam: set[HostLLM] = set()
+        for tentativa in range(tentativas):
+            host = self.escolher(excluir=falharam) or self.escolher()
+            host.em_voo += 1
+            host.requisicoes += 1
+            try:
+                async with AsyncExitStack() as pilha:
+                    try:
+                        resp = await pilha.enter_async_context(
+                            obter_cliente_async(host.upstream).stream("POST", "/api/generate", json=payload)
+                        )
+                        resp.raise_for_status()
+                    except Exception as e:
+                        host.registrar_falha()
+                        if not _repetivel(e) or tentativa == tentativas - 1:
+                            raise
+                        print(f"❌ Stream falhou em {host.url} ({e}); tentando de novo")
+                        falharam.add(host)
+                        self.repeticoes += 1
+                    else:
+                        yield resp
+                        host.registrar_sucesso()
+                        return
+            finally:
+                host.em_voo -= 1
+            await asyncio.sleep(backoff * 2 ** tentativa)
+
+    def estatisticas(self) -> dict:
+        ordenadas = sorted(self._latencias)
+        return {
+            "hosts": {h.upstream: h.resumo() for h in self.hosts},
+            "repeticoes": self.repeticoes,
+            "hedges": self.hedges,
+            "hedges_vencedores": self.hedges_vencedores,
+            "hedges_sem_vaga": self.hedges_sem_vaga,
+            "p95_ms": round(ordenadas[int(len(ordenadas) * 0.95)] * 1000, 1) if ordenadas else 0.0,
+        }
+
+
+pool_llm = PoolLLM(HOSTS_OLLAMA)
@@ -3,34 +3,144 @@
 """
 Módulo de Cache.
 
-Este módulo implementa um cache simples em memória para armazenar os prompts
-e exemplos carregados da api-negocio. O objetivo é evitar requisições HTTP
-repetitivas a cada interação do usuário, melhorando drasticamente a performance.
+Este módulo implementa um cache em memória para os prompts e exemplos
+carregados da api-negocio. O objetivo é evitar requisições HTTP repetitivas a
+cada interação do usuário, melhorando drasticamente a performance.
+
+Cada entrada é indexada por (nome, espaco, versao) e guarda o prompt junto com
+seus exemplos ativos. O cache é aquecido na inicialização com
+`buscar_manifesto_completo`; depois que o TTL expira, a entrada é revalidada
+com uma única chamada ao prompt e os exemplos só são buscados de novo se a
+api-negocio reportar um `atualizado_em` diferente. Faltas e revalidações
+simultâneas da mesma chave compartilham uma só carga (single-flight).
 """
 
-# O dicionário que atuará como nosso cache em memória.
-# A estrutura será:
-# {
-#   "id_do_prompt": {
-#     "prompt": "Texto do prompt...",
-#     "examples": [
-#       {"input": "...", "output": "..."}
-#     ]
-#   }
-# }
-prompts_cache = {}
-
-def get_prompt_from_cache(prompt_id: str) -> dict | None:
-    """Busca um prompt completo (com exemplos) do cache."""
-    return prompts_cache.get(prompt_id)
-
-def set_prompts_in_cache(prompts_data: list[dict]):
-    """
-    Popula o cache com os dados vindos da api-negocio.
-
-    Espera-se que prompts_data seja uma lista de dicionários,
-    onde cada dicionário contém o prompt e seus exemplos.
-    """
-    global prompts_cache
-    prompts_cache = {str(item['id']): item for item in prompts_data}
-    print(f"Cache populado com {len(prompts_cache)} prompts.")
\ No newline at end of file
+import threading
+import time
+from dataclasses import dataclass
+
+from app.adaptadores.cliente_negocio import (
+    obter_prompt_por_nome_async, listar_exemplos_prompt_async, buscar_manifesto_completo,
+)
+from app.adaptadores.coalescencia import voo
+from app.config.settings import config
+from app.metricas import etapa
+
+
+@dataclass(frozen=True)
+class PromptEmCache:
+    prompt: dict
+    exemplos: list[dict]
+    atualizado_em: str | None
+    carregado_em: float  # time.monotonic() da última validação
+
+
+def _chave(nome: str, espaco: str, versao) -> tuple[str, str, str]:
+    # A versão chega como int do manifesto e como str/int da API: normaliza
+    return (nome, espaco, str(versao))
+
+
+class CachePrompts:
+    def __init__(self, ttl_segundos: float):
+        self.ttl_segundos = ttl_segundos
+        self._itens: dict[tuple[str, str, str], PromptEmCache] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.revalidacoes = 0
+        self.invalidacoes = 0
+
+    async def obter(self, nome: str, espaco: str = "autonomo", versao=1) -> PromptEmCache:
+        """Retorna prompt + exemplos, indo à api-negocio só em falta ou TTL vencido."""
+        chave = _chave(nome, espaco, versao)
+        item = self._itens.get(chave)
+
+        if item is not None and time.monotonic() - item.carregado_em < self.ttl_segundos:
+            self.acertos += 1
+            return item
+
+        if item is not None:
+            return await voo("cache_prompts").executar(chave, lambda: self._revalidar(chave, item))
+
+        self.faltas += 1
+        return await voo("cache_prompts").executar(chave, lambda: self._carregar(chave))
+
+    async def _carregar(self, chave: tuple[str, str, str]) -> PromptEmCache:
+        nome, espaco, versao = chave
+        prompt = await obter_prompt_por_nome_async(nome=nome, espaco=espaco, versao=versao)
+        return self._guardar(chave, prompt, await listar_exemplos_prompt_async(prompt["id"]))
+
+    async def _revalidar(self, chave: tuple[str, str, str], item: PromptEmCache) -> PromptEmCache:
+        nome, espaco, versao = chave
+        self.revalidacoes += 1
+        try:
+            prompt = await obter_prompt_por_nome_async(nome=nome, espaco=espaco, versao=versao)
+        except Exception as e:
+            # api-negocio fora do ar: segue com a versão que já temos
+            print(f"❌ Revalidação do prompt {nome} falhou, usando cache: {e}")
+            return item
+
+        if prompt.get("id") == item.prompt.get("id") and prompt.get("atualizado_em") == item.atualizado_em:
+            return self._guardar(chave, prompt, item.exemplos)
+
+        self.invalidacoes += 1
+        print(f"ℹ️ Prompt {nome} atualizado na api-negocio, recarregando exemplos")
+        return self._guardar(chave, prompt, await listar_exemplos_prompt_async(prompt["id"]))
+
+    def _guardar(self, chave: tuple[str, str, str], prompt: dict, exemplos: list[dict]) -> PromptEmCache:
+        item = PromptEmCache(
+            prompt=prompt,
+            exemplos=exemplos,
+            atualizado_em=prompt.get("atualizado_em"),
+            carregado_em=time.monotonic(),
+        )
+        with self._lock:
+            self._itens[chave] = item
+        return item
+
+    def popular(self, prompts_data: list[dict]):
+        """
+        Popula o cache com os dados vindos de `buscar_manifesto_completo`:
+        uma lista de prompts, cada um com a chave 'examples'.
+        """
+        for p in prompts_data:
+            if not p.get("espaco"):
+                continue  # sem espaco não dá para montar a chave
+            self._guardar(_chave(p["nome"], p["espaco"], p["versao"]), p, p.get("examples", []))
+        print(f"Cache populado com {len(self._itens)} prompts.")
+
+    async def aquecer(self):
+        """Carrega todos os prompts ativos de uma vez (chamado no startup)."""
+        try:
+            self.popular(await buscar_manifesto_completo())
+        except Exception as e:
+            print(f"❌ Não foi possível aquecer o cache de prompts: {e}")
+
+    def invalidar(self, nome: str | None = None):
+        """Remove um prompt (todas as versões/espaços) ou o cache inteiro."""
+        with self._lock:
+            if nome is None:
+                self._itens.clear()
+            else:
+                for chave in [c for c in self._itens if c[0] == nome]:
+                    del self._itens[chave]
+
+    def estatisticas(self) -> dict:
+        return {
+            "itens": len(self._itens),
+            "ttl_segundos": self.ttl_segundos,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "revalidacoes": self.revalidacoes,
+            "invalidacoes": self.invalidacoes,
+        }
+
+
+prompts_cache = CachePrompts(ttl_segundos=config.PROMPTS_CACHE_TTL_SEGUNDOS)
+
+
+async def obter_prompt_e_exemplos(nome: str, espaco: str = "autonomo", versao=1) -> tuple[dict, list[dict]]:
+    """Atalho usado pelo executor: (prompt, exemplos) a partir do cache."""
+    with etapa("prompt_cache", nome):
+        item = await prompts_cache.obter(nome, espaco, versao)
+    return item.prompt, item.exemplos
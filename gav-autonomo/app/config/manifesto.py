@@ -0,0 +1,201 @@
+# gav-autonomo/app/config/manifesto.py
+
+"""
+Registro do manifesto de regras (model_manifest.yml).
+
+O manifesto é lido e compilado uma única vez: as regras viram uma tabela
+imutável indexada por `action` e por `id`, com os schemas já resolvidos.
+Quando o arquivo muda no disco (mtime), uma nova versão é compilada e trocada
+atomicamente — requisições em andamento continuam com a versão que já pegaram.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import yaml
+
+from app.config.settings import config
+from app.validadores.modelos import registro_schemas
+
+CAMINHO_MANIFESTO = Path(__file__).resolve().parent / "model_manifest.yml"
+
+
+def _congelar(valor: Any) -> Any:
+    """Converte dicts/listas do YAML em estruturas somente-leitura."""
+    if isinstance(valor, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in valor.items()})
+    if isinstance(valor, list):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def descongelar(valor: Any) -> Any:
+    """Inverso de `_congelar`, para serializar em JSON."""
+    if isinstance(valor, Mapping):
+        return {k: descongelar(v) for k, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [descongelar(v) for v in valor]
+    return valor
+
+
+@dataclass(frozen=True)
+class RegraCompilada:
+    id: str
+    action: str
+    prompt: str | None
+    espaco_prompt: str | None
+    versao_prompt: Any
+    schema: dict | None          # schema já carregado e compilado no registro_schemas
+    bruta: Mapping[str, Any]     # regra original (somente-leitura)
+
+
+@dataclass(frozen=True)
+class ManifestoCompilado:
+    versao: Any
+    hash: str
+    mtime_ns: int
+    carregado_em: datetime
+    defaults: Mapping[str, Any]
+    regras: tuple[RegraCompilada, ...]
+    regras_por_action: Mapping[str, tuple[RegraCompilada, ...]]
+    regras_por_id: Mapping[str, RegraCompilada]
+    secoes: Mapping[str, Any]    # demais blocos do YAML (retry, reparo_automatico, ...)
+
+    def primeira_regra(self, action: str) -> RegraCompilada | None:
+        regras = self.regras_por_action.get(action)
+        return regras[0] if regras else None
+
+    def secao(self, nome: str, padrao: Any = None) -> Any:
+        return self.secoes.get(nome, padrao)
+
+    def resumo(self) -> dict:
+        return {
+            "versao": self.versao,
+            "hash": self.hash,
+            "carregado_em": self.carregado_em.isoformat(),
+            "regras": [{"id": r.id, "action": r.action, "prompt": r.prompt} for r in self.regras],
+            "secoes": sorted(self.secoes.keys()),
+        }
+
+
+def compilar_manifesto(conteudo: bytes, mtime_ns: int = 0) -> ManifestoCompilado:
+    """Faz o parse do YAML e monta a tabela de regras imutável."""
+    manifesto = yaml.safe_load(conteudo) or {}
+
+    regras = []
+    for i, regra in enumerate(manifesto.get("regras") or []):
+        schema_ref = regra.get("schema")
+        regras.append(RegraCompilada(
+            id=str(regra.get("id") or f"regra_{i}"),
+            action=regra["action"],
+            prompt=regra.get("prompt"),
+            espaco_prompt=regra.get("espaco_prompt"),
+            versao_prompt=regra.get("versao_prompt"),
+            schema=registro_schemas.obter(schema_ref).schema if schema_ref is not None else None,
+            bruta=_congelar(regra),
+        ))
+
+    por_action: dict[str, list[RegraCompilada]] = {}
+    for regra in regras:
+        por_action.setdefault(regra.action, []).append(regra)
+
+    secoes = {k: v for k, v in manifesto.items() if k not in ("versao", "defaults", "regras")}
+
+    return ManifestoCompilado(
+        versao=manifesto.get("versao"),
+        hash=hashlib.sha256(conteudo).hexdigest()[:12],
+        mtime_ns=mtime_ns,
+        carregado_em=datetime.now(timezone.utc),
+        defaults=_congelar(manifesto.get("defaults") or {}),
+        regras=tuple(regras),
+        regras_por_action=MappingProxyType({k: tuple(v) for k, v in por_action.items()}),
+        regras_por_id=MappingProxyType({r.id: r for r in regras}),
+        secoes=_congelar(secoes),
+    )
+
+
+class RegistroManifesto:
+    """
+    Mantém o manifesto compilado ativo e o recarrega quando o arquivo muda.
+
+    A verificação de mtime é feita no máximo a cada `intervalo_verificacao`
+    segundos, dentro de `obter()` — não há thread de observação.
+    """
+
+    def __init__(self, caminho: Path = CAMINHO_MANIFESTO, intervalo_verificacao: float = 2.0):
+        self.caminho = Path(caminho)
+        self.intervalo_verificacao = intervalo_verificacao
+        self.recargas = 0
+        self.ultimo_erro: str | None = None
+        self._atual: ManifestoCompilado | None = None
+        self._ultima_verificacao = 0.0
+        self._lock = threading.Lock()
+
+    def carregar(self) -> ManifestoCompilado:
+        """Força a leitura do arquivo e troca a versão ativa."""
+        with self._lock:
+            self._ultima_verificacao = time.monotonic()
+            return self._recompilar(os.stat(self.caminho).st_mtime_ns)
+
+    def obter(self) -> ManifestoCompilado:
+        """Retorna o manifesto ativo, recompilando se o arquivo foi alterado."""
+        if self._atual is None or time.monotonic() - self._ultima_verificacao >= self.intervalo_verificacao:
+            self._verificar_alteracao()
+        return self._atual
+
+    def _verificar_alteracao(self):
+        with self._lock:
+            agora = time.monotonic()
+            if self._atual is not None and agora - self._ultima_verificacao < self.intervalo_verificacao:
+                return  # outra thread acabou de verificar
+            self._ultima_verificacao = agora
+
+            try:
+                mtime_ns = os.stat(self.caminho).st_mtime_ns
+            except OSError as e:
+                if self._atual is None:
+                    raise
+                self.ultimo_erro = f"Manifesto inacessível: {e}"
+                print(f"❌ {self.ultimo_erro}")
+                return
+
+            if self._atual is not None and mtime_ns == self._atual.mtime_ns:
+                return
+
+            try:
+                self._recompilar(mtime_ns)
+            except Exception as e:
+                if self._atual is None:
+                    raise
+                # Mantém a versão anterior se a nova não compilar
+                self.ultimo_erro = f"Falha ao recarregar manifesto: {e}"
+                print(f"❌ {self.ultimo_erro}")
+
+    def _recompilar(self, mtime_ns: int) -> ManifestoCompilado:
+        novo = compilar_manifesto(self.caminho.read_bytes(), mtime_ns)
+        anterior = self._atual
+        self._atual = novo  # troca atômica da referência
+        self.ultimo_erro = None
+        if anterior is not None:
+            self.recargas += 1
+            print(f"✅ Manifesto recarregado: versao={novo.versao} hash={novo.hash}")
+        return novo
+
+    def status(self) -> dict:
+        manifesto = self.obter()
+        return {
+            **manifesto.resumo(),
+            "caminho": str(self.caminho),
+            "recargas": self.recargas,
+            "ultimo_erro": self.ultimo_erro,
+        }
+
+
+registro_manifesto = RegistroManifesto(intervalo_verificacao=config.MANIFESTO_INTERVALO_VERIFICACAO)
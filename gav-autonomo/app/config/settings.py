@@ -9,6 +9,37 @@ class Settings(BaseSettings):
     OLLAMA_TEMPERATURE: float = 0.1
     OLLAMA_MAX_TOKENS: int = 1024
     OLLAMA_JSON_MODE: bool = True
+    OLLAMA_KEEP_ALIVE: str = "30m"  # mantém o modelo carregado entre chamadas (reuso do KV-cache do prefixo)
+    MANIFESTO_INTERVALO_VERIFICACAO: float = 2.0  # segundos entre checagens de mtime do manifesto
+    PROMPTS_CACHE_TTL_SEGUNDOS: float = 300.0     # após o TTL o prompt é revalidado por atualizado_em
+
+    # Pools HTTP (app/adaptadores/clientes_http.py)
+    HTTP_KEEPALIVE_EXPIRACAO: float = 30.0
+    NEGOCIO_TIMEOUT_SEGUNDOS: float = 15.0
+    NEGOCIO_MAX_CONEXOES: int = 50
+    NEGOCIO_MAX_KEEPALIVE: int = 20
+    NEGOCIO_HTTP2: bool = False
+    OLLAMA_TIMEOUT_SEGUNDOS: float = 60.0
+    OLLAMA_MAX_CONEXOES: int = 20
+    OLLAMA_MAX_KEEPALIVE: int = 10
+    OLLAMA_HTTP2: bool = False
+    OLLAMA_NUM_PARALLEL: int = 4  # gerações simultâneas por host (igual ao do servidor Ollama); 0 = sem limite
+
+    # Pool de hosts Ollama (app/adaptadores/pool_llm.py)
+    OLLAMA_HOSTS: str = ""                     # URLs separadas por vírgula; vazio = só OLLAMA_HOST
+    LLM_SAUDE_INTERVALO_SEGUNDOS: float = 10.0  # health check (GET /api/tags) de cada host
+    LLM_CIRCUITO_FALHAS: int = 3               # falhas seguidas que abrem o circuito do host
+    LLM_CIRCUITO_ABERTO_SEGUNDOS: float = 30.0  # tempo fora da rotação antes de uma nova tentativa
+
+    # Fila write-behind do contexto de sessão (app/servicos/fila_contexto.py)
+    CONTEXTO_FILA_INTERVALO: float = 0.05       # espera para agrupar gravações da mesma sessão
+    CONTEXTO_FILA_MAX_TENTATIVAS: int = 5
+    CONTEXTO_FILA_BACKOFF_SEGUNDOS: float = 0.5
+    CONTEXTO_FILA_MAX_CONCORRENCIA: int = 10
+
+    # Cache do contexto de sessão (app/servicos/cache_contexto.py)
+    CONTEXTO_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    CONTEXTO_CACHE_TTL_OCIOSO_SEGUNDOS: float = 1800.0
     
     class Config:
         env_file = ".env"
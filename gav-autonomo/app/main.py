@@ -1,18 +1,157 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import json
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
-from app.servicos.executor_regras import executar_regras_do_manifesto
+from app.config.manifesto import registro_manifesto
+from app.cache import prompts_cache
+from app.servicos.cache_decisoes import cache_decisoes
+from app.servicos.pre_roteador import pre_roteador
+from app.servicos.seletor_exemplos import seletor_exemplos
+from app.servicos.fila_contexto import fila_contexto
+from app.servicos.cache_contexto import cache_contexto
+from app.servicos.especulacao import especulador
+from app.servicos.motor_reparo import motor_reparo
+from app.adaptadores.clientes_http import fechar_clientes, estatisticas_pools
+from app.adaptadores.interface_llm import uso_llm
+from app.adaptadores.agendador_llm import agendador_llm
+from app.adaptadores.pool_llm import pool_llm
+from app.adaptadores import montagem_prompt, coalescencia
+from app.metricas import coletor_estatisticas, iniciar_rastro, cabecalho_timings
+from app.servicos.projecao import estatisticas_projecao
+from app.servicos.templates_apresentacao import motor_templates
+from app.servicos.executor_regras import executar_regras_do_manifesto, executar_regras_do_manifesto_stream
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compila o manifesto na inicialização (falha cedo se estiver inválido)
+    manifesto = registro_manifesto.carregar()
+    print(f"Manifesto carregado: versao={manifesto.versao} hash={manifesto.hash}")
+    await prompts_cache.aquecer()
+    fila_contexto.iniciar()
+    pool_llm.iniciar()
+    yield
+    await pool_llm.encerrar()
+    await fila_contexto.encerrar()  # grava os contextos pendentes antes de fechar os clientes
+    await fechar_clientes()
+
+app = FastAPI(lifespan=lifespan)
+
+for _nome, _fonte in {
+    "cache_prompts": prompts_cache.estatisticas,
+    "cache_decisoes": cache_decisoes.estatisticas,
+    "pre_roteador": pre_roteador.estatisticas,
+    "selecao_exemplos": seletor_exemplos.estatisticas,
+    "agendador_llm": agendador_llm.estatisticas,
+    "pool_llm": pool_llm.estatisticas,
+    "fila_contexto": fila_contexto.estatisticas,
+    "cache_contexto": cache_contexto.estatisticas,
+    "pools_http": estatisticas_pools,
+    "projecao": estatisticas_projecao.resumo,
+    "templates_apresentacao": motor_templates.estatisticas,
+    "especulacao": especulador.estatisticas,
+    "reparo": motor_reparo.estatisticas,
+    "coalescencia": coalescencia.estatisticas,
+}.items():
+    coletor_estatisticas.registrar_fonte(_nome, _fonte)
+
+@app.middleware("http")
+async def detalhar_tempos(request: Request, call_next):
+    """Com o header X-GAV-Debug, devolve o tempo de cada etapa em X-GAV-Timings."""
+    if not request.headers.get("x-gav-debug"):
+        return await call_next(request)
+    rastro, _ = iniciar_rastro()
+    response = await call_next(request)
+    # Em /chat/stream as etapas do Apresentador ainda não aconteceram neste ponto
+    response.headers["X-GAV-Timings"] = cabecalho_timings(rastro)
+    return response
+
+@app.get("/metrics")
+async def metricas():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/ping")
 async def ping():
     return {"status": "ok"}
 
+@app.get("/admin/manifest")
+async def status_manifesto():
+    return registro_manifesto.status()
+
+@app.get("/admin/http/pools")
+async def status_pools_http():
+    return estatisticas_pools()
+
+@app.get("/admin/llm")
+async def status_llm():
+    return {
+        "uso_por_prompt": uso_llm.resumo(),
+        "prefixos": montagem_prompt.estatisticas(),
+        "agendador": agendador_llm.estatisticas(),
+        "pool": pool_llm.estatisticas(),
+        "projecoes": estatisticas_projecao.resumo(),
+        "templates": motor_templates.estatisticas(),
+    }
+
+@app.get("/admin/pre-roteador")
+async def status_pre_roteador():
+    return pre_roteador.estatisticas()
+
+@app.get("/admin/exemplos")
+async def status_selecao_exemplos():
+    return seletor_exemplos.estatisticas()
+
+@app.get("/admin/especulacao")
+async def status_especulacao():
+    return especulador.estatisticas()
+
+@app.get("/admin/reparo")
+async def status_reparo():
+    return motor_reparo.estatisticas()
+
+@app.get("/admin/contexto")
+async def status_contexto():
+    return {"fila": fila_contexto.estatisticas(), "cache": cache_contexto.estatisticas()}
+
+@app.get("/admin/cache")
+async def status_caches():
+    return {
+        "prompts": prompts_cache.estatisticas(),
+        "decisoes": cache_decisoes.estatisticas(),
+        "coalescencia": coalescencia.estatisticas(),
+    }
+
+@app.post("/admin/cache/prompts/invalidar")
+async def invalidar_cache_prompts(nome: str | None = None):
+    prompts_cache.invalidar(nome)
+    return {"status": "cache invalidado", "nome": nome}
+
 class EntradaChat(BaseModel):
     texto: str
     sessao_id: str
 
 @app.post("/chat")
 async def receber_mensagem(body: EntradaChat):
-    saida = executar_regras_do_manifesto(body.model_dump())
-    return saida
\ No newline at end of file
+    saida = await executar_regras_do_manifesto(body.model_dump())
+    return saida
+
+@app.post("/chat/stream")
+async def receber_mensagem_stream(body: EntradaChat):
+    """
+    Server-sent events: `event: token` com pedaços do texto do Apresentador e
+    um `event: fim` com a resposta completa (incluindo dados_originais).
+    """
+    async def eventos():
+        async for evento in executar_regras_do_manifesto_stream(body.model_dump()):
+            if evento["evento"] == "token":
+                dados = {"texto": evento["texto"]}
+            else:
+                dados = evento["resposta"]
+            yield f"event: {evento['evento']}\ndata: {json.dumps(dados, ensure_ascii=False, default=str)}\n\n"
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,196 @@
+# gav-autonomo/app/metricas.py
+
+"""
+Métricas e rastreamento por etapa.
+
+Cada mensagem passa por várias etapas (prompt do cache, pré-roteador, LLM
+Selector, api-negocio, contexto, Apresentador, reparo). `etapa()` mede cada
+uma, alimenta os histogramas Prometheus expostos em /metrics e, se houver um
+rastro ativo (contextvar da requisição), guarda a duração para o detalhamento
+devolvido no header X-GAV-Timings (requisições com X-GAV-Debug).
+
+As estatísticas que os módulos já mantêm (`estatisticas()` dos caches,
+agendador, fila de contexto, ...) são exportadas como gauges por um coletor:
+os contadores do primeiro nível viram `gav_<fonte>_<chave>` (nomes definidos
+no código); os detalhamentos aninhados (por prompt, template, host, grupo...),
+cujas chaves vêm do manifesto e da configuração, ficam numa única família
+`gav_estatistica_detalhe{fonte, grupo, chave}`.
+"""
+
+import json
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+BALDES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+DURACAO_ETAPA = Histogram(
+    "gav_etapa_duracao_segundos", "Duração de cada etapa do pipeline",
+    ["etapa", "prompt"], buckets=BALDES_SEGUNDOS,
+)
+DURACAO_CHAT = Histogram(
+    "gav_chat_duracao_segundos", "Duração total de uma mensagem, por ferramenta e endpoint decididos",
+    ["tool_name", "endpoint"], buckets=BALDES_SEGUNDOS,
+)
+DURACAO_API_NEGOCIO = Histogram(
+    "gav_api_negocio_duracao_segundos", "Chamadas à api-negocio decididas pelo Selector",
+    ["endpoint", "method"], buckets=BALDES_SEGUNDOS,
+)
+TOKENS_LLM = Counter("gav_llm_tokens_total", "Tokens avaliados/gerados pelo Ollama", ["prompt", "tipo"])
+DURACAO_PROMPT_EVAL = Histogram(
+    "gav_llm_prompt_eval_segundos", "prompt_eval_duration informado pelo Ollama", ["prompt"], buckets=BALDES_SEGUNDOS,
+)
+DURACAO_EVAL = Histogram(
+    "gav_llm_eval_segundos", "eval_duration (geração) informado pelo Ollama", ["prompt"], buckets=BALDES_SEGUNDOS,
+)
+
+
+@dataclass
+class Rastro:
+    inicio: float = field(default_factory=time.perf_counter)
+    etapas: list[dict] = field(default_factory=list)
+    llm: list[dict] = field(default_factory=list)
+    tool_name: str = ""
+    endpoint: str = ""
+
+    def finalizar(self):
+        DURACAO_CHAT.labels(tool_name=self.tool_name or "nenhuma", endpoint=self.endpoint or "nenhum").observe(
+            time.perf_counter() - self.inicio
+        )
+
+    def resumo(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.inicio) * 1000, 1),
+            "tool_name": self.tool_name,
+            "endpoint": self.endpoint,
+            "etapas": self.etapas,
+            "llm": self.llm,
+        }
+
+
+_rastro: ContextVar[Rastro | None] = ContextVar("rastro_gav", default=None)
+
+
+def rastro_atual() -> Rastro | None:
+    return _rastro.get()
+
+
+def iniciar_rastro() -> tuple[Rastro, bool]:
+    """Retorna o rastro da requisição (criando se preciso) e se ele foi criado agora."""
+    rastro = _rastro.get()
+    if rastro is not None:
+        return rastro, False
+    rastro = Rastro()
+    _rastro.set(rastro)
+    return rastro, True
+
+
+def descartar_rastro():
+    _rastro.set(None)
+
+
+def registrar_etapa(nome: str, segundos: float, prompt: str | None = None):
+    DURACAO_ETAPA.labels(etapa=nome, prompt=prompt or "").observe(segundos)
+    rastro = _rastro.get()
+    if rastro is not None:
+        item = {"etapa": nome, "ms": round(segundos * 1000, 1)}
+        if prompt:
+            item["prompt"] = prompt
+        rastro.etapas.append(item)
+
+
+@contextmanager
+def etapa(nome: str, prompt: str | None = None):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_etapa(nome, time.perf_counter() - inicio, prompt)
+
+
+def rotulo_endpoint(endpoint: str | None, conhecidos) -> str:
+    """O endpoint vem do LLM: só templates conhecidos viram rótulo, o resto é "outro"."""
+    if not endpoint:
+        return ""
+    return endpoint if endpoint in conhecidos else "outro"
+
+
+def registrar_decisao(tool_name: str | None, endpoint: str | None):
+    """Rótulos da requisição: endpoint como template (ex.: /carrinhos/{sessao_id})."""
+    rastro = _rastro.get()
+    if rastro is not None:
+        rastro.tool_name = tool_name or ""
+        rastro.endpoint = endpoint or ""
+
+
+def registrar_uso_llm(prompt: str | None, data: dict):
+    prompt = prompt or "desconhecido"
+    TOKENS_LLM.labels(prompt=prompt, tipo="prompt_eval").inc(data.get("prompt_eval_count") or 0)
+    TOKENS_LLM.labels(prompt=prompt, tipo="eval").inc(data.get("eval_count") or 0)
+    if data.get("prompt_eval_duration"):
+        DURACAO_PROMPT_EVAL.labels(prompt=prompt).observe(data["prompt_eval_duration"] / 1e9)
+    if data.get("eval_duration"):
+        DURACAO_EVAL.labels(prompt=prompt).observe(data["eval_duration"] / 1e9)
+    rastro = _rastro.get()
+    if rastro is not None:
+        rastro.llm.append({
+            "prompt": prompt,
+            "prompt_eval_count": data.get("prompt_eval_count"),
+            "eval_count": data.get("eval_count"),
+            "prompt_eval_ms": round((data.get("prompt_eval_duration") or 0) / 1e6, 1),
+            "eval_ms": round((data.get("eval_duration") or 0) / 1e6, 1),
+        })
+
+
+def cabecalho_timings(rastro: Rastro) -> str:
+    return json.dumps(rastro.resumo(), ensure_ascii=True, separators=(",", ":"))
+
+
+class ColetorEstatisticas:
+    """Exporta como gauges os valores numéricos dos `estatisticas()` já existentes."""
+
+    def __init__(self):
+        self._fontes: dict[str, Callable[[], dict]] = {}
+
+    def registrar_fonte(self, nome: str, fn: Callable[[], dict]):
+        self._fontes[nome] = fn
+
+    def collect(self):
+        detalhe = GaugeMetricFamily(
+            "gav_estatistica_detalhe", "Detalhamentos aninhados dos estatisticas()", labels=["fonte", "grupo", "chave"]
+        )
+        for fonte, fn in self._fontes.items():
+            try:
+                valores = fn()
+            except Exception as e:
+                print(f"❌ Falha ao coletar estatísticas de {fonte}: {e}")
+                continue
+            for grupo, chave, valor in _numericos(valores):
+                if grupo:
+                    detalhe.add_metric([fonte, grupo, chave], valor)
+                else:
+                    nome = re.sub(r"[^a-zA-Z0-9_]", "_", f"gav_{fonte}_{chave}")
+                    yield GaugeMetricFamily(nome, f"{fonte}: {chave}", value=valor)
+        yield detalhe
+
+    def describe(self):
+        return []  # nomes dinâmicos: não descreve na hora do registro
+
+
+def _numericos(valores: dict, grupo: str = ""):
+    """(grupo, chave, valor); grupo é o caminho dos dicts aninhados ("" no primeiro nível)."""
+    for chave, valor in valores.items():
+        if isinstance(valor, (int, float)):  # inclui bool
+            yield grupo, str(chave), float(valor)
+        elif isinstance(valor, dict):
+            yield from _numericos(valor, f"{grupo}/{chave}" if grupo else str(chave))
+
+
+coletor_estatisticas = ColetorEstatisticas()
+REGISTRY.register(coletor_estatisticas)
@@ -0,0 +1,114 @@
+# gav-autonomo/app/servicos/cache_contexto.py
+
+"""
+Cache em processo do contexto de sessão.
+
+O contexto lido por `_processar_contexto_via_prompt` ("o primeiro", "quero 2
+do 12345") foi produzido pelo próprio gav-autonomo instantes antes. O cache
+guarda o último contexto de cada sessão na gravação (write-through) e na
+leitura vinda da API, evitando o GET /contexto/{sessao_id}.
+
+Limites: LRU com teto de memória em bytes (tamanho do JSON serializado) e
+expiração por inatividade da sessão. Quem lê ou grava recebe/entrega uma
+cópia: os chamadores enriquecem o contexto, e isso não pode alterar o cache.
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config.settings import config
+
+
+@dataclass
+class _Entrada:
+    contexto: dict
+    tamanho: int
+    ultimo_acesso: float
+
+
+class CacheContexto:
+    def __init__(self, max_bytes: int, ttl_ocioso_segundos: float):
+        self.max_bytes = max_bytes
+        self.ttl_ocioso_segundos = ttl_ocioso_segundos
+        self._itens: OrderedDict[str, _Entrada] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.expirados = 0
+        self.removidos_por_memoria = 0
+
+    def obter(self, sessao_id: str) -> dict | None:
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._itens.get(sessao_id)
+            if entrada is None:
+                self.faltas += 1
+                return None
+            if agora - entrada.ultimo_acesso > self.ttl_ocioso_segundos:
+                self._remover(sessao_id)
+                self.expirados += 1
+                self.faltas += 1
+                return None
+            entrada.ultimo_acesso = agora
+            self._itens.move_to_end(sessao_id)
+            self.acertos += 1
+            return copy.deepcopy(entrada.contexto)
+
+    def guardar(self, sessao_id: str, contexto: dict):
+        tamanho = len(json.dumps(contexto, ensure_ascii=False, default=str).encode("utf-8"))
+        with self._lock:
+            if sessao_id in self._itens:
+                self._remover(sessao_id)
+            if tamanho > self.max_bytes:
+                # Não cabe: sem a entrada anterior, obter() cai na fila/banco em vez do contexto velho
+                return
+            self._itens[sessao_id] = _Entrada(copy.deepcopy(contexto), tamanho, time.monotonic())
+            self._bytes += tamanho
+            self._expirar_ociosos()
+            while self._bytes > self.max_bytes:
+                self._remover(next(iter(self._itens)))
+                self.removidos_por_memoria += 1
+
+    def _expirar_ociosos(self):
+        # O LRU está em ordem de acesso: os ociosos estão no começo
+        limite = time.monotonic() - self.ttl_ocioso_segundos
+        while self._itens:
+            sessao_id, entrada = next(iter(self._itens.items()))
+            if entrada.ultimo_acesso >= limite:
+                break
+            self._remover(sessao_id)
+            self.expirados += 1
+
+    def _remover(self, sessao_id: str):
+        entrada = self._itens.pop(sessao_id)
+        self._bytes -= entrada.tamanho
+
+    def invalidar(self, sessao_id: str):
+        with self._lock:
+            if sessao_id in self._itens:
+                self._remover(sessao_id)
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.faltas
+        return {
+            "itens": len(self._itens),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_ocioso_segundos": self.ttl_ocioso_segundos,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            "expirados": self.expirados,
+            "removidos_por_memoria": self.removidos_por_memoria,
+        }
+
+
+cache_contexto = CacheContexto(
+    max_bytes=config.CONTEXTO_CACHE_MAX_BYTES,
+    ttl_ocioso_segundos=config.CONTEXTO_CACHE_TTL_OCIOSO_SEGUNDOS,
+)
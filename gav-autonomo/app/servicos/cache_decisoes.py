@@ -0,0 +1,81 @@
+# gav-autonomo/app/servicos/cache_decisoes.py
+
+"""
+Cache de decisões do LLM Selector.
+
+Mensagens muito comuns ("ver carrinho", "oi", "quero coca") geram sempre a
+mesma decisão. A chave é (id do prompt, versão do prompt, texto normalizado),
+então qualquer alteração no prompt na api-negocio invalida as entradas
+naturalmente. Eviction por LRU + TTL; decisões cujo endpoint depende do
+estado da sessão (bypass) nunca são guardadas.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from app.servicos.normalizacao import normalizar_texto
+
+
+class CacheDecisoes:
+    def __init__(self, max_itens: int = 2000, ttl_segundos: float = 600.0):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._itens: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.ignoradas = 0  # decisões não guardadas por estarem no bypass
+
+    def configurar(self, max_itens: int, ttl_segundos: float):
+        """Aplica limites vindos do manifesto (podem mudar em hot-reload)."""
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+
+    @staticmethod
+    def chave(prompt: dict, versao_prompt, texto: str) -> tuple:
+        return (prompt.get("id"), str(versao_prompt), prompt.get("atualizado_em"), normalizar_texto(texto))
+
+    def obter(self, chave: tuple) -> dict | None:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or time.monotonic() - item[0] >= self.ttl_segundos:
+                if item is not None:
+                    del self._itens[chave]
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+        return copy.deepcopy(item[1])
+
+    def guardar(self, chave: tuple, decisao: dict, bypass_endpoints=()) -> bool:
+        endpoint = (decisao.get("parameters") or {}).get("endpoint", "")
+        if endpoint in bypass_endpoints:
+            self.ignoradas += 1
+            return False
+        with self._lock:
+            self._itens[chave] = (time.monotonic(), copy.deepcopy(decisao))
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+        return True
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.faltas
+        return {
+            "itens": len(self._itens),
+            "max_itens": self.max_itens,
+            "ttl_segundos": self.ttl_segundos,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "ignoradas": self.ignoradas,
+            "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+        }
+
+
+cache_decisoes = CacheDecisoes()
@@ -0,0 +1,167 @@
+# gav-autonomo/app/servicos/especulacao.py
+
+"""
+Execução especulativa da busca em paralelo com o LLM Selector (opt-in).
+
+Para mensagens que parecem busca de produto ("quero coca", "tem sabão omo?"),
+a requisição à api-negocio e a carga do prompt do Apresentador começam junto
+com a geração do Selector. Se a decisão do Selector pedir a mesma chamada
+(mesmo endpoint, método e campos de `correspondencia`), o resultado já está
+pronto (ou a caminho); caso contrário é descartado.
+
+Só endpoints idempotentes podem ser especulados: GET, ou POST de leitura
+listado em POST_IDEMPOTENTES. Regras no bloco `especulacao` do manifesto.
+"""
+
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Mapping
+
+from app.cache import obter_prompt_e_exemplos
+from app.config.manifesto import descongelar
+from app.servicos.normalizacao import normalizar_texto
+
+# POSTs que só leem dados: repetir ou descartar não tem efeito colateral
+POST_IDEMPOTENTES = frozenset({"/produtos/busca"})
+
+
+def _idempotente(endpoint: str, method: str) -> bool:
+    return method == "GET" or (method == "POST" and endpoint in POST_IDEMPOTENTES)
+
+
+async def _aquecer_prompt(nome: str):
+    try:
+        await obter_prompt_e_exemplos(nome=nome, espaco="autonomo", versao=1)
+    except Exception as e:
+        print(f"❌ Falha ao pré-carregar {nome}: {e}")
+
+
+def _normalizar_valor(valor):
+    # O LLM às vezes manda números como texto ("2"); a api-negocio aceita os dois
+    if isinstance(valor, (str, int, float)) and not isinstance(valor, bool):
+        return normalizar_texto(str(valor))
+    return valor
+
+
+def _chave_body(body: dict, cfg_correspondencia: Mapping) -> dict:
+    """Body comparável: defaults preenchidos e, se configurado, só os campos relevantes."""
+    padroes = descongelar(cfg_correspondencia.get("padroes", {}))
+    completo = {**padroes, **{k: v for k, v in (body or {}).items() if v is not None}}
+    campos = cfg_correspondencia.get("campos")
+    if campos:
+        completo = {c: completo.get(c) for c in campos}
+    return {k: _normalizar_valor(v) for k, v in completo.items()}
+
+
+class Especulacao:
+    """Uma chamada especulativa em andamento, consumida no máximo uma vez."""
+
+    def __init__(self, especulador: "Especulador", endpoint: str, method: str, body: dict, tarefa: asyncio.Task,
+                 cfg_correspondencia: Mapping | None = None):
+        self.especulador = especulador
+        self.endpoint = endpoint
+        self.method = method
+        self.body = body
+        self.cfg_correspondencia = cfg_correspondencia or {}
+        self.tarefa = tarefa
+        self.inicio = time.perf_counter()
+        self.fim: float | None = None
+        self.consumida = False
+        tarefa.add_done_callback(self._terminou)
+
+    def _terminou(self, _):
+        self.fim = time.perf_counter()
+
+    def corresponde(self, endpoint: str, method: str, body: dict) -> bool:
+        return (
+            endpoint == self.endpoint
+            and method == self.method
+            and _chave_body(body, self.cfg_correspondencia) == _chave_body(self.body, self.cfg_correspondencia)
+        )
+
+    async def resultado_para(self, endpoint: str, method: str, body: dict) -> dict | None:
+        """Resultado da chamada especulada se ela for a mesma decidida; senão None."""
+        if self.consumida or not self.corresponde(endpoint, method, body):
+            return None
+        self.consumida = True
+        uso = time.perf_counter()
+        try:
+            resultado = await self.tarefa
+        except Exception as e:
+            print(f"❌ Especulação falhou, refazendo a chamada: {e}")
+            self.especulador.falhas += 1
+            return None
+        self.especulador.acertos += 1
+        # Economia = quanto da chamada já tinha rodado quando a decisão chegou
+        self.especulador.tempo_economizado_s += min(uso, self.fim or uso) - self.inicio
+        return resultado
+
+    def descartar(self):
+        if self.consumida:
+            return
+        self.consumida = True
+        self.especulador.descartadas += 1
+        if not self.tarefa.done():
+            self.tarefa.cancel()
+
+
+class Especulador:
+    def __init__(self):
+        self._cfg_gatilho = None
+        self._gatilho: re.Pattern | None = None
+        self.iniciadas = 0
+        self.acertos = 0
+        self.descartadas = 0
+        self.falhas = 0
+        self.tempo_economizado_s = 0.0
+
+    def _padrao(self, cfg: Mapping) -> re.Pattern:
+        if cfg.get("gatilho") is not self._cfg_gatilho:  # manifesto recarregado
+            self._gatilho = re.compile(cfg["gatilho"])
+            self._cfg_gatilho = cfg.get("gatilho")
+        return self._gatilho
+
+    def iniciar(self, texto: str, cfg: Mapping, requisitar: Callable[[str, str, dict], Awaitable[dict]]) -> Especulacao | None:
+        """
+        Dispara a chamada especulativa se a mensagem casar com o gatilho.
+        `requisitar(endpoint, method, body)` é a mesma função usada no caminho normal.
+        """
+        if not cfg.get("ativo") or not cfg.get("gatilho"):
+            return None
+        m = self._padrao(cfg).search(normalizar_texto(texto))
+        if not m or not m.groupdict().get("query"):
+            return None
+
+        endpoint = cfg.get("endpoint", "/produtos/busca")
+        method = str(cfg.get("method", "POST")).upper()
+        if not _idempotente(endpoint, method):
+            print(f"❌ Especulação recusada: {method} {endpoint} não é idempotente")
+            return None
+
+        body = {**descongelar(cfg.get("body", {})), "query": m.group("query").strip()}
+        cfg_correspondencia = cfg.get("correspondencia", {})
+        faltando = [c for c in cfg_correspondencia.get("campos", ()) if c not in body and c not in cfg_correspondencia.get("padroes", {})]
+        if faltando:
+            # A decisão real tem esses campos: sem eles a especulação nunca acertaria
+            print(f"❌ Especulação recusada: body sem {', '.join(faltando)}")
+            return None
+        tarefa = asyncio.ensure_future(requisitar(endpoint, method, body))
+        if cfg.get("prompt_apresentador"):
+            # Só aquece o cache de prompts; o resultado não é usado aqui
+            asyncio.ensure_future(_aquecer_prompt(cfg["prompt_apresentador"]))
+        self.iniciadas += 1
+        return Especulacao(self, endpoint, method, body, tarefa, cfg_correspondencia)
+
+    def estatisticas(self) -> dict:
+        return {
+            "iniciadas": self.iniciadas,
+            "acertos": self.acertos,
+            "descartadas": self.descartadas,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / self.iniciadas, 4) if self.iniciadas else 0.0,
+            "tempo_economizado_s": round(self.tempo_economizado_s, 3),
+        }
+
+
+especulador = Especulador()
@@ -2,11 +2,28 @@
 # CORREÇÃO: 100% Prompt-Driven, ZERO regras hardcoded
 # Sistema genérico para qualquer domínio (vendas, telemarking, suporte, etc.)
 
-from app.adaptadores.cliente_negocio import obter_prompt_por_nome, listar_exemplos_prompt
-from app.adaptadores.interface_llm import completar_para_json
-from app.validadores.modelos import validar_json_contra_schema, carregar_schema
-import yaml
+from app.cache import obter_prompt_e_exemplos
+from app.adaptadores.interface_llm import completar_para_json_async, completar_stream_async
+from app.adaptadores.clientes_http import obter_cliente_async
+from app.adaptadores.cliente_negocio import obter_contexto_async
+from app.adaptadores.coalescencia import voo
+from app.adaptadores.agendador_llm import PRIORIDADE_SELETOR, PRIORIDADE_APRESENTADOR
+from app.validadores.modelos import validar_com_erros, formatar_erros_validacao
+from app.config.manifesto import registro_manifesto, ManifestoCompilado, RegraCompilada
+from app.servicos.cache_decisoes import cache_decisoes
+from app.servicos.pre_roteador import pre_roteador
+from app.servicos.seletor_exemplos import seletor_exemplos
+from app.servicos.extrator_json import ExtratorCampoJson, carregar_json_tolerante
+from app.servicos.fila_contexto import fila_contexto
+from app.servicos.cache_contexto import cache_contexto
+from app.servicos.projecao import json_para_apresentacao
+from app.servicos.templates_apresentacao import motor_templates
+from app.servicos.especulacao import especulador, Especulacao
+from app.servicos.motor_reparo import motor_reparo
+from app.metricas import etapa, iniciar_rastro, descartar_rastro, registrar_decisao, rotulo_endpoint, DURACAO_API_NEGOCIO
+from typing import AsyncIterator, Callable
 import json
+import time
 import httpx
 from app.config.settings import config
 
@@ -15,7 +32,7 @@ API_NEGOCIO_URL = config.API_NEGOCIO_URL.rstrip("/")
 # ❌ REMOVIDO: CONTEXTO_SESSOES (era regra hardcoded específica de produtos)
 # ✅ NOVO: Tudo via prompt e API calls genéricas
 
-def executar_regras_do_manifesto(mensagem: dict | str) -> dict:
+async def executar_regras_do_manifesto(mensagem: dict | str) -> dict:
     """
     Orquestrador genérico: LLM Selector → API → LLM Apresentador
     Zero regras hardcoded - funciona para qualquer domínio
@@ -23,59 +40,183 @@ def executar_regras_do_manifesto(mensagem: dict | str) -> dict:
     if isinstance(mensagem, str):
         mensagem = {"texto": mensagem, "sessao_id": "anon"}
     
-    with open("app/config/model_manifest.yml", encoding="utf-8") as f:
-        manifesto = yaml.safe_load(f)
-    
-    for regra in manifesto["regras"]:
-        if regra["action"] == "decisao_llm":
-            return _processar_decisao_llm(mensagem, regra, manifesto)
-    
-    return {"erro": "Nenhuma regra válida encontrada no manifesto."}
+    rastro, criado = iniciar_rastro()
+    try:
+        manifesto = registro_manifesto.obter()
+        
+        regra = manifesto.primeira_regra("decisao_llm")
+        if regra:
+            return await _processar_decisao_llm(mensagem, regra, manifesto)
+        
+        return {"erro": "Nenhuma regra válida encontrada no manifesto."}
+    finally:
+        rastro.finalizar()
+        if criado:
+            descartar_rastro()
 
-def _processar_decisao_llm(mensagem: dict, regra: dict, manifesto: dict) -> dict:
-    """Processa decisão via LLM e executa pipeline apropriado."""
+async def executar_regras_do_manifesto_stream(mensagem: dict) -> AsyncIterator[dict]:
+    """
+    Mesmo pipeline de `executar_regras_do_manifesto`, mas o campo `mensagem`
+    do Apresentador é emitido token a token: eventos {"evento": "token", "texto"}
+    seguidos de um único {"evento": "fim", "resposta": {...}}.
+    """
+    rastro, criado = iniciar_rastro()
+    especulacao = None
     try:
-        # 1. Busca prompt e exemplos do Selector
-        p = obter_prompt_por_nome(
-            nome=regra["prompt"], 
-            espaco=regra["espaco_prompt"], 
-            versao=regra["versao_prompt"]
-        )
-        exemplos = listar_exemplos_prompt(p["id"])
-
-        # 2. LLM Selector decide ferramenta
-        decisao = completar_para_json(
-            sistema=p["template"],
-            entrada_usuario=mensagem["texto"],
-            exemplos=exemplos,
-            modelo=manifesto["defaults"].get("modelo")
-        )
+        manifesto = registro_manifesto.obter()
+        regra = manifesto.primeira_regra("decisao_llm")
+        if not regra:
+            yield {"evento": "fim", "resposta": {"erro": "Nenhuma regra válida encontrada no manifesto."}}
+            return
+
+        def _especular():
+            nonlocal especulacao
+            especulacao = _iniciar_especulacao(mensagem, manifesto)
 
-        # 3. Valida estrutura da decisão
-        schema = carregar_schema(regra["schema"])
-        if not validar_json_contra_schema(decisao, schema):
-            return {"erro": "Decisão do LLM inválida. Tente reformular a mensagem."}
+        decisao = await _decidir_ferramenta(mensagem, regra, manifesto, antes_do_llm=_especular)
+        if "erro" in decisao:
+            yield {"evento": "fim", "resposta": decisao}
+            return
+
+        tool_name = decisao.get("tool_name")
+        params = decisao.get("parameters", {})
+        registrar_decisao(tool_name, _rotulo_endpoint(params.get("endpoint")))
+
+        if tool_name == "api_call":
+            yield {"evento": "fim", "resposta": await _executar_api_call(params, mensagem["sessao_id"], especulacao)}
+        elif tool_name == "api_call_with_presentation":
+            json_resultado = await _executar_api_call(params, mensagem["sessao_id"], especulacao)
+            async for evento in _apresentar_resultado_stream(json_resultado, mensagem["texto"], params):
+                yield evento
+        else:
+            yield {"evento": "fim", "resposta": {"erro": f"Ferramenta não reconhecida: {tool_name}"}}
+
+    except Exception as e:
+        yield {"evento": "fim", "resposta": {"erro": f"Erro interno: {str(e)}"}}
+    finally:
+        if especulacao is not None:
+            especulacao.descartar()
+        rastro.finalizar()
+        if criado:
+            descartar_rastro()
+
+async def _decidir_ferramenta(mensagem: dict, regra: RegraCompilada, manifesto: ManifestoCompilado,
+                              antes_do_llm: Callable[[], None] | None = None) -> dict:
+    """
+    LLM Selector: retorna a decisão {tool_name, parameters} já validada,
+    ou um dict com "erro". Intenções óbvias saem do pré-roteador e decisões
+    repetidas do cache_decisoes, ambos sem LLM. `antes_do_llm` só é chamado
+    quando a decisão vai mesmo para o LLM (é onde a especulação começa).
+    """
+    # 1. Busca prompt e exemplos do Selector
+    p, exemplos = await obter_prompt_e_exemplos(
+        nome=regra.prompt, 
+        espaco=regra.espaco_prompt, 
+        versao=regra.versao_prompt
+    )
+
+    cfg_pre_roteador = manifesto.secao("pre_roteador", {})
+    if cfg_pre_roteador.get("ativo"):
+        contexto = None
+        sessao_id = mensagem.get("sessao_id")
+        if sessao_id and sessao_id != "anon" and pre_roteador.requer_contexto(mensagem["texto"], cfg_pre_roteador):
+            contexto = (await _buscar_contexto_do_banco(sessao_id)).get("contexto_estruturado") or {}
+        with etapa("pre_roteador"):
+            decisao = pre_roteador.rotear(mensagem["texto"], cfg_pre_roteador, p, exemplos, contexto)
+        if decisao is not None and not validar_com_erros(decisao, regra.schema):
+            return decisao
+
+    cfg_cache = manifesto.secao("cache_decisoes", {})
+    chave_cache = None
+    if cfg_cache.get("ativo"):
+        cache_decisoes.configurar(cfg_cache.get("max_itens", 2000), cfg_cache.get("ttl_segundos", 600))
+        chave_cache = cache_decisoes.chave(p, regra.versao_prompt, mensagem["texto"])
+        decisao = cache_decisoes.obter(chave_cache)
+        if decisao is not None:
+            return decisao
+
+    # 2. LLM Selector decide ferramenta (com os exemplos mais relevantes, se configurado)
+    if antes_do_llm is not None:
+        antes_do_llm()
+    selecionados = None
+    cfg_selecao = manifesto.secao("selecao_exemplos", {})
+    if cfg_selecao.get("ativo"):
+        exemplos, selecionados = seletor_exemplos.selecionar(p, exemplos, mensagem["texto"], cfg_selecao)
+
+    inicio_llm = time.perf_counter()
+    decisao = await completar_para_json_async(
+        sistema=p["template"],
+        entrada_usuario=mensagem["texto"],
+        exemplos=exemplos,
+        modelo=manifesto.defaults.get("modelo"),
+        prompt=p,
+        selecionados=selecionados,
+        prioridade=PRIORIDADE_SELETOR
+    )
+    pre_roteador.registrar_latencia_llm(time.perf_counter() - inicio_llm)
+
+    # 3. Valida estrutura da decisão (schema já resolvido no manifesto compilado)
+    erros_validacao = validar_com_erros(decisao, regra.schema)
+    if erros_validacao:
+        print(f"❌ Decisão do LLM inválida:\n{formatar_erros_validacao(erros_validacao)}")
+        return {"erro": "Decisão do LLM inválida. Tente reformular a mensagem.", "detalhes": erros_validacao}
+
+    if chave_cache is not None:
+        cache_decisoes.guardar(chave_cache, decisao, cfg_cache.get("bypass_endpoints", ()))
+    return decisao
+
+async def _processar_decisao_llm(mensagem: dict, regra: RegraCompilada, manifesto: ManifestoCompilado) -> dict:
+    """Processa decisão via LLM e executa pipeline apropriado."""
+    especulacao = None
+
+    def _especular():
+        nonlocal especulacao
+        especulacao = _iniciar_especulacao(mensagem, manifesto)
+
+    try:
+        decisao = await _decidir_ferramenta(mensagem, regra, manifesto, antes_do_llm=_especular)
+        if "erro" in decisao:
+            return decisao
 
         # 4. Pipeline genérico (sem regras específicas de domínio)
         tool_name = decisao.get("tool_name")
+        registrar_decisao(tool_name, _rotulo_endpoint(decisao.get("parameters", {}).get("endpoint")))
         
         if tool_name == "api_call":
-            return _executar_api_call(decisao.get("parameters", {}), mensagem["sessao_id"])
+            return await _executar_api_call(decisao.get("parameters", {}), mensagem["sessao_id"], especulacao)
             
         elif tool_name == "api_call_with_presentation":
-            json_resultado = _executar_api_call(decisao.get("parameters", {}), mensagem["sessao_id"])
-            return _apresentar_resultado(json_resultado, mensagem["texto"], decisao.get("parameters", {}))
+            json_resultado = await _executar_api_call(decisao.get("parameters", {}), mensagem["sessao_id"], especulacao)
+            return await _apresentar_resultado(json_resultado, mensagem["texto"], decisao.get("parameters", {}))
             
         else:
             return {"erro": f"Ferramenta não reconhecida: {tool_name}"}
             
     except Exception as e:
         return {"erro": f"Erro interno: {str(e)}"}
+    finally:
+        if especulacao is not None:
+            especulacao.descartar()
+
+def _rotulo_endpoint(endpoint: str | None) -> str:
+    """Endpoint para rótulo de métrica: templates de `metricas.endpoints` no manifesto ou "outro"."""
+    return rotulo_endpoint(endpoint, registro_manifesto.obter().secao("metricas", {}).get("endpoints", ()))
+
+def _iniciar_especulacao(mensagem: dict, manifesto: ManifestoCompilado) -> Especulacao | None:
+    """Dispara a busca especulativa (bloco `especulacao` do manifesto), se ativa e aplicável."""
+    cfg = manifesto.secao("especulacao", {})
+    if not cfg.get("ativo"):
+        return None
+    return especulador.iniciar(
+        mensagem["texto"], cfg,
+        lambda endpoint, method, body: _fazer_request_http(f"{API_NEGOCIO_URL}{endpoint}", method, body),
+    )
 
-def _executar_api_call(params: dict, sessao_id: str) -> dict:
+async def _executar_api_call(params: dict, sessao_id: str, especulacao: Especulacao | None = None) -> dict:
     """
     Executa chamada HTTP genérica. 
     ✅ NOVO: Suporte ao endpoint /chat/contexto via prompts
+    Se houver uma especulação para a mesma chamada, usa o resultado dela.
     """
     endpoint = params.get("endpoint", "")
     method = params.get("method", "GET").upper()
@@ -88,7 +229,8 @@ def _executar_api_call(params: dict, sessao_id: str) -> dict:
     
     # ✅ NOVO: Endpoint para processamento de contexto VIA PROMPT
     if endpoint == "/chat/contexto":
-        return _processar_contexto_via_prompt(body, sessao_id)
+        with etapa("contexto"):
+            return await _processar_contexto_via_prompt(body, sessao_id)
     
     # Substitui {sessao_id} no endpoint se necessário
     if "{sessao_id}" in endpoint:
@@ -100,26 +242,37 @@ def _executar_api_call(params: dict, sessao_id: str) -> dict:
     url = f"{API_NEGOCIO_URL}{endpoint}"
     
     try:
-        response = _fazer_request_http(url, method, body)
+        # Rótulo com o template conhecido (ou "outro"), nunca o texto livre do LLM
+        response = None
+        if especulacao is not None:
+            with etapa("especulacao"):
+                response = await especulacao.resultado_para(params.get("endpoint", ""), method, body)
+        if response is None:
+            with etapa("api_negocio"), DURACAO_API_NEGOCIO.labels(endpoint=_rotulo_endpoint(params.get("endpoint")), method=method).time():
+                response = await _fazer_request_http(url, method, body)
+        
+        cfg_reparo = registro_manifesto.obter().secao("reparo_automatico", {})
+        if not response.get("success") and motor_reparo.reparavel(response, cfg_reparo):
+            with etapa("reparo"):
+                response = await motor_reparo.reparar(
+                    params, response, lambda body: _fazer_request_http(url, method, body), cfg_reparo
+                )
         
         if response.get("success"):
             return response.get("data", {})
         
-        if response.get("status_code") in [400, 422]:
-            return _tentar_reparo_automatico(params, response, sessao_id)
-        
         return {"erro": f"API retornou erro {response.get('status_code')}: {response.get('error')}"}
         
     except Exception as e:
         return {"erro": f"Falha na comunicação com API: {str(e)}"}
 
-def _processar_contexto_via_prompt(body: dict, sessao_id: str) -> dict:
+async def _processar_contexto_via_prompt(body: dict, sessao_id: str) -> dict:
     """Processa referência do usuário usando contexto salvo - AGORA COM IDs DIRETOS"""
     try:
         mensagem_contexto = body.get("mensagem_contexto", "")
         
         # Buscar contexto salvo do banco
-        contexto_banco = _buscar_contexto_do_banco(sessao_id)
+        contexto_banco = await _buscar_contexto_do_banco(sessao_id)
         contexto_anterior = {
             "contexto": contexto_banco.get("contexto_estruturado", {}),
             "tipo": contexto_banco.get("tipo_contexto", "nenhum")
@@ -158,41 +311,41 @@ def _processar_contexto_via_prompt(body: dict, sessao_id: str) -> dict:
                         "codfilial": 2
                     }
                 }
-                return _executar_api_call(params_api, sessao_id)
+                return await _executar_api_call(params_api, sessao_id)
             else:
                 return {"erro": f"ID {item_id_referenciado} não encontrado no contexto atual"}
         
         # 2. Se não encontrou ID direto, tenta processamento via prompt (para casos como "o primeiro", "esse", etc.)
         try:
-            p_processador = obter_prompt_por_nome(nome="prompt_processador_contexto", espaco="autonomo", versao=1)
-            exemplos_processador = listar_exemplos_prompt(p_processador["id"])
+            p_processador, exemplos_processador = await obter_prompt_e_exemplos(nome="prompt_processador_contexto", espaco="autonomo", versao=1)
             
             contexto_input = f"""mensagem_contexto: "{mensagem_contexto}"
 sessao_id: "{sessao_id}"
 contexto_anterior: {json.dumps(contexto_anterior, ensure_ascii=False)}"""
 
-            referencia_resultado = completar_para_json(
+            referencia_resultado = await completar_para_json_async(
                 sistema=p_processador["template"],
                 entrada_usuario=contexto_input,
-                exemplos=exemplos_processador
+                exemplos=exemplos_processador,
+                prompt=p_processador
             )
             
             if referencia_resultado.get("acao") == "processar_referencia":
                 # Processar via executor de referência
-                p_executor = obter_prompt_por_nome(nome="prompt_executor_referencia", espaco="autonomo", versao=1)
-                exemplos_executor = listar_exemplos_prompt(p_executor["id"])
+                p_executor, exemplos_executor = await obter_prompt_e_exemplos(nome="prompt_executor_referencia", espaco="autonomo", versao=1)
                 
                 executor_input = f"""referencia_detectada: {json.dumps(referencia_resultado.get("referencia", {}), ensure_ascii=False)}
 contexto_anterior: {json.dumps(contexto_anterior.get("contexto", {}), ensure_ascii=False)}
 sessao_id: "{sessao_id}" """
 
-                acao_resultado = completar_para_json(
+                acao_resultado = await completar_para_json_async(
                     sistema=p_executor["template"],
                     entrada_usuario=executor_input,
-                    exemplos=exemplos_executor
+                    exemplos=exemplos_executor,
+                    prompt=p_executor
                 )
                 
-                return _executar_acao_contextual(acao_resultado, sessao_id)
+                return await _executar_acao_contextual(acao_resultado, sessao_id)
             
         except Exception as e:
             print(f"Erro no processamento via prompt: {e}")
@@ -212,49 +365,49 @@ def _buscar_contexto_anterior(sessao_id: str) -> dict:
     # Por enquanto, retorna vazio (contexto pode ser enviado pelo frontend)
     return {"contexto": "nenhum", "tipo": "indefinido"}
 
-def _interpretar_referencia_via_prompt(mensagem: str, contexto: dict, sessao_id: str) -> dict:
+async def _interpretar_referencia_via_prompt(mensagem: str, contexto: dict, sessao_id: str) -> dict:
     """
     ✅ Usa prompt para interpretar se mensagem é referência ao contexto anterior
     """
     try:
-        p_processador = obter_prompt_por_nome(nome="prompt_processador_contexto", espaco="autonomo", versao=1)
-        exemplos_processador = listar_exemplos_prompt(p_processador["id"])
+        p_processador, exemplos_processador = await obter_prompt_e_exemplos(nome="prompt_processador_contexto", espaco="autonomo", versao=1)
         
         contexto_input = f"""mensagem_contexto: "{mensagem}"
 sessao_id: "{sessao_id}"
 contexto_anterior: {json.dumps(contexto, ensure_ascii=False)}"""
 
-        return completar_para_json(
+        return await completar_para_json_async(
             sistema=p_processador["template"],
             entrada_usuario=contexto_input,
-            exemplos=exemplos_processador
+            exemplos=exemplos_processador,
+            prompt=p_processador
         )
         
     except Exception as e:
         return {"acao": "nova_interacao", "motivo": "erro_interpretacao"}
 
-def _executar_referencia_via_prompt(referencia: dict, contexto: dict, sessao_id: str) -> dict:
+async def _executar_referencia_via_prompt(referencia: dict, contexto: dict, sessao_id: str) -> dict:
     """
     ✅ Usa prompt para decidir que ação executar baseada na referência
     """
     try:
-        p_executor = obter_prompt_por_nome(nome="prompt_executor_referencia", espaco="autonomo", versao=1)
-        exemplos_executor = listar_exemplos_prompt(p_executor["id"])
+        p_executor, exemplos_executor = await obter_prompt_e_exemplos(nome="prompt_executor_referencia", espaco="autonomo", versao=1)
         
         executor_input = f"""referencia_detectada: {json.dumps(referencia, ensure_ascii=False)}
 contexto_anterior: {json.dumps(contexto, ensure_ascii=False)}
 sessao_id: "{sessao_id}" """
 
-        return completar_para_json(
+        return await completar_para_json_async(
             sistema=p_executor["template"],
             entrada_usuario=executor_input,
-            exemplos=exemplos_executor
+            exemplos=exemplos_executor,
+            prompt=p_executor
         )
         
     except Exception as e:
         return {"acao_executar": "erro_referencia", "parametros": {"mensagem": "Erro ao processar referência"}}
 
-def _executar_acao_contextual(acao: dict, sessao_id: str) -> dict:
+async def _executar_acao_contextual(acao: dict, sessao_id: str) -> dict:
     """
     ✅ Executa ação decidida pelo LLM (genérica, não específica de produtos)
     """
@@ -272,7 +425,7 @@ def _executar_acao_contextual(acao: dict, sessao_id: str) -> dict:
                 "codfilial": parametros.get("codfilial", 2)
             }
         }
-        return _executar_api_call(params_api, sessao_id)
+        return await _executar_api_call(params_api, sessao_id)
         
     elif acao_tipo == "expandir_busca":
         # Executa nova busca via API call genérica
@@ -285,7 +438,7 @@ def _executar_acao_contextual(acao: dict, sessao_id: str) -> dict:
                 "codfilial": 2
             }
         }
-        return _executar_api_call(params_api, sessao_id)
+        return await _executar_api_call(params_api, sessao_id)
         
     elif acao_tipo == "erro_referencia":
         # Retorna mensagem de erro decidida pelo LLM
@@ -295,7 +448,7 @@ def _executar_acao_contextual(acao: dict, sessao_id: str) -> dict:
         # Ação não reconhecida
         return {"erro": f"Ação contextual não reconhecida: {acao_tipo}"}
 
-def _apresentar_resultado(json_resultado: dict, mensagem_original: str, params_api: dict) -> dict:
+async def _apresentar_resultado(json_resultado: dict, mensagem_original: str, params_api: dict) -> dict:
     """Transforma JSON em conversa E salva contexto quando tem produtos numerados"""
     try:
         endpoint = params_api.get("endpoint", "")
@@ -304,36 +457,103 @@ def _apresentar_resultado(json_resultado: dict, mensagem_original: str, params_a
         if not prompt_apresentador:
             return json_resultado
         
-        p_apresentador = obter_prompt_por_nome(nome=prompt_apresentador, espaco="autonomo", versao=1)
-        exemplos_apresentador = listar_exemplos_prompt(p_apresentador["id"])
+        # Respostas previsíveis saem de template, sem a segunda geração no LLM
+        resposta_template = _apresentar_por_template(prompt_apresentador, json_resultado, mensagem_original, endpoint)
+        if resposta_template is not None:
+            return await _finalizar_apresentacao(resposta_template, json_resultado, mensagem_original, params_api)
+        
+        p_apresentador, exemplos_apresentador = await obter_prompt_e_exemplos(nome=prompt_apresentador, espaco="autonomo", versao=1)
         
         contexto_apresentacao = _montar_contexto_apresentacao(
             mensagem_original, json_resultado, endpoint
         )
         
-        resposta_conversacional = completar_para_json(
+        inicio_llm = time.perf_counter()
+        resposta_conversacional = await completar_para_json_async(
             sistema=p_apresentador["template"],
             entrada_usuario=contexto_apresentacao,
-            exemplos=exemplos_apresentador
+            exemplos=exemplos_apresentador,
+            prompt=p_apresentador,
+            prioridade=PRIORIDADE_APRESENTADOR
         )
+        motor_templates.registrar_latencia_llm(prompt_apresentador, time.perf_counter() - inicio_llm)
         
-        # ✅ NOVO: Salva contexto no banco se tiver produtos numerados
-        sessao_id = params_api.get("sessao_id")
-        if sessao_id and sessao_id != "anon":
-            contexto_estruturado = resposta_conversacional.get("contexto_estruturado", {})
-            if contexto_estruturado and contexto_estruturado.get("produtos"):
-                _salvar_contexto_no_banco(sessao_id, contexto_estruturado, mensagem_original, resposta_conversacional.get("mensagem", ""))
-        
-        return {
-            "mensagem": resposta_conversacional.get("mensagem", "Ops, não consegui processar isso..."),
-            "tipo": resposta_conversacional.get("tipo", "apresentacao"),
-            "dados_originais": json_resultado
-        }
+        return await _finalizar_apresentacao(resposta_conversacional, json_resultado, mensagem_original, params_api)
         
     except Exception as e:
         print(f"Erro na apresentação: {e}")
         return json_resultado
 
+async def _apresentar_resultado_stream(json_resultado: dict, mensagem_original: str, params_api: dict) -> AsyncIterator[dict]:
+    """Versão em streaming de `_apresentar_resultado` (eventos token/fim)."""
+    try:
+        endpoint = params_api.get("endpoint", "")
+        prompt_apresentador = _determinar_prompt_apresentador(endpoint, json_resultado)
+        
+        if not prompt_apresentador:
+            yield {"evento": "fim", "resposta": json_resultado}
+            return
+        
+        resposta_template = _apresentar_por_template(prompt_apresentador, json_resultado, mensagem_original, endpoint)
+        if resposta_template is not None:
+            yield {"evento": "token", "texto": resposta_template["mensagem"]}
+            yield {"evento": "fim", "resposta": await _finalizar_apresentacao(resposta_template, json_resultado, mensagem_original, params_api)}
+            return
+        
+        p_apresentador, exemplos_apresentador = await obter_prompt_e_exemplos(nome=prompt_apresentador, espaco="autonomo", versao=1)
+        
+        contexto_apresentacao = _montar_contexto_apresentacao(
+            mensagem_original, json_resultado, endpoint
+        )
+        
+        extrator = ExtratorCampoJson("mensagem")
+        fragmentos = []
+        texto_emitido = []
+        inicio_llm = time.perf_counter()
+        async for fragmento in completar_stream_async(
+            sistema=p_apresentador["template"],
+            entrada_usuario=contexto_apresentacao,
+            exemplos=exemplos_apresentador,
+            prompt=p_apresentador,
+            prioridade=PRIORIDADE_APRESENTADOR
+        ):
+            fragmentos.append(fragmento)
+            texto = extrator.alimentar(fragmento)
+            if texto:
+                texto_emitido.append(texto)
+                yield {"evento": "token", "texto": texto}
+        
+        motor_templates.registrar_latencia_llm(prompt_apresentador, time.perf_counter() - inicio_llm)
+        resposta_conversacional = carregar_json_tolerante("".join(fragmentos))
+        if resposta_conversacional is None:
+            # JSON incompleto/inválido: o fim repete o que já foi transmitido
+            print("ℹ️ Apresentador (stream) não retornou JSON completo; usando o texto transmitido")
+            resposta_conversacional = {"mensagem": "".join(texto_emitido)} if texto_emitido else {}
+        yield {"evento": "fim", "resposta": await _finalizar_apresentacao(resposta_conversacional, json_resultado, mensagem_original, params_api)}
+        
+    except Exception as e:
+        print(f"Erro na apresentação (stream): {e}")
+        yield {"evento": "fim", "resposta": json_resultado}
+
+async def _finalizar_apresentacao(resposta_conversacional: dict, json_resultado: dict, mensagem_original: str, params_api: dict) -> dict:
+    """Salva o contexto (se houver produtos numerados) e monta a resposta final."""
+    # ✅ NOVO: Salva contexto no banco se tiver produtos numerados
+    sessao_id = params_api.get("sessao_id")
+    if sessao_id and sessao_id != "anon":
+        contexto_estruturado = resposta_conversacional.get("contexto_estruturado", {})
+        if contexto_estruturado and contexto_estruturado.get("produtos"):
+            # Guarda a busca que gerou a lista (o pré-roteador refaz a busca em "qual o mais barato?")
+            query = params_api.get("body", {}).get("query")
+            if "/produtos/busca" in params_api.get("endpoint", "") and query:
+                contexto_estruturado = {**contexto_estruturado, "query": query}
+            _salvar_contexto_no_banco(sessao_id, contexto_estruturado, mensagem_original, resposta_conversacional.get("mensagem", ""))
+    
+    return {
+        "mensagem": resposta_conversacional.get("mensagem", "Ops, não consegui processar isso..."),
+        "tipo": resposta_conversacional.get("tipo", "apresentacao"),
+        "dados_originais": json_resultado
+    }
+
 
 # === FUNÇÕES AUXILIARES (mantém as originais) ===
 
@@ -349,43 +569,67 @@ def _determinar_prompt_apresentador(endpoint: str, json_resultado: dict) -> str:
         return None
     return "prompt_apresentador_busca"
 
+def _acao_carrinho(endpoint: str, json_resultado: dict) -> str:
+    if endpoint.endswith("/itens"):
+        return "item_adicionado"
+    return "carrinho_visualizado" if json_resultado.get("itens") else "carrinho_vazio"
+
+def _apresentar_por_template(prompt_apresentador: str, json_resultado: dict, mensagem_original: str, endpoint: str) -> dict | None:
+    """Resposta renderizada por template do manifesto, ou None quando o LLM deve apresentar."""
+    variaveis = {
+        "resultado": json_resultado,
+        "mensagem_original": mensagem_original,
+        "endpoint": endpoint,
+        "acao": _acao_carrinho(endpoint, json_resultado) if "/carrinhos/" in endpoint else None,
+        "total_encontrados": len(json_resultado.get("resultados") or []),
+    }
+    with etapa("template_apresentacao", prompt_apresentador):
+        return motor_templates.renderizar(prompt_apresentador, variaveis, registro_manifesto.obter().secao("apresentacao", {}))
+
 def _montar_contexto_apresentacao(mensagem_original: str, json_resultado: dict, endpoint: str) -> str:
     """Monta o contexto que será enviado para o LLM Apresentador."""
+    # Só os campos que o Apresentador usa (apresentacao.projecoes no manifesto)
+    json_prompt = json_para_apresentacao(json_resultado, endpoint, registro_manifesto.obter().secao("apresentacao", {}))
+
     if "/produtos/busca" in endpoint:
         resultados = json_resultado.get("resultados", [])
         status_busca = json_resultado.get("status_busca", "sucesso")
         
         return f"""query_original: "{mensagem_original}"
-resultados_json: {json.dumps(json_resultado, ensure_ascii=False)}
+resultados_json: {json_prompt}
 status_busca: "{status_busca}"
 total_encontrados: {len(resultados)}"""
 
     elif "/carrinhos/" in endpoint:
-        if endpoint.endswith("/itens"):
-            acao = "item_adicionado"
-        else:
-            acao = "carrinho_visualizado" if json_resultado.get("itens") else "carrinho_vazio"
+        acao = _acao_carrinho(endpoint, json_resultado)
             
         return f"""acao_realizada: "{acao}"
-carrinho_json: {json.dumps(json_resultado, ensure_ascii=False)}
+carrinho_json: {json_prompt}
 mensagem_original: "{mensagem_original}" """
 
     else:
         return f"""contexto_usuario: "{mensagem_original}"
-resultado_api: {json.dumps(json_resultado, ensure_ascii=False)}
+resultado_api: {json_prompt}
 endpoint: "{endpoint}" """
 
-def _fazer_request_http(url: str, method: str, body: dict) -> dict:
+async def _fazer_request_http(url: str, method: str, body: dict) -> dict:
     """Executa a requisição HTTP e retorna um dicionário padronizado."""
+    if method == "GET":
+        # GETs idênticos simultâneos (ex.: o mesmo carrinho) viram uma única chamada
+        return await voo("negocio_get", copiar=True).executar(url, lambda: _requisitar_http(url, method, body))
+    return await _requisitar_http(url, method, body)
+
+async def _requisitar_http(url: str, method: str, body: dict) -> dict:
     try:
+        cliente = obter_cliente_async("negocio")
         if method == "GET":
-            resp = httpx.get(url, timeout=15.0)
+            resp = await cliente.get(url)
         elif method == "POST":
-            resp = httpx.post(url, json=body, timeout=15.0)
+            resp = await cliente.post(url, json=body)
         elif method == "PUT":
-            resp = httpx.put(url, json=body, timeout=15.0)
+            resp = await cliente.put(url, json=body)
         elif method == "DELETE":
-            resp = httpx.delete(url, timeout=15.0)
+            resp = await cliente.delete(url)
         else:
             return {"success": False, "error": f"Método HTTP não suportado: {method}"}
         
@@ -408,59 +652,33 @@ def _fazer_request_http(url: str, method: str, body: dict) -> dict:
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def _tentar_reparo_automatico(params_originais: dict, erro_response: dict, sessao_id: str) -> dict:
-    """Ciclo de reparo automático (mantém lógica original da Fase 4)"""
-    try:
-        p_reparo = obter_prompt_por_nome(nome="prompt_api_repair", espaco="autonomo", versao=1)
-        exemplos_reparo = listar_exemplos_prompt(p_reparo["id"])
-        
-        contexto_reparo = f"""endpoint_original: {params_originais.get('endpoint')}
-method_original: {params_originais.get('method')}
-body_original: {json.dumps(params_originais.get('body', {}))}
-erro_retornado: {json.dumps(erro_response.get('error', {}))}
-mensagem_usuario: (contexto da mensagem original)"""
-
-        correcao = completar_para_json(
-            sistema=p_reparo["template"],
-            entrada_usuario=contexto_reparo,
-            exemplos=exemplos_reparo
-        )
-        
-        params_corrigidos = params_originais.copy()
-        params_corrigidos["body"] = correcao.get("body_corrigido", params_originais.get("body", {}))
-        
-        return _executar_api_call(params_corrigidos, sessao_id)
-        
-    except Exception as e:
-        return {"erro": f"Reparo automático falhou: {str(e)}. Erro original: {erro_response.get('error')}"}
-    
 def _salvar_contexto_no_banco(sessao_id: str, contexto_estruturado: dict, mensagem_original: str, resposta_apresentada: str):
-    """Salva contexto no banco via API de negócio"""
-    try:
-        payload = {
-            "tipo_contexto": "busca_numerada",
-            "contexto_estruturado": contexto_estruturado,
-            "mensagem_original": mensagem_original,
-            "resposta_apresentada": resposta_apresentada
-        }
-        
-        response = httpx.post(f"{API_NEGOCIO_URL}/contexto/{sessao_id}", json=payload, timeout=10.0)
-        
-        if response.is_success:
-            print(f"✅ Contexto salvo para sessão {sessao_id}")
-        else:
-            print(f"❌ Erro ao salvar contexto: {response.status_code}")
-            
-    except Exception as e:
-        print(f"❌ Erro ao salvar contexto: {e}")
+    """Agenda a gravação do contexto na API de negócio (write-behind, fora do caminho da resposta)"""
+    fila_contexto.enfileirar(sessao_id, {
+        "tipo_contexto": "busca_numerada",
+        "contexto_estruturado": contexto_estruturado,
+        "mensagem_original": mensagem_original,
+        "resposta_apresentada": resposta_apresentada
+    })
+    cache_contexto.guardar(sessao_id, fila_contexto.pendente(sessao_id))
+
+async def _buscar_contexto_do_banco(sessao_id: str) -> dict:
+    """Busca contexto: fila de gravação pendente → cache em processo → API de negócio"""
+    pendente = fila_contexto.pendente(sessao_id)
+    if pendente is not None:
+        print(f"✅ Contexto recuperado da fila de gravação para sessão {sessao_id}")
+        return pendente
+
+    em_cache = cache_contexto.obter(sessao_id)
+    if em_cache is not None:
+        print(f"✅ Contexto recuperado do cache para sessão {sessao_id}")
+        return em_cache
 
-def _buscar_contexto_do_banco(sessao_id: str) -> dict:
-    """Busca contexto do banco via API de negócio"""
     try:
-        response = httpx.get(f"{API_NEGOCIO_URL}/contexto/{sessao_id}", timeout=10.0)
+        contexto = await obter_contexto_async(sessao_id)
         
-        if response.is_success:
-            contexto = response.json()
+        if contexto is not None:
+            cache_contexto.guardar(sessao_id, contexto)
             print(f"✅ Contexto recuperado para sessão {sessao_id}")
             return contexto
         else:
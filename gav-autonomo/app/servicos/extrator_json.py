@@ -0,0 +1,113 @@
+# gav-autonomo/app/servicos/extrator_json.py
+
+"""
+Extração incremental de um campo string de um objeto JSON em streaming.
+
+O LLM Apresentador gera um JSON ({"mensagem": "...", "tipo": ..., ...}) token
+a token. `ExtratorCampoJson` recebe os fragmentos à medida que chegam e
+devolve apenas o texto já decodificado do campo pedido (no primeiro nível do
+objeto), sem esperar o JSON terminar.
+
+`carregar_json_tolerante` faz a leitura final do mesmo texto: aceita o objeto
+cercado de texto ou de ```json ... ``` (comum nas respostas do modelo).
+"""
+
+import json
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def carregar_json_tolerante(texto: str) -> dict | None:
+    """Retorna o primeiro objeto JSON do texto, ou None se não houver um completo."""
+    try:
+        dado = json.loads(texto)
+        if isinstance(dado, dict):
+            return dado
+    except json.JSONDecodeError:
+        pass
+    decodificador = json.JSONDecoder()
+    inicio = texto.find("{")
+    while inicio != -1:
+        try:
+            dado, _ = decodificador.raw_decode(texto, inicio)
+            if isinstance(dado, dict):
+                return dado
+        except json.JSONDecodeError:
+            pass
+        inicio = texto.find("{", inicio + 1)
+    return None
+
+
+class ExtratorCampoJson:
+    def __init__(self, campo: str):
+        self.campo = campo
+        self.concluido = False
+        self._profundidade = 0
+        self._em_string = False
+        self._escape = False
+        self._unicode: str | None = None   # dígitos hex pendentes de um \uXXXX
+        self._surrogate: int | None = None  # metade alta de um par \uD83D\uDE00
+        self._string_atual: list[str] = []
+        self._ultima_string: str | None = None
+        self._chave: str | None = None      # chave cujo valor está sendo lido (nível 1)
+        self._capturando = False
+
+    def alimentar(self, fragmento: str) -> str:
+        """Processa um fragmento e retorna o texto novo do campo (pode ser "")."""
+        saida: list[str] = []
+        for c in fragmento:
+            if self._em_string:
+                self._char_em_string(c, saida)
+            elif c == '"':
+                self._em_string = True
+                self._string_atual = []
+                # Valor string de nível 1 logo após "campo":
+                self._capturando = (
+                    not self.concluido and self._profundidade == 1 and self._chave == self.campo
+                )
+            elif c in "{[":
+                self._profundidade += 1
+            elif c in "}]":
+                self._profundidade -= 1
+            elif self._profundidade == 1 and c == ":":
+                self._chave = self._ultima_string
+            elif self._profundidade == 1 and c == ",":
+                self._chave = None
+        return "".join(saida)
+
+    def _char_em_string(self, c: str, saida: list[str]):
+        if self._unicode is not None:
+            self._unicode += c
+            if len(self._unicode) == 4:
+                codigo = int(self._unicode, 16)
+                self._unicode = None
+                if 0xD800 <= codigo <= 0xDBFF:
+                    self._surrogate = codigo
+                elif 0xDC00 <= codigo <= 0xDFFF and self._surrogate is not None:
+                    self._emitir(chr(0x10000 + ((self._surrogate - 0xD800) << 10) + (codigo - 0xDC00)), saida)
+                    self._surrogate = None
+                else:
+                    self._emitir(chr(codigo), saida)
+            return
+        if self._escape:
+            self._escape = False
+            if c == "u":
+                self._unicode = ""
+            else:
+                self._emitir(_ESCAPES.get(c, c), saida)
+            return
+        if c == "\\":
+            self._escape = True
+        elif c == '"':
+            self._em_string = False
+            self._ultima_string = "".join(self._string_atual)
+            if self._capturando:
+                self._capturando = False
+                self.concluido = True
+        else:
+            self._emitir(c, saida)
+
+    def _emitir(self, c: str, saida: list[str]):
+        self._string_atual.append(c)
+        if self._capturando:
+            saida.append(c)
@@ -0,0 +1,155 @@
+# gav-autonomo/app/servicos/fila_contexto.py
+
+"""
+Fila write-behind do contexto de sessão.
+
+Gravar o contexto (POST /contexto/{sessao_id}) não precisa atrasar a resposta
+ao usuário: a apresentação enfileira o snapshot e retorna. Um worker em
+segundo plano envia à api-negocio:
+
+- só o snapshot mais recente de cada sessão (gravações mais antigas ainda não
+  enviadas são descartadas — a API só lê o último contexto mesmo);
+- com novas tentativas e backoff em caso de falha;
+- esvaziando a fila no shutdown (lifespan).
+
+Leitura das próprias escritas: enquanto um snapshot não foi confirmado pela
+API, `pendente(sessao_id)` o devolve no mesmo formato do GET /contexto.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.adaptadores.cliente_negocio import salvar_contexto_async
+from app.config.settings import config
+
+
+@dataclass
+class _Snapshot:
+    payload: dict
+    criado_em: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    tentativas: int = 0
+
+
+class FilaContexto:
+    def __init__(self, intervalo: float, max_tentativas: int, backoff_segundos: float, max_concorrencia: int):
+        self.intervalo = intervalo
+        self.max_tentativas = max_tentativas
+        self.backoff_segundos = backoff_segundos
+        self.max_concorrencia = max_concorrencia
+        self._pendentes: dict[str, _Snapshot] = {}
+        self._em_envio: dict[str, _Snapshot] = {}
+        self._evento: asyncio.Event | None = None
+        self._tarefa: asyncio.Task | None = None
+        self._encerrando = False
+        self.enfileirados = 0
+        self.sobrescritos = 0
+        self.enviados = 0
+        self.falhas = 0
+        self.descartados = 0
+
+    def iniciar(self):
+        if self._tarefa is None or self._tarefa.done():
+            self._evento = asyncio.Event()
+            self._tarefa = asyncio.get_running_loop().create_task(self._trabalhar())
+
+    def enfileirar(self, sessao_id: str, payload: dict):
+        """Agenda a gravação; um snapshot anterior ainda pendente é substituído."""
+        if sessao_id in self._pendentes:
+            self.sobrescritos += 1
+        self._pendentes[sessao_id] = _Snapshot(payload)
+        self.enfileirados += 1
+        self.iniciar()  # no-op se o worker já está rodando
+        self._evento.set()
+
+    def pendente(self, sessao_id: str) -> dict | None:
+        """Contexto ainda não confirmado pela API (formato do GET /contexto), se houver."""
+        snapshot = self._pendentes.get(sessao_id) or self._em_envio.get(sessao_id)
+        if snapshot is None:
+            return None
+        return {**snapshot.payload, "criado_em": snapshot.criado_em.isoformat()}
+
+    async def _trabalhar(self):
+        while True:
+            await self._evento.wait()
+            await asyncio.sleep(self.intervalo)  # agrupa rajadas da mesma sessão
+            self._evento.clear()
+            await self._esvaziar()
+
+    async def _esvaziar(self):
+        lote, self._pendentes = self._pendentes, {}
+        self._em_envio.update(lote)
+        limite = asyncio.Semaphore(self.max_concorrencia)
+
+        async def _enviar(sessao_id: str, snapshot: _Snapshot):
+            async with limite:
+                await self._enviar(sessao_id, snapshot)
+
+        await asyncio.gather(*(_enviar(s, snap) for s, snap in lote.items()))
+
+    async def _enviar(self, sessao_id: str, snapshot: _Snapshot):
+        try:
+            await salvar_contexto_async(sessao_id, snapshot.payload)
+            self.enviados += 1
+            print(f"✅ Contexto salvo para sessão {sessao_id}")
+        except Exception as e:
+            self.falhas += 1
+            snapshot.tentativas += 1
+            if sessao_id in self._pendentes:
+                pass  # já existe um snapshot mais novo: este pode ser descartado
+            elif self._encerrando or snapshot.tentativas >= self.max_tentativas:
+                self.descartados += 1
+                print(f"❌ Contexto da sessão {sessao_id} descartado após {snapshot.tentativas} tentativas: {e}")
+            else:
+                print(f"❌ Erro ao salvar contexto ({sessao_id}), nova tentativa: {e}")
+                asyncio.get_running_loop().call_later(
+                    self.backoff_segundos * 2 ** (snapshot.tentativas - 1), self._reenfileirar, sessao_id, snapshot
+                )
+                return  # continua visível em _em_envio até a nova tentativa
+        if self._em_envio.get(sessao_id) is snapshot:
+            del self._em_envio[sessao_id]
+
+    def _reenfileirar(self, sessao_id: str, snapshot: _Snapshot):
+        if self._em_envio.get(sessao_id) is not snapshot:
+            return  # um snapshot mais novo já foi enviado (ou está em envio)
+        del self._em_envio[sessao_id]
+        if sessao_id not in self._pendentes:
+            self._pendentes[sessao_id] = snapshot
+            self._evento.set()
+
+    async def encerrar(self):
+        """Envia o que estiver pendente (uma tentativa) e para o worker."""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        # Snapshots aguardando backoff também vão nesta última rodada
+        for sessao_id, snapshot in list(self._em_envio.items()):
+            self._pendentes.setdefault(sessao_id, snapshot)
+        self._em_envio.clear()
+        if self._pendentes:
+            print(f"ℹ️ Gravando {len(self._pendentes)} contextos pendentes antes de encerrar")
+            self._encerrando = True
+            await self._esvaziar()
+
+    def estatisticas(self) -> dict:
+        return {
+            "pendentes": len(self._pendentes),
+            "em_envio": len(self._em_envio),
+            "enfileirados": self.enfileirados,
+            "sobrescritos": self.sobrescritos,
+            "enviados": self.enviados,
+            "falhas": self.falhas,
+            "descartados": self.descartados,
+        }
+
+
+fila_contexto = FilaContexto(
+    intervalo=config.CONTEXTO_FILA_INTERVALO,
+    max_tentativas=config.CONTEXTO_FILA_MAX_TENTATIVAS,
+    backoff_segundos=config.CONTEXTO_FILA_BACKOFF_SEGUNDOS,
+    max_concorrencia=config.CONTEXTO_FILA_MAX_CONCORRENCIA,
+)
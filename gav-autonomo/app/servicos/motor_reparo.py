@@ -0,0 +1,259 @@
+# gav-autonomo/app/servicos/motor_reparo.py
+
+"""
+Reparo automático de chamadas à api-negocio que voltam com erro de validação.
+
+O LLM de reparo (prompt_reparo) recebe endpoint, body e erro e devolve um
+`body_corrigido`. O ciclo é limitado pelo bloco `reparo_automatico` do
+manifesto: no máximo `profundidade_maxima` correções por mensagem, dentro de
+`orcamento_segundos`, e só para os `codigos_erro_reparaveis`.
+
+Uma correção que deu certo vira uma transformação reaproveitável (chaves
+renomeadas, removidas, acrescentadas com valor fixo ou com o tipo trocado),
+guardada por (endpoint, assinatura do erro, forma do body). O mesmo erro de
+schema depois é corrigido localmente, sem LLM; se a transformação falhar, é
+esquecida e o LLM volta a ser consultado.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping
+
+from app.adaptadores.interface_llm import completar_para_json_async
+from app.cache import obter_prompt_e_exemplos
+
+_DIGITOS = re.compile(r"\d+")
+_CONVERSOES = {"int": int, "float": float, "str": str, "bool": bool}
+
+
+def assinatura_erro(status_code: int | None, erro: Any) -> tuple:
+    """Identifica o tipo de erro sem os valores (ex.: 422 com loc/type do FastAPI)."""
+    detalhe = erro.get("detail") if isinstance(erro, dict) else erro
+    if isinstance(detalhe, list):
+        return (status_code, tuple(sorted(
+            (".".join(str(p) for p in d.get("loc", ())), d.get("type", "")) for d in detalhe if isinstance(d, dict)
+        )))
+    return (status_code, _DIGITOS.sub("#", str(detalhe))[:200])
+
+
+def forma_body(body: Any) -> tuple:
+    if not isinstance(body, dict):
+        return (type(body).__name__,)
+    return tuple(sorted((k, type(v).__name__) for k, v in body.items()))
+
+
+@dataclass(frozen=True)
+class Transformacao:
+    """Correção aprendida, aplicável a outros bodies com a mesma forma."""
+    renomear: tuple[tuple[str, str], ...] = ()
+    remover: tuple[str, ...] = ()
+    converter: tuple[tuple[str, str], ...] = ()    # (chave, tipo)
+    acrescentar: tuple[tuple[str, str], ...] = ()  # (chave, valor em JSON)
+
+    def aplicar(self, body: dict) -> dict:
+        novo = dict(body)
+        for origem, destino in self.renomear:
+            if origem in novo:
+                novo[destino] = novo.pop(origem)
+        for chave in self.remover:
+            novo.pop(chave, None)
+        for chave, tipo in self.converter:
+            if chave in novo:
+                novo[chave] = _CONVERSOES[tipo](novo[chave])
+        for chave, valor in self.acrescentar:
+            novo.setdefault(chave, json.loads(valor))
+        return novo
+
+
+def aprender_transformacao(original: Any, corrigido: Any) -> Transformacao | None:
+    """
+    Descreve a correção do LLM como transformação das chaves do body. Se ela
+    trocou algum valor (ex.: corrigiu a query), não é generalizável: None.
+    """
+    if not isinstance(original, dict) or not isinstance(corrigido, dict) or original == corrigido:
+        return None
+    removidas = [k for k in original if k not in corrigido]
+    novas = [k for k in corrigido if k not in original]
+    renomear, acrescentar, converter = [], [], []
+
+    for chave in novas:
+        origem = next((k for k in removidas if original[k] == corrigido[chave]), None)
+        if origem is not None:
+            removidas.remove(origem)
+            renomear.append((origem, chave))
+        else:
+            acrescentar.append((chave, json.dumps(corrigido[chave], sort_keys=True)))
+
+    for chave in original.keys() & corrigido.keys():
+        antes, depois = original[chave], corrigido[chave]
+        if antes == depois and type(antes) is type(depois):
+            continue
+        tipo = type(depois).__name__
+        if tipo not in _CONVERSOES:
+            return None
+        try:
+            if _CONVERSOES[tipo](antes) != depois:
+                return None
+        except (TypeError, ValueError):
+            return None
+        converter.append((chave, tipo))
+
+    return Transformacao(tuple(renomear), tuple(removidas), tuple(sorted(converter)), tuple(sorted(acrescentar)))
+
+
+class CacheCorrecoes:
+    def __init__(self, max_itens: int = 500):
+        self.max_itens = max_itens
+        self._itens: OrderedDict[tuple, Transformacao] = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.invalidadas = 0
+
+    def obter(self, chave: tuple) -> Transformacao | None:
+        with self._lock:
+            transformacao = self._itens.get(chave)
+            if transformacao is None:
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return transformacao
+
+    def guardar(self, chave: tuple, transformacao: Transformacao):
+        with self._lock:
+            self._itens[chave] = transformacao
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, chave: tuple):
+        with self._lock:
+            if self._itens.pop(chave, None) is not None:
+                self.invalidadas += 1
+
+    def estatisticas(self) -> dict:
+        return {
+            "itens": len(self._itens),
+            "max_itens": self.max_itens,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "invalidadas": self.invalidadas,
+        }
+
+
+class MotorReparo:
+    def __init__(self):
+        self.cache = CacheCorrecoes()
+        self.reparos = 0
+        self.correcoes_llm = 0
+        self.correcoes_cache = 0
+        self.sucessos = 0
+        self.falhas = 0
+        self.esgotados_profundidade = 0
+        self.esgotados_orcamento = 0
+
+    def reparavel(self, response: dict, cfg: Mapping) -> bool:
+        return bool(cfg.get("ativo")) and response.get("status_code") in cfg.get("codigos_erro_reparaveis", (400, 422))
+
+    async def _corrigir_via_llm(self, params: dict, body: Any, erro: dict, cfg: Mapping) -> Any:
+        p_reparo, exemplos_reparo = await obter_prompt_e_exemplos(
+            nome=cfg.get("prompt_reparo", "prompt_api_repair"), espaco="autonomo", versao=1
+        )
+        contexto_reparo = f"""endpoint_original: {params.get('endpoint')}
+method_original: {params.get('method')}
+body_original: {json.dumps(body)}
+erro_retornado: {json.dumps(erro.get('error', {}))}
+mensagem_usuario: (contexto da mensagem original)"""
+
+        correcao = await completar_para_json_async(
+            sistema=p_reparo["template"],
+            entrada_usuario=contexto_reparo,
+            exemplos=exemplos_reparo,
+            prompt=p_reparo
+        )
+        self.correcoes_llm += 1
+        return correcao.get("body_corrigido", body)
+
+    async def reparar(self, params: dict, erro_response: dict, requisitar: Callable[[Any], Awaitable[dict]],
+                      cfg: Mapping) -> dict:
+        """
+        Corrige o body e refaz a chamada até dar certo ou esgotar profundidade/orçamento.
+        `requisitar(body)` faz a chamada HTTP. Retorna a última resposta padronizada.
+        """
+        self.cache.max_itens = cfg.get("cache_correcoes", {}).get("max_itens", self.cache.max_itens)
+        profundidade = cfg.get("profundidade_maxima", 2)
+        limite = time.monotonic() + cfg.get("orcamento_segundos", 20)
+        self.reparos += 1
+
+        body = params.get("body", {})
+        response = erro_response
+        for _ in range(profundidade):
+            chave = (
+                params.get("endpoint", ""), params.get("method", "GET").upper(),
+                assinatura_erro(response.get("status_code"), response.get("error")), forma_body(body),
+            )
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                self.esgotados_orcamento += 1
+                return response
+
+            transformacao = self.cache.obter(chave)
+            if transformacao is not None:
+                try:
+                    corrigido = transformacao.aplicar(body)
+                    self.correcoes_cache += 1
+                except Exception as e:
+                    # Correção aprendida não serve mais para este body: esquece e pergunta ao LLM
+                    print(f"ℹ️ Correção em cache não se aplica ({e}); reparando via LLM")
+                    self.cache.invalidar(chave)
+                    transformacao = None
+            try:
+                if transformacao is None:
+                    corrigido = await asyncio.wait_for(self._corrigir_via_llm(params, body, response, cfg), restante)
+                novo = await requisitar(corrigido)
+            except asyncio.TimeoutError:
+                self.esgotados_orcamento += 1
+                return response
+            except Exception as e:
+                print(f"❌ Reparo automático falhou: {e}. Erro original: {response.get('error')}")
+                self.falhas += 1
+                return response
+
+            if novo.get("success"):
+                self.sucessos += 1
+                if transformacao is None:
+                    aprendida = aprender_transformacao(body, corrigido)
+                    if aprendida is not None:
+                        self.cache.guardar(chave, aprendida)
+                return novo
+
+            if transformacao is not None:
+                self.cache.invalidar(chave)
+            if not self.reparavel(novo, cfg):
+                self.falhas += 1
+                return novo
+            body, response = corrigido, novo
+
+        self.esgotados_profundidade += 1
+        return response
+
+    def estatisticas(self) -> dict:
+        return {
+            "reparos": self.reparos,
+            "correcoes_llm": self.correcoes_llm,
+            "correcoes_cache": self.correcoes_cache,
+            "sucessos": self.sucessos,
+            "falhas": self.falhas,
+            "esgotados_profundidade": self.esgotados_profundidade,
+            "esgotados_orcamento": self.esgotados_orcamento,
+            "cache": self.cache.estatisticas(),
+        }
+
+
+motor_reparo = MotorReparo()
@@ -0,0 +1,16 @@
+# gav-autonomo/app/servicos/normalizacao.py
+
+"""Normalização de texto do usuário usada como chave de caches e roteamento."""
+
+import re
+import unicodedata
+
+_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados ("  Ver  Carrinho " → "ver carrinho")."""
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", texto or "") if not unicodedata.combining(c)
+    )
+    return _ESPACOS.sub(" ", sem_acentos.lower()).strip()
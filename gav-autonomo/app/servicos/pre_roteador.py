@@ -0,0 +1,194 @@
+# gav-autonomo/app/servicos/pre_roteador.py
+
+"""
+Pré-roteador determinístico, executado antes do LLM Selector.
+
+Mensagens de intenção óbvia ("ver carrinho", um ID de item solto, "oi") não
+precisam de uma geração no Ollama. O bloco `pre_roteador` do manifesto declara:
+
+- regras: expressões regulares (sobre o texto normalizado) com a decisão a
+  emitir; `{texto}` e grupos nomeados do padrão são substituídos na decisão.
+  Variáveis listadas em `contexto` vêm do contexto estruturado da sessão
+  (ex.: `query` da última busca); sem elas a regra não se aplica;
+- classificador: vizinho mais próximo no índice TF-IDF de n-gramas
+  (`seletor_exemplos`) dos `prompt_exemplos` ativos do próprio Selector.
+
+A saída tem o mesmo formato {tool_name, parameters} do Selector. Abaixo do
+limiar de confiança a mensagem segue para o LLM.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from app.adaptadores.montagem_prompt import chave_prompt
+from app.config.manifesto import descongelar
+from app.servicos.seletor_exemplos import IndiceExemplos, seletor_exemplos
+from app.servicos.normalizacao import normalizar_texto
+
+_VARIAVEL = re.compile(r"\{(\w+)\}")
+_PALAVRA = re.compile(r"\w{3,}")
+
+
+def _preencher(valor, variaveis: dict):
+    """Substitui {variavel} conhecidas; desconhecidas (ex.: {sessao_id}) ficam intactas."""
+    if isinstance(valor, str):
+        return _VARIAVEL.sub(lambda m: str(variaveis.get(m.group(1), m.group(0))), valor)
+    if isinstance(valor, dict):
+        return {k: _preencher(v, variaveis) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_preencher(v, variaveis) for v in valor]
+    return valor
+
+
+@dataclass(frozen=True)
+class RegraRoteamento:
+    id: str
+    padrao: re.Pattern
+    decisao: dict
+    contexto: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class _ExemploRotulado:
+    texto: str
+    decisao: dict
+    depende_da_entrada: bool  # saída copia palavras da entrada (ex.: query da busca)
+
+
+class ClassificadorExemplos:
+    """Vizinho mais próximo sobre os exemplos few-shot do Selector."""
+
+    def __init__(self, indice: IndiceExemplos):
+        self.indice = indice
+        self.itens: dict[int, _ExemploRotulado] = {}
+        for ex in indice.exemplos:
+            try:
+                decisao = json.loads(ex.get("exemplo_output_json") or "")
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(decisao, dict) or "tool_name" not in decisao:
+                continue
+            texto = normalizar_texto(ex.get("exemplo_input") or "")
+            saida = normalizar_texto(json.dumps(decisao.get("parameters", {}), ensure_ascii=False))
+            self.itens[id(ex)] = _ExemploRotulado(
+                texto=texto,
+                decisao=decisao,
+                depende_da_entrada=any(p in saida for p in _PALAVRA.findall(texto)),
+            )
+
+    def classificar(self, texto_normalizado: str) -> tuple[dict | None, float]:
+        encontrados = self.indice.buscar(texto_normalizado, 1)
+        if not encontrados:
+            return None, 0.0
+        exemplo, similaridade = encontrados[0]
+        item = self.itens.get(id(exemplo))
+        if item is None:
+            return None, 0.0
+        # Exemplos cuja saída copia a entrada ("quero coca" → query "coca") só valem com texto idêntico
+        if item.depende_da_entrada and item.texto != texto_normalizado:
+            return None, 0.0
+        return item.decisao, similaridade
+
+
+class PreRoteador:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cfg_regras = None
+        self._regras: tuple[RegraRoteamento, ...] = ()
+        self._chave_classificador = None
+        self._classificador: ClassificadorExemplos | None = None
+        self.acertos_por_origem: Counter = Counter()
+        self.faltas = 0
+        self.tempo_economizado_s = 0.0
+        self._latencia_llm_media: float | None = None  # EWMA da latência do Selector
+
+    def _regras_compiladas(self, cfg) -> tuple[RegraRoteamento, ...]:
+        regras_cfg = cfg.get("regras", ())
+        if regras_cfg is not self._cfg_regras:  # manifesto recarregado
+            with self._lock:
+                self._regras = tuple(
+                    RegraRoteamento(
+                        id=r["id"], padrao=re.compile(r["padrao"]), decisao=descongelar(r["decisao"]),
+                        contexto=tuple(r.get("contexto", ())),
+                    )
+                    for r in regras_cfg
+                )
+                self._cfg_regras = regras_cfg
+        return self._regras
+
+    def _classificador_para(self, prompt: dict, exemplos: list[dict]) -> ClassificadorExemplos:
+        chave = chave_prompt(prompt)
+        if self._classificador is None or chave != self._chave_classificador:
+            with self._lock:
+                self._classificador = ClassificadorExemplos(seletor_exemplos.indice(prompt, exemplos))
+                self._chave_classificador = chave
+        return self._classificador
+
+    def requer_contexto(self, texto: str, cfg) -> bool:
+        """True se alguma regra que casa com o texto usa variáveis do contexto da sessão."""
+        normalizado = normalizar_texto(texto)
+        return any(r.contexto and r.padrao.search(normalizado) for r in self._regras_compiladas(cfg))
+
+    def rotear(self, texto: str, cfg, prompt: dict, exemplos: list[dict], contexto: dict | None = None) -> dict | None:
+        """Retorna a decisão {tool_name, parameters} ou None para seguir ao LLM."""
+        inicio = time.perf_counter()
+        normalizado = normalizar_texto(texto)
+        limiar = cfg.get("limiar_confianca", 0.9)
+
+        decisao, origem = None, None
+        for regra in self._regras_compiladas(cfg):
+            m = regra.padrao.search(normalizado)
+            if not m:
+                continue
+            valores_contexto = {nome: (contexto or {}).get(nome) for nome in regra.contexto}
+            if not all(valores_contexto.values()):
+                continue  # sessão sem o dado que a regra precisa: outra regra ou o LLM decide
+            variaveis = {
+                "texto": texto.strip(), **valores_contexto,
+                **{k: v for k, v in m.groupdict().items() if v is not None},
+            }
+            decisao, origem = _preencher(regra.decisao, variaveis), f"regra:{regra.id}"
+            break
+
+        cfg_classificador = cfg.get("classificador", {})
+        if decisao is None and cfg_classificador.get("ativo"):
+            candidata, confianca = self._classificador_para(prompt, exemplos).classificar(normalizado)
+            if candidata is not None and confianca >= cfg_classificador.get("limiar_confianca", limiar):
+                decisao, origem = json.loads(json.dumps(candidata)), "classificador"
+
+        if decisao is None:
+            self.faltas += 1
+            return None
+
+        self.acertos_por_origem[origem] += 1
+        if self._latencia_llm_media is not None:
+            self.tempo_economizado_s += max(self._latencia_llm_media - (time.perf_counter() - inicio), 0.0)
+        print(f"⚡ Pré-roteador ({origem}) decidiu sem LLM")
+        return decisao
+
+    def registrar_latencia_llm(self, segundos: float):
+        """Alimenta a média móvel da latência do Selector (base do tempo economizado)."""
+        if self._latencia_llm_media is None:
+            self._latencia_llm_media = segundos
+        else:
+            self._latencia_llm_media = 0.8 * self._latencia_llm_media + 0.2 * segundos
+
+    def estatisticas(self) -> dict:
+        acertos = sum(self.acertos_por_origem.values())
+        total = acertos + self.faltas
+        return {
+            "acertos": acertos,
+            "acertos_por_origem": dict(self.acertos_por_origem),
+            "faltas": self.faltas,
+            "taxa_acerto": round(acertos / total, 4) if total else 0.0,
+            "latencia_media_llm_s": round(self._latencia_llm_media or 0.0, 3),
+            "tempo_economizado_s": round(self.tempo_economizado_s, 3),
+            "exemplos_indexados": len(self._classificador.itens) if self._classificador else 0,
+        }
+
+
+pre_roteador = PreRoteador()
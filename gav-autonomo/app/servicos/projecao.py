@@ -0,0 +1,116 @@
+# gav-autonomo/app/servicos/projecao.py
+
+"""
+Projeção do resultado da API antes de ir para o prompt do Apresentador.
+
+O JSON devolvido pela api-negocio traz campos que o Apresentador não usa
+(ids internos, preços nulos, todos os `itens` de cada produto). O bloco
+`apresentacao.projecoes` do manifesto declara, por endpoint (template), a
+forma a manter:
+
+    campos:            # só estas chaves; valor ~ mantém o campo como está
+      descricao: ~
+      itens:           # sub-projeção (para listas, vale por elemento)
+        max_itens: 3
+        campos: {unidade: ~, pvenda: ~}
+    max_itens: 10      # para listas: mantém só os primeiros
+
+Campos nulos são removidos e o JSON é serializado sem espaços. A resposta
+ao cliente (`dados_originais`) continua completa, e resultados de erro não
+são projetados.
+"""
+
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Mapping
+
+_REMOVER = object()
+
+
+def _projetar(valor: Any, forma, remover_nulos: bool) -> Any:
+    if isinstance(valor, list):
+        limite = forma.get("max_itens") if isinstance(forma, Mapping) else None
+        itens = valor[:limite] if limite is not None else valor
+        return [v for v in (_projetar(i, forma, remover_nulos) for i in itens) if v is not _REMOVER]
+
+    if isinstance(valor, dict):
+        campos = forma.get("campos") if isinstance(forma, Mapping) else None
+        saida = {}
+        for chave, sub in valor.items():
+            if campos is not None and chave not in campos:
+                continue
+            projetado = _projetar(sub, campos.get(chave) if campos is not None else None, remover_nulos)
+            if projetado is not _REMOVER:
+                saida[chave] = projetado
+        return saida
+
+    if remover_nulos and valor is None:
+        return _REMOVER
+    return valor
+
+
+def projetar(json_resultado: Any, forma, remover_nulos: bool = True) -> Any:
+    resultado = _projetar(json_resultado, forma, remover_nulos)
+    return None if resultado is _REMOVER else resultado
+
+
+def forma_para(endpoint: str, projecoes: Mapping) -> Mapping | None:
+    """Projeção do endpoint exato ou, na falta, do maior prefixo declarado."""
+    if endpoint in projecoes:
+        return projecoes[endpoint]
+    candidatos = [e for e in projecoes if endpoint.startswith(e)]
+    return projecoes[max(candidatos, key=len)] if candidatos else None
+
+
+def serializar(valor: Any, compacto: bool) -> str:
+    if compacto:
+        return json.dumps(valor, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def estimar_tokens(texto: str) -> int:
+    # ~4 caracteres por token; o valor real por prompt vem de prompt_eval_count (/admin/llm)
+    return (len(texto) + 3) // 4
+
+
+class EstatisticasProjecao:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_endpoint: dict[str, list[int]] = defaultdict(lambda: [0, 0, 0])  # [chamadas, antes, depois]
+
+    def registrar(self, endpoint: str, tokens_antes: int, tokens_depois: int):
+        with self._lock:
+            estat = self._por_endpoint[endpoint]
+            estat[0] += 1
+            estat[1] += tokens_antes
+            estat[2] += tokens_depois
+
+    def resumo(self) -> dict:
+        return {
+            endpoint: {
+                "chamadas": n,
+                "media_tokens_antes": round(antes / n, 1),
+                "media_tokens_depois": round(depois / n, 1),
+                "reducao": round(1 - depois / antes, 4) if antes else 0.0,
+            }
+            for endpoint, (n, antes, depois) in self._por_endpoint.items()
+        }
+
+
+estatisticas_projecao = EstatisticasProjecao()
+
+
+def json_para_apresentacao(json_resultado: Any, endpoint: str, cfg_apresentacao: Mapping) -> str:
+    """Serializa o resultado da API para o prompt, aplicando a projeção do endpoint."""
+    completo = json.dumps(json_resultado, ensure_ascii=False)
+    if isinstance(json_resultado, dict) and ("erro" in json_resultado or json_resultado.get("success") is False):
+        return completo  # o Apresentador de erro precisa da mensagem inteira
+    forma = forma_para(endpoint, cfg_apresentacao.get("projecoes", {}))
+    if forma is None:
+        return completo
+
+    projetado = projetar(json_resultado, forma, cfg_apresentacao.get("remover_nulos", True))
+    texto = serializar(projetado, cfg_apresentacao.get("json_compacto", True))
+    estatisticas_projecao.registrar(endpoint, estimar_tokens(completo), estimar_tokens(texto))
+    return texto
@@ -0,0 +1,154 @@
+# gav-autonomo/app/servicos/seletor_exemplos.py
+
+"""
+Seleção de exemplos few-shot por relevância.
+
+Em vez de embutir todos os `prompt_exemplos` ativos em cada chamada, o prompt
+leva um núcleo fixo (configurado no manifesto) e os k exemplos mais parecidos
+com a mensagem do usuário. A similaridade é TF-IDF de n-gramas de caracteres,
+com hashing para um vetor de dimensão fixa, calculada em NumPy — sem modelo
+de embeddings nem rede.
+
+O índice é mantido por prompt e atualizado incrementalmente: quando o cache
+de prompts traz uma lista de exemplos nova (ex.: após um POST em
+/admin/prompts/{id}/exemplos), só os exemplos de id novo são vetorizados.
+"""
+
+import threading
+import zlib
+
+import numpy as np
+
+from app.adaptadores.montagem_prompt import chave_prompt
+from app.servicos.normalizacao import normalizar_texto
+
+DIMENSAO = 1 << 12
+TAMANHOS_NGRAMA = (3, 4)
+
+
+def _id_exemplo(exemplo: dict):
+    return exemplo.get("id") if exemplo.get("id") is not None else exemplo.get("exemplo_input")
+
+
+def vetorizar(texto: str) -> np.ndarray:
+    """Frequência bruta dos n-gramas de caracteres, por hashing (crc32 é estável entre processos)."""
+    vetor = np.zeros(DIMENSAO, dtype=np.float32)
+    texto = f" {normalizar_texto(texto)} "
+    for n in TAMANHOS_NGRAMA:
+        for i in range(max(len(texto) - n + 1, 1)):
+            vetor[zlib.crc32(texto[i:i + n].encode("utf-8")) & (DIMENSAO - 1)] += 1.0
+    return vetor
+
+
+class IndiceExemplos:
+    """Matriz TF-IDF dos `exemplo_input` de um prompt."""
+
+    def __init__(self):
+        self.exemplos: list[dict] = []
+        self._ids: list = []
+        self._tf = np.zeros((0, DIMENSAO), dtype=np.float32)
+        self._df = np.zeros(DIMENSAO, dtype=np.float32)
+        self._idf = np.ones(DIMENSAO, dtype=np.float32)
+        self._matriz = np.zeros((0, DIMENSAO), dtype=np.float32)  # TF-IDF, linhas normalizadas
+        self.vetorizados = 0
+
+    def sincronizar(self, exemplos: list[dict]) -> bool:
+        """Aplica a diferença por id em relação à lista atual. Retorna True se mudou."""
+        novos_ids = [_id_exemplo(ex) for ex in exemplos]
+        if novos_ids == self._ids:
+            self.exemplos = list(exemplos)  # mesmo conteúdo, dicts possivelmente novos
+            return False
+
+        linhas = dict(zip(self._ids, self._tf))
+        tf = []
+        for id_ex, ex in zip(novos_ids, exemplos):
+            linha = linhas.get(id_ex)
+            if linha is None:
+                linha = vetorizar(ex.get("exemplo_input") or "")
+                self.vetorizados += 1
+            tf.append(linha)
+
+        self.exemplos = list(exemplos)
+        self._ids = novos_ids
+        self._tf = np.vstack(tf) if tf else np.zeros((0, DIMENSAO), dtype=np.float32)
+        self._df = (self._tf > 0).sum(axis=0).astype(np.float32)
+        n = len(tf)
+        self._idf = (np.log((1.0 + n) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        self._matriz = self._normalizar(self._tf * self._idf)
+        return True
+
+    @staticmethod
+    def _normalizar(matriz: np.ndarray) -> np.ndarray:
+        normas = np.linalg.norm(matriz, axis=-1, keepdims=True)
+        return matriz / np.where(normas == 0, 1.0, normas)
+
+    def buscar(self, texto: str, k: int) -> list[tuple[dict, float]]:
+        """Os k exemplos mais similares ao texto, com a similaridade de cosseno."""
+        if not self.exemplos or k <= 0:
+            return []
+        consulta = self._normalizar(vetorizar(texto) * self._idf)
+        similaridades = self._matriz @ consulta
+        k = min(k, len(self.exemplos))
+        topo = np.argpartition(-similaridades, k - 1)[:k]
+        topo = topo[np.argsort(-similaridades[topo], kind="stable")]
+        return [(self.exemplos[i], float(similaridades[i])) for i in topo]
+
+
+class SeletorExemplos:
+    """Um índice por prompt (id), sincronizado quando o prompt muda na api-negocio."""
+
+    def __init__(self):
+        self._indices: dict = {}
+        self._chaves: dict = {}
+        self._lock = threading.Lock()
+        self.selecoes = 0
+        self.exemplos_disponiveis = 0
+        self.exemplos_enviados = 0
+
+    def indice(self, prompt: dict, exemplos: list[dict]) -> IndiceExemplos:
+        id_prompt = prompt.get("id")
+        chave = chave_prompt(prompt)
+        indice = self._indices.get(id_prompt)
+        if indice is None or self._chaves.get(id_prompt) != chave or chave is None:
+            with self._lock:
+                indice = self._indices.setdefault(id_prompt, IndiceExemplos())
+                if indice.sincronizar(exemplos):
+                    print(f"ℹ️ Índice de exemplos de {prompt.get('nome')} atualizado ({len(exemplos)} exemplos)")
+                self._chaves[id_prompt] = chave
+        return indice
+
+    def selecionar(self, prompt: dict, exemplos: list[dict], texto: str, cfg) -> tuple[list[dict], list[dict]]:
+        """
+        Retorna (fixos, selecionados): o núcleo fixo, que fica no prefixo estável
+        do prompt, e os top-k por similaridade, que vão junto com a entrada.
+        Prompts com poucos exemplos seguem com todos eles no prefixo.
+        """
+        if len(exemplos) <= cfg.get("min_exemplos", 8):
+            return exemplos, []
+
+        ids_fixos = set(cfg.get("fixos", {}).get(prompt.get("nome"), ()))
+        fixos = [ex for ex in exemplos if ex.get("id") in ids_fixos]
+        top_k = cfg.get("top_k", 4)
+        minima = cfg.get("similaridade_minima", 0.0)
+        selecionados = [
+            ex for ex, similaridade in self.indice(prompt, exemplos).buscar(texto, top_k + len(fixos))
+            if ex.get("id") not in ids_fixos and similaridade >= minima
+        ][:top_k]
+
+        self.selecoes += 1
+        self.exemplos_disponiveis += len(exemplos)
+        self.exemplos_enviados += len(fixos) + len(selecionados)
+        return fixos, selecionados
+
+    def estatisticas(self) -> dict:
+        return {
+            "prompts_indexados": len(self._indices),
+            "exemplos_indexados": {str(k): len(v.exemplos) for k, v in self._indices.items()},
+            "vetorizacoes": sum(v.vetorizados for v in self._indices.values()),
+            "selecoes": self.selecoes,
+            "media_exemplos_disponiveis": round(self.exemplos_disponiveis / self.selecoes, 1) if self.selecoes else 0.0,
+            "media_exemplos_enviados": round(self.exemplos_enviados / self.selecoes, 1) if self.selecoes else 0.0,
+        }
+
+
+seletor_exemplos = SeletorExemplos()
@@ -0,0 +1,128 @@
+# gav-autonomo/app/servicos/templates_apresentacao.py
+
+"""
+Apresentação por template, sem a segunda geração no LLM.
+
+Respostas como "carrinho vazio", "item adicionado" ou uma busca sem
+resultados não precisam do Apresentador: o bloco `apresentacao.templates` do
+manifesto declara, para cada prompt de apresentação, templates Jinja
+(ambiente sandbox) com uma condição `quando`. O primeiro que casar produz o
+mesmo formato do LLM: {mensagem, tipo, contexto_estruturado}.
+
+Um template pode declarar `usar_llm_ate_ms`: se a latência média recente do
+Apresentador estiver dentro desse orçamento, o LLM é usado mesmo assim.
+"""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from jinja2.sandbox import SandboxedEnvironment
+
+
+def _moeda(valor: Any) -> str:
+    try:
+        texto = f"{float(valor):,.2f}"
+    except (TypeError, ValueError):
+        return str(valor)
+    return "R$ " + texto.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+_ambiente = SandboxedEnvironment(trim_blocks=True, lstrip_blocks=True, autoescape=False)
+_ambiente.filters["moeda"] = _moeda
+
+
+@dataclass(frozen=True)
+class TemplateApresentacao:
+    id: str
+    prompt: str
+    quando: Any           # expressão compilada (None = sempre)
+    mensagem: Any         # template compilado
+    tipo: str
+    contexto_estruturado: Any  # expressão compilada (None = {})
+    usar_llm_ate_ms: float | None
+
+
+def compilar_templates(cfg_templates) -> dict[str, tuple[TemplateApresentacao, ...]]:
+    """Compila os templates do manifesto, agrupados pelo prompt de apresentação que substituem."""
+    por_prompt: dict[str, list[TemplateApresentacao]] = {}
+    for t in cfg_templates:
+        por_prompt.setdefault(t["prompt"], []).append(TemplateApresentacao(
+            id=t["id"],
+            prompt=t["prompt"],
+            quando=_ambiente.compile_expression(t["quando"]) if t.get("quando") else None,
+            mensagem=_ambiente.from_string(t["mensagem"]),
+            tipo=t.get("tipo", "apresentacao"),
+            contexto_estruturado=(
+                _ambiente.compile_expression(t["contexto_estruturado"]) if t.get("contexto_estruturado") else None
+            ),
+            usar_llm_ate_ms=t.get("usar_llm_ate_ms"),
+        ))
+    return {prompt: tuple(lista) for prompt, lista in por_prompt.items()}
+
+
+class MotorTemplates:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cfg = None
+        self._templates: dict[str, tuple[TemplateApresentacao, ...]] = {}
+        self._latencia_llm: dict[str, float] = {}  # EWMA por prompt de apresentação (ms)
+        self.renderizacoes: Counter = Counter()
+        self.llm_por_orcamento = 0
+        self.sem_template = 0
+        self.erros = 0
+
+    def _compilados(self, cfg_templates) -> dict[str, tuple[TemplateApresentacao, ...]]:
+        if cfg_templates is not self._cfg:  # manifesto recarregado
+            with self._lock:
+                try:
+                    self._templates = compilar_templates(cfg_templates)
+                except Exception as e:
+                    # Mantém os templates anteriores, como o manifesto faz com um YAML inválido
+                    print(f"❌ Templates de apresentação inválidos: {e}")
+                self._cfg = cfg_templates
+        return self._templates
+
+    def renderizar(self, prompt: str, variaveis: dict, cfg_apresentacao: Mapping) -> dict | None:
+        """Resposta {mensagem, tipo, contexto_estruturado} ou None para usar o LLM."""
+        for template in self._compilados(cfg_apresentacao.get("templates", ())).get(prompt, ()):
+            try:
+                if template.quando is not None and not template.quando(**variaveis):
+                    continue
+                if template.usar_llm_ate_ms is not None and self._latencia_llm.get(prompt, float("inf")) <= template.usar_llm_ate_ms:
+                    self.llm_por_orcamento += 1
+                    return None
+                resposta = {
+                    "mensagem": template.mensagem.render(**variaveis).strip(),
+                    "tipo": template.tipo,
+                    "contexto_estruturado": (
+                        template.contexto_estruturado(**variaveis) if template.contexto_estruturado is not None else {}
+                    ),
+                }
+            except Exception as e:
+                self.erros += 1
+                print(f"❌ Template de apresentação {template.id} falhou, usando LLM: {e}")
+                return None
+            self.renderizacoes[template.id] += 1
+            return resposta
+        self.sem_template += 1
+        return None
+
+    def registrar_latencia_llm(self, prompt: str, segundos: float):
+        anterior = self._latencia_llm.get(prompt)
+        ms = segundos * 1000
+        self._latencia_llm[prompt] = ms if anterior is None else 0.8 * anterior + 0.2 * ms
+
+    def estatisticas(self) -> dict:
+        return {
+            "renderizacoes": sum(self.renderizacoes.values()),
+            "renderizacoes_por_template": dict(self.renderizacoes),
+            "llm_por_orcamento": self.llm_por_orcamento,
+            "sem_template": self.sem_template,
+            "erros": self.erros,
+            "latencia_media_llm_ms": {p: round(v, 1) for p, v in self._latencia_llm.items()},
+        }
+
+
+motor_templates = MotorTemplates()
@@ -3,8 +3,11 @@
 
 from pydantic import BaseModel
 from typing import Literal, Union, Dict, Any
+from dataclasses import dataclass, asdict
 from pathlib import Path
+import threading
 import json
+from jsonschema.validators import validator_for
 
 class ToolCall(BaseModel):
     tool_name: str           # nome da ferramenta decidido pelo LLM
@@ -21,22 +24,11 @@ MANIFEST_SCHEMA_TOOL_SELECTOR = {
     "additionalProperties": False
 }
 
-def validar_json_contra_schema(json_dado: Dict[str, Any], schema: Dict[str, Any]) -> bool:
-    """
-    Valida um JSON contra um JSON Schema. Retorna True/False.
-    (Sem regras de negócio; só estrutura.)
-    """
-    try:
-        from jsonschema import validate
-        validate(instance=json_dado, schema=schema)
-        return True
-    except Exception:
-        return False
-
 # === Loader de schemas robusto ===
 # Aceita dict pronto OU nome/relativo/absoluto de arquivo .json
 APP_DIR = Path(__file__).resolve().parents[1]               # .../app
 SCHEMAS_DIR = APP_DIR / "validadores" / "esquemas"          # .../app/validadores/esquemas
+SCHEMAS_DIRS_EXTRAS = [APP_DIR / "esquemas"]                # .../app/esquemas
 
 def _resolver_caminho_schema(schema_name_or_path: str) -> Path:
     p = Path(schema_name_or_path)
@@ -69,7 +61,107 @@ def carregar_schema(schema_ref: Any) -> Dict[str, Any]:
     if isinstance(schema_ref, dict):
         return schema_ref
     if isinstance(schema_ref, str):
-        caminho = _resolver_caminho_schema(schema_ref)
-        with caminho.open(encoding="utf-8") as f:
-            return json.load(f)
-    raise TypeError("schema deve ser um dict ou um caminho (str) para .json")
\ No newline at end of file
+        return registro_schemas.obter(schema_ref).schema
+    raise TypeError("schema deve ser um dict ou um caminho (str) para .json")
+
+
+# === Registro de schemas compilados ===
+# Cada schema é lido do disco uma vez e vira uma instância de validador
+# (classe escolhida pelo $schema, ex.: Draft202012Validator) reaproveitada
+# em todas as validações.
+
+@dataclass(frozen=True)
+class ErroValidacao:
+    caminho: str      # ex.: "/parameters/method"
+    mensagem: str
+    validador: str    # palavra-chave do schema que falhou (enum, required, ...)
+
+@dataclass(frozen=True)
+class SchemaCompilado:
+    schema: Dict[str, Any]
+    validador: Any
+
+def _compilar(schema: Dict[str, Any]) -> SchemaCompilado:
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return SchemaCompilado(schema=schema, validador=cls(schema))
+
+class RegistroSchemas:
+    def __init__(self, diretorios: list[Path]):
+        self.diretorios = diretorios
+        self._por_ref: dict[str, SchemaCompilado] = {}
+        self._por_id: dict[int, SchemaCompilado] = {}   # schemas passados como dict
+        self._lock = threading.Lock()
+
+    def carregar(self):
+        """Compila todos os .json dos diretórios de schemas."""
+        for diretorio in self.diretorios:
+            for caminho in sorted(diretorio.glob("*.json")):
+                compilado = self._de_arquivo(caminho)
+                # Nome puro: o primeiro diretório tem precedência (mesma ordem de _resolver_caminho_schema)
+                self._por_ref.setdefault(caminho.name, compilado)
+                self._por_ref[str(caminho.relative_to(APP_DIR))] = compilado
+        print(f"Schemas compilados: {len(self._por_ref)} referências.")
+
+    def _de_arquivo(self, caminho: Path) -> SchemaCompilado:
+        chave = str(caminho.resolve())
+        compilado = self._por_ref.get(chave)
+        if compilado is None:
+            with caminho.open(encoding="utf-8") as f:
+                compilado = _compilar(json.load(f))
+            self._por_ref[chave] = compilado
+            self._por_id[id(compilado.schema)] = compilado
+        return compilado
+
+    def obter(self, schema_ref: Any) -> SchemaCompilado:
+        if isinstance(schema_ref, dict):
+            compilado = self._por_id.get(id(schema_ref))
+            if compilado is None or compilado.schema is not schema_ref:
+                compilado = _compilar(schema_ref)
+                with self._lock:
+                    self._por_id[id(schema_ref)] = compilado
+            return compilado
+        if isinstance(schema_ref, str):
+            compilado = self._por_ref.get(schema_ref)
+            if compilado is None:
+                with self._lock:
+                    compilado = self._de_arquivo(_resolver_caminho_schema(schema_ref))
+                    self._por_ref[schema_ref] = compilado
+            return compilado
+        raise TypeError("schema deve ser um dict ou um caminho (str) para .json")
+
+    def validar(self, json_dado: Any, schema_ref: Any) -> list[ErroValidacao]:
+        validador = self.obter(schema_ref).validador
+        erros = sorted(validador.iter_errors(json_dado), key=lambda e: list(map(str, e.absolute_path)))
+        return [
+            ErroValidacao(
+                caminho="/" + "/".join(str(p) for p in e.absolute_path),
+                mensagem=e.message,
+                validador=str(e.validator),
+            )
+            for e in erros
+        ]
+
+registro_schemas = RegistroSchemas([SCHEMAS_DIR, *SCHEMAS_DIRS_EXTRAS])
+registro_schemas.carregar()
+
+def validar_com_erros(json_dado: Any, schema: Any) -> list[dict]:
+    """
+    Valida um JSON contra um JSON Schema e devolve a lista de erros
+    estruturados ([] se válido), pronta para ser reaproveitada em prompts de reparo.
+    """
+    return [asdict(e) for e in registro_schemas.validar(json_dado, schema)]
+
+def validar_json_contra_schema(json_dado: Dict[str, Any], schema: Dict[str, Any]) -> bool:
+    """
+    Valida um JSON contra um JSON Schema. Retorna True/False.
+    (Sem regras de negócio; só estrutura.)
+    """
+    try:
+        return not registro_schemas.validar(json_dado, schema)
+    except Exception:
+        return False
+
+def formatar_erros_validacao(erros: list[dict]) -> str:
+    """Resumo compacto dos erros, uma linha por erro, para incluir em prompts."""
+    return "\n".join(f"- {e['caminho']}: {e['mensagem']} ({e['validador']})" for e in erros)
\ No newline at end of file
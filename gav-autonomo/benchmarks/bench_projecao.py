@@ -0,0 +1,110 @@
+# gav-autonomo/benchmarks/bench_projecao.py
+
+"""
+Benchmark da projeção do resultado da busca no prompt do Apresentador.
+
+1. Gravar um conjunto de buscas (respostas reais da api-negocio):
+    python -m benchmarks.bench_projecao gravar [--saida benchmarks/buscas_gravadas.jsonl]
+
+2. Medir tokens do contexto antes/depois da projeção (estimados) e, com --llm,
+   o prompt_eval_count real e a latência do Apresentador no Ollama:
+    python -m benchmarks.bench_projecao medir [--entrada benchmarks/buscas_gravadas.jsonl] [--llm]
+
+Execute a partir de gav-autonomo/.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+from app.adaptadores.clientes_http import obter_cliente_async
+from app.adaptadores.interface_llm import completar_para_json_async, uso_llm
+from app.cache import obter_prompt_e_exemplos
+from app.config.manifesto import registro_manifesto
+from app.servicos.executor_regras import _montar_contexto_apresentacao
+from app.servicos.projecao import estimar_tokens
+
+CONSULTAS = [
+    "coca cola", "cerveja skol", "sabao em po", "detergente", "arroz 5kg",
+    "feijao carioca", "oleo de soja", "cafe", "leite integral", "papel higienico",
+]
+ENDPOINT = "/produtos/busca"
+PROMPT_APRESENTADOR = "prompt_apresentador_busca"
+
+
+async def gravar(saida: Path, codfilial: int, limit: int):
+    cliente = obter_cliente_async("negocio")
+    with saida.open("w", encoding="utf-8") as f:
+        for consulta in CONSULTAS:
+            resp = await cliente.post(ENDPOINT, json={"query": consulta, "codfilial": codfilial, "limit": limit})
+            resp.raise_for_status()
+            f.write(json.dumps({"query": consulta, "resultado": resp.json()}, ensure_ascii=False) + "\n")
+    print(f"{len(CONSULTAS)} buscas gravadas em {saida}")
+
+
+def _contexto(query: str, resultado: dict, projetar: bool) -> str:
+    if projetar:
+        return _montar_contexto_apresentacao(query, resultado, ENDPOINT)
+    # Formato anterior: JSON completo, com espaços
+    return f"""query_original: "{query}"
+resultados_json: {json.dumps(resultado, ensure_ascii=False)}
+status_busca: "{resultado.get('status_busca', 'sucesso')}"
+total_encontrados: {len(resultado.get('resultados', []))}"""
+
+
+async def _apresentar(p: dict, exemplos: list[dict], contexto: str) -> tuple[float, int]:
+    inicio = time.perf_counter()
+    await completar_para_json_async(sistema=p["template"], entrada_usuario=contexto, exemplos=exemplos, prompt=p)
+    ultima = uso_llm.resumo()[p["nome"]]["ultima"]
+    return time.perf_counter() - inicio, ultima.get("prompt_eval_count") or 0
+
+
+async def medir(entrada: Path, llm: bool):
+    registro_manifesto.carregar()
+    buscas = [json.loads(linha) for linha in entrada.read_text(encoding="utf-8").splitlines() if linha.strip()]
+    if llm:
+        p, exemplos = await obter_prompt_e_exemplos(nome=PROMPT_APRESENTADOR, espaco="autonomo", versao=1)
+
+    linhas = {"completo": [], "projetado": []}
+    for busca in buscas:
+        for modo in linhas:
+            contexto = _contexto(busca["query"], busca["resultado"], projetar=modo == "projetado")
+            medida = {"tokens_estimados": estimar_tokens(contexto)}
+            if llm:
+                medida["latencia"], medida["prompt_eval_count"] = await _apresentar(p, exemplos, contexto)
+            linhas[modo].append(medida)
+
+    print(f"{len(buscas)} buscas gravadas de {entrada}")
+    print(f"{'modo':<10} {'tokens ctx':>11}" + (f" {'prompt_eval':>12} {'p50 (s)':>8} {'p95 (s)':>8}" if llm else ""))
+    for modo, medidas in linhas.items():
+        linha = f"{modo:<10} {statistics.mean(m['tokens_estimados'] for m in medidas):>11.0f}"
+        if llm:
+            latencias = sorted(m["latencia"] for m in medidas)
+            linha += (f" {statistics.mean(m['prompt_eval_count'] for m in medidas):>12.0f}"
+                      f" {statistics.median(latencias):>8.2f} {latencias[int(len(latencias) * 0.95)]:>8.2f}")
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_gravar = sub.add_parser("gravar")
+    p_gravar.add_argument("--saida", type=Path, default=Path("benchmarks/buscas_gravadas.jsonl"))
+    p_gravar.add_argument("--codfilial", type=int, default=2)
+    p_gravar.add_argument("--limit", type=int, default=10)
+    p_medir = sub.add_parser("medir")
+    p_medir.add_argument("--entrada", type=Path, default=Path("benchmarks/buscas_gravadas.jsonl"))
+    p_medir.add_argument("--llm", action="store_true", help="chama o Apresentador no Ollama")
+    args = parser.parse_args()
+
+    if args.comando == "gravar":
+        asyncio.run(gravar(args.saida, args.codfilial, args.limit))
+    else:
+        asyncio.run(medir(args.entrada, args.llm))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# gav-autonomo/benchmarks/bench_selecao_exemplos.py
+
+"""
+Benchmark da seleção de exemplos few-shot por relevância.
+
+Para cada exemplo ativo do prompt (deixado de fora, leave-one-out), monta o
+prompt com todos os demais exemplos e com a seleção top-k + núcleo fixo, e
+compara o tamanho em tokens (estimado por caracteres/4, ou o
+prompt_eval_count real do Ollama com --llm).
+
+Com --llm, também mede a acurácia da decisão: o LLM recebe a entrada do
+exemplo e a saída é comparada (tool_name, endpoint, method) com a esperada.
+
+Uso (a partir de gav-autonomo/, com a api-negocio no ar):
+    python -m benchmarks.bench_selecao_exemplos [--prompt prompt_api_call_selector] [--top-k 4] [--llm]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+
+from app.adaptadores.cliente_negocio import obter_prompt_por_nome_async, listar_exemplos_prompt_async
+from app.adaptadores.interface_llm import _montar_prompt, completar_para_json_async, uso_llm
+from app.servicos.seletor_exemplos import SeletorExemplos
+
+
+def _assinatura(decisao: dict) -> tuple:
+    params = decisao.get("parameters") or {}
+    return (decisao.get("tool_name"), params.get("endpoint"), str(params.get("method", "")).upper())
+
+
+async def _decidir(prompt: dict, entrada: str, exemplos: list[dict], selecionados: list[dict] | None) -> tuple:
+    try:
+        decisao = await completar_para_json_async(
+            sistema=prompt["template"], entrada_usuario=entrada, exemplos=exemplos,
+            prompt=None, selecionados=selecionados,
+        )
+    except Exception:
+        return None, 0
+    return _assinatura(decisao), (uso_llm.resumo().get("desconhecido", {}).get("ultima") or {}).get("prompt_eval_count") or 0
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompt", default="prompt_api_call_selector")
+    parser.add_argument("--espaco", default="autonomo")
+    parser.add_argument("--versao", default="1")
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--fixos", default="", help="ids do núcleo fixo, separados por vírgula")
+    parser.add_argument("--llm", action="store_true", help="chama o Ollama para medir acurácia e tokens reais")
+    args = parser.parse_args()
+
+    prompt = await obter_prompt_por_nome_async(nome=args.prompt, espaco=args.espaco, versao=args.versao)
+    exemplos = await listar_exemplos_prompt_async(prompt["id"])
+    fixos = [int(i) for i in args.fixos.split(",") if i.strip()]
+    cfg = {"top_k": args.top_k, "min_exemplos": 0, "fixos": {prompt["nome"]: fixos}}
+    print(f"Prompt {prompt['nome']}: {len(exemplos)} exemplos ativos, top_k={args.top_k}, fixos={fixos}")
+
+    tokens_todos, tokens_selecao = [], []
+    acertos_todos = acertos_selecao = 0
+    for i, alvo in enumerate(exemplos):
+        demais = exemplos[:i] + exemplos[i + 1:]
+        seletor = SeletorExemplos()
+        prompt_sem_alvo = {**prompt, "atualizado_em": f"sem-{alvo.get('id')}"}
+        nucleo, selecionados = seletor.selecionar(prompt_sem_alvo, demais, alvo["exemplo_input"], cfg)
+
+        if args.llm:
+            esperado = _assinatura(json.loads(alvo["exemplo_output_json"]))
+            obtido, n_todos = await _decidir(prompt, alvo["exemplo_input"], demais, None)
+            acertos_todos += obtido == esperado
+            tokens_todos.append(n_todos)
+            obtido, n_selecao = await _decidir(prompt, alvo["exemplo_input"], nucleo, selecionados)
+            acertos_selecao += obtido == esperado
+            tokens_selecao.append(n_selecao)
+        else:
+            tokens_todos.append(len(_montar_prompt(prompt["template"], alvo["exemplo_input"], demais)) / 4)
+            tokens_selecao.append(len(_montar_prompt(prompt["template"], alvo["exemplo_input"], nucleo, None, selecionados)) / 4)
+
+    if not exemplos:
+        print("Nenhum exemplo ativo.")
+        return
+    origem = "prompt_eval_count" if args.llm else "estimado (caracteres/4)"
+    print(f"\nTokens por chamada [{origem}]")
+    print(f"{'':<10} {'média':>8} {'p50':>8} {'máx':>8}")
+    for nome, valores in (("todos", tokens_todos), ("seleção", tokens_selecao)):
+        print(f"{nome:<10} {statistics.mean(valores):>8.0f} {statistics.median(valores):>8.0f} {max(valores):>8.0f}")
+    print(f"Redução média: {1 - statistics.mean(tokens_selecao) / max(statistics.mean(tokens_todos), 1):.1%}")
+
+    if args.llm:
+        n = len(exemplos)
+        print(f"\nAcurácia (tool_name, endpoint, method): todos={acertos_todos / n:.1%} seleção={acertos_selecao / n:.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
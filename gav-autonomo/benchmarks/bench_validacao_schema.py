@@ -0,0 +1,69 @@
+# gav-autonomo/benchmarks/bench_validacao_schema.py
+
+"""
+Micro-benchmark da validação das decisões do LLM.
+
+Compara o caminho antigo (resolver o arquivo, json.load e jsonschema.validate
+a cada decisão) com o registro de validadores compilados.
+
+Uso (a partir de gav-autonomo/):
+    python -m benchmarks.bench_validacao_schema [--n 5000]
+"""
+
+import argparse
+import json
+import time
+
+from jsonschema import validate
+
+from app.validadores.modelos import _resolver_caminho_schema, registro_schemas
+
+SCHEMA = "api_call_decision.json"
+DECISOES = {
+    "valida": {
+        "tool_name": "api_call_with_presentation",
+        "parameters": {"endpoint": "/produtos/busca", "method": "POST", "body": {"query": "coca", "limit": 10}},
+    },
+    "invalida": {
+        "tool_name": "buscar",
+        "parameters": {"endpoint": "/produtos/busca", "method": "PATCH"},
+    },
+}
+
+
+def _antigo(decisao: dict) -> bool:
+    caminho = _resolver_caminho_schema(SCHEMA)
+    with caminho.open(encoding="utf-8") as f:
+        schema = json.load(f)
+    try:
+        validate(instance=decisao, schema=schema)
+        return True
+    except Exception:
+        return False
+
+
+def _novo(decisao: dict) -> bool:
+    return not registro_schemas.validar(decisao, SCHEMA)
+
+
+def _medir(fn, decisao: dict, n: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(n):
+        fn(decisao)
+    return (time.perf_counter() - inicio) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'decisão':<10} {'antes (µs)':>12} {'depois (µs)':>12} {'ganho':>8}")
+    for nome, decisao in DECISOES.items():
+        antes = _medir(_antigo, decisao, args.n)
+        depois = _medir(_novo, decisao, args.n)
+        print(f"{nome:<10} {antes:>12.1f} {depois:>12.1f} {antes / depois:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# gav-autonomo/benchmarks/carga_chat.py
+
+"""
+Teste de carga do /chat com várias sessões simultâneas.
+
+Cada sessão envia uma sequência de mensagens, uma após a outra (como um
+usuário no WhatsApp), e todas as sessões rodam ao mesmo tempo. Ao final,
+mostra vazão, latências, o estado do agendador (/admin/llm) e quantas
+buscas à api-negocio foram coalescidas (/admin/cache).
+
+Para comparar com o fan-out sem controle, suba o gav-autonomo uma vez com
+OLLAMA_NUM_PARALLEL=0 (sem limite) e outra com o num_parallel do Ollama.
+
+Uso (com a stack no ar):
+    python -m benchmarks.carga_chat [--url http://localhost:8000] [--sessoes 50] [--mensagens 4]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+MENSAGENS = [
+    "quero coca cola",
+    "tem cerveja skol?",
+    "qual o mais barato",
+    "ver carrinho",
+    "detergente ype",
+    "oi",
+]
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+async def _sessao(cliente: httpx.AsyncClient, indice: int, n_mensagens: int, latencias: list, erros: list):
+    sessao_id = f"carga-{indice}"
+    for i in range(n_mensagens):
+        texto = MENSAGENS[(indice + i) % len(MENSAGENS)]
+        inicio = time.perf_counter()
+        try:
+            resp = await cliente.post("/chat", json={"texto": texto, "sessao_id": sessao_id})
+            resp.raise_for_status()
+            if "erro" in resp.json():
+                erros.append(resp.json()["erro"])
+        except Exception as e:
+            erros.append(str(e))
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--mensagens", type=int, default=4)
+    args = parser.parse_args()
+
+    latencias: list[float] = []
+    erros: list[str] = []
+    limites = httpx.Limits(max_connections=args.sessoes, max_keepalive_connections=args.sessoes)
+    async with httpx.AsyncClient(base_url=args.url, timeout=300, limits=limites) as cliente:
+        inicio = time.perf_counter()
+        await asyncio.gather(*(
+            _sessao(cliente, i, args.mensagens, latencias, erros) for i in range(args.sessoes)
+        ))
+        duracao = time.perf_counter() - inicio
+        status_llm = (await cliente.get("/admin/llm")).json()
+        status_cache = (await cliente.get("/admin/cache")).json()
+
+    total = len(latencias)
+    print(f"{args.sessoes} sessões x {args.mensagens} mensagens = {total} requisições em {duracao:.1f}s")
+    print(f"Vazão: {total / duracao:.2f} msg/s   erros: {len(erros)}")
+    print(f"Latência  p50={statistics.median(latencias):.2f}s  p95={_percentil(latencias, 0.95):.2f}s  "
+          f"p99={_percentil(latencias, 0.99):.2f}s  máx={max(latencias):.2f}s")
+    print("Agendador:", json.dumps(status_llm.get("agendador"), indent=2, ensure_ascii=False))
+    print("Coalescência:", json.dumps(status_cache.get("coalescencia"), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
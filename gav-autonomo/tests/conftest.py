@@ -0,0 +1,17 @@
+# gav-autonomo/tests/conftest.py
+
+"""
+Testes dos módulos puros do gav-autonomo (sem Ollama nem api-negocio).
+
+Uso, a partir de gav-autonomo/:
+    python -m pytest -q
+"""
+
+import os
+import sys
+
+# Settings exige as URLs; nenhum teste abre conexão com elas
+os.environ.setdefault("API_NEGOCIO_URL", "http://api-negocio.teste")
+os.environ.setdefault("OLLAMA_HOST", "http://ollama.teste")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,102 @@
+# gav-autonomo/tests/test_cache_contexto.py
+
+import json
+
+import pytest
+
+from app.servicos import cache_contexto as modulo
+from app.servicos.cache_contexto import CacheContexto
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(modulo.time, "monotonic", relogio)
+    return relogio
+
+
+def _contexto(n_produtos=1):
+    return {"contexto_estruturado": {"produtos": [{"item_id": 10000 + i, "descricao": "x" * 20} for i in range(n_produtos)]}}
+
+
+def _tamanho(contexto):
+    return len(json.dumps(contexto, ensure_ascii=False).encode("utf-8"))
+
+
+def test_obter_devolve_o_contexto_guardado(relogio):
+    cache = CacheContexto(max_bytes=10_000, ttl_ocioso_segundos=60)
+    cache.guardar("s1", _contexto())
+    assert cache.obter("s1") == _contexto()
+    assert cache.obter("s2") is None
+    assert (cache.acertos, cache.faltas) == (1, 1)
+
+
+def test_copias_na_entrada_e_na_saida(relogio):
+    cache = CacheContexto(max_bytes=10_000, ttl_ocioso_segundos=60)
+    original = _contexto()
+    cache.guardar("s1", original)
+    original["contexto_estruturado"]["produtos"].clear()
+
+    lido = cache.obter("s1")
+    assert len(lido["contexto_estruturado"]["produtos"]) == 1
+    lido["contexto_estruturado"]["enriquecido"] = True
+    assert "enriquecido" not in cache.obter("s1")["contexto_estruturado"]
+
+
+def test_lru_remove_a_sessao_menos_usada_quando_passa_do_teto(relogio):
+    tamanho = _tamanho(_contexto())
+    cache = CacheContexto(max_bytes=tamanho * 2, ttl_ocioso_segundos=60)
+    cache.guardar("s1", _contexto())
+    cache.guardar("s2", _contexto())
+    cache.obter("s1")  # s2 passa a ser a menos usada
+    cache.guardar("s3", _contexto())
+
+    assert cache.obter("s2") is None
+    assert cache.obter("s1") is not None and cache.obter("s3") is not None
+    assert cache.removidos_por_memoria == 1
+    assert cache.estatisticas()["bytes"] == tamanho * 2
+
+
+def test_contexto_maior_que_o_teto_remove_a_entrada_anterior(relogio):
+    cache = CacheContexto(max_bytes=_tamanho(_contexto()) + 10, ttl_ocioso_segundos=60)
+    cache.guardar("s1", _contexto())
+    cache.guardar("s1", _contexto(n_produtos=50))
+    assert cache.obter("s1") is None
+    assert cache.estatisticas()["bytes"] == 0
+
+
+def test_expira_por_inatividade(relogio):
+    cache = CacheContexto(max_bytes=10_000, ttl_ocioso_segundos=60)
+    cache.guardar("s1", _contexto())
+    relogio.agora += 30
+    assert cache.obter("s1") is not None  # leitura renova o acesso
+    relogio.agora += 45
+    assert cache.obter("s1") is not None
+    relogio.agora += 61
+    assert cache.obter("s1") is None
+    assert cache.expirados == 1
+
+
+def test_guardar_descarta_sessoes_ociosas(relogio):
+    cache = CacheContexto(max_bytes=10_000, ttl_ocioso_segundos=60)
+    cache.guardar("s1", _contexto())
+    relogio.agora += 61
+    cache.guardar("s2", _contexto())
+    assert cache.estatisticas()["itens"] == 1
+
+
+def test_invalidar(relogio):
+    cache = CacheContexto(max_bytes=10_000, ttl_ocioso_segundos=60)
+    cache.guardar("s1", _contexto())
+    cache.invalidar("s1")
+    cache.invalidar("inexistente")
+    assert cache.obter("s1") is None
+    assert cache.estatisticas()["bytes"] == 0
@@ -0,0 +1,109 @@
+# gav-autonomo/tests/test_motor_reparo.py
+
+import asyncio
+
+from app.servicos.motor_reparo import MotorReparo, Transformacao, aprender_transformacao, assinatura_erro, forma_body
+
+ERRO_422 = {"success": False, "status_code": 422, "error": {"detail": [
+    {"loc": ["body", "codfilial"], "msg": "Field required", "type": "missing"},
+]}}
+CFG = {"ativo": True, "profundidade_maxima": 2, "orcamento_segundos": 5}
+PARAMS = {"endpoint": "/produtos/busca", "method": "POST"}
+
+
+def test_aprender_renomear_converter_e_acrescentar():
+    original = {"q": "coca", "limite": "10"}
+    corrigido = {"query": "coca", "limite": 10, "codfilial": 2}
+    transformacao = aprender_transformacao(original, corrigido)
+    assert transformacao == Transformacao(
+        renomear=(("q", "query"),), converter=(("limite", "int"),), acrescentar=(("codfilial", "2"),),
+    )
+    assert transformacao.aplicar({"q": "sabao", "limite": "5"}) == {"query": "sabao", "limite": 5, "codfilial": 2}
+
+
+def test_aprender_remover_chave():
+    transformacao = aprender_transformacao({"query": "coca", "extra": 1}, {"query": "coca"})
+    assert transformacao.remover == ("extra",)
+    assert transformacao.aplicar({"query": "pao", "extra": 9}) == {"query": "pao"}
+
+
+def test_correcao_que_troca_valor_nao_e_generalizavel():
+    assert aprender_transformacao({"query": "cocaa"}, {"query": "coca"}) is None
+    assert aprender_transformacao({"limit": "dez"}, {"limit": 10}) is None
+    assert aprender_transformacao({"query": "coca"}, {"query": "coca"}) is None
+
+
+def test_aplicar_nao_altera_o_body_original():
+    body = {"q": "coca"}
+    Transformacao(renomear=(("q", "query"),)).aplicar(body)
+    assert body == {"q": "coca"}
+
+
+def test_assinatura_e_forma_ignoram_valores():
+    outro = {"detail": [{"loc": ["body", "codfilial"], "msg": "outro texto", "type": "missing"}]}
+    assert assinatura_erro(422, ERRO_422["error"]) == assinatura_erro(422, outro)
+    assert assinatura_erro(400, "Item 123 não existe") == assinatura_erro(400, "Item 456 não existe")
+    assert forma_body({"query": "a", "limit": 1}) == forma_body({"limit": 9, "query": "b"})
+
+
+def _motor(correcoes_llm):
+    motor = MotorReparo()
+    chamadas_llm = []
+
+    async def corrigir(params, body, erro, cfg):
+        chamadas_llm.append(body)
+        motor.correcoes_llm += 1
+        return correcoes_llm.pop(0)
+
+    motor._corrigir_via_llm = corrigir
+    return motor, chamadas_llm
+
+
+def _requisitar(enviados):
+    async def requisitar(body):
+        enviados.append(body)
+        if isinstance(body.get("codfilial"), int):
+            return {"success": True, "status_code": 200, "data": {"resultados": []}}
+        return ERRO_422
+    return requisitar
+
+
+def test_correcao_aprendida_e_reaplicada_sem_llm():
+    motor, chamadas_llm = _motor([{"query": "coca", "codfilial": 2}])
+    enviados = []
+    params = {**PARAMS, "body": {"query": "coca"}}
+    assert asyncio.run(motor.reparar(params, ERRO_422, _requisitar(enviados), CFG))["success"]
+
+    params = {**PARAMS, "body": {"query": "sabao"}}
+    assert asyncio.run(motor.reparar(params, ERRO_422, _requisitar(enviados), CFG))["success"]
+    assert len(chamadas_llm) == 1
+    assert enviados[-1] == {"query": "sabao", "codfilial": 2}
+    assert motor.correcoes_cache == 1
+
+
+def test_correcao_em_cache_que_falha_ao_aplicar_e_esquecida():
+    motor, chamadas_llm = _motor([{"query": "coca", "codfilial": 2}])
+    params = {**PARAMS, "body": {"query": "coca", "codfilial": "x"}}
+    erro = {**ERRO_422, "error": {"detail": [{"loc": ["body", "codfilial"], "type": "int_parsing"}]}}
+    chave = (
+        "/produtos/busca", "POST", assinatura_erro(422, erro["error"]), forma_body(params["body"]),
+    )
+    motor.cache.guardar(chave, Transformacao(converter=(("codfilial", "int"),)))
+
+    enviados = []
+    resposta = asyncio.run(motor.reparar(params, erro, _requisitar(enviados), CFG))
+
+    assert resposta["success"]
+    assert chamadas_llm == [{"query": "coca", "codfilial": "x"}]
+    assert enviados == [{"query": "coca", "codfilial": 2}]
+    assert motor.cache.estatisticas()["invalidadas"] == 1
+    assert motor.correcoes_cache == 0
+
+
+def test_profundidade_maxima():
+    motor, chamadas_llm = _motor([{"query": "coca", "codfilial": "2"}, {"query": "coca", "codfilial": "3"}])
+    params = {**PARAMS, "body": {"query": "coca"}}
+    resposta = asyncio.run(motor.reparar(params, ERRO_422, _requisitar([]), CFG))
+    assert not resposta.get("success")
+    assert len(chamadas_llm) == 2
+    assert motor.esgotados_profundidade == 1
@@ -0,0 +1,89 @@
+# gav-autonomo/tests/test_pre_roteador.py
+
+import asyncio
+
+import pytest
+
+from app.config.manifesto import registro_manifesto
+from app.servicos import executor_regras
+from app.servicos.pre_roteador import PreRoteador
+
+
+@pytest.fixture
+def cfg():
+    return registro_manifesto.obter().secao("pre_roteador", {})
+
+
+@pytest.fixture
+def roteador(monkeypatch):
+    roteador = PreRoteador()
+    monkeypatch.setattr(executor_regras, "pre_roteador", roteador)
+    return roteador
+
+
+def _rotear(roteador, texto, cfg, contexto=None):
+    return roteador.rotear(texto, {**cfg, "classificador": {"ativo": False}}, {}, [], contexto)
+
+
+def test_ver_carrinho(roteador, cfg):
+    decisao = _rotear(roteador, "Ver meu carrinho!", cfg)
+    assert decisao == {
+        "tool_name": "api_call_with_presentation",
+        "parameters": {"endpoint": "/carrinhos/{sessao_id}", "method": "GET"},
+    }
+
+
+def test_item_por_id_repassa_o_texto(roteador, cfg):
+    decisao = _rotear(roteador, "quero 2 unidades do 12345", cfg)
+    assert decisao["parameters"]["endpoint"] == "/chat/contexto"
+    assert decisao["parameters"]["body"] == {"mensagem_contexto": "quero 2 unidades do 12345"}
+
+
+def test_mensagem_sem_regra_segue_para_o_llm(roteador, cfg):
+    assert _rotear(roteador, "quero coca zero 2 litros", cfg) is None
+    assert roteador.faltas == 1
+
+
+def test_mais_barato_usa_a_query_do_contexto(roteador, cfg):
+    assert roteador.requer_contexto("Qual o mais barato?", cfg)
+    decisao = _rotear(roteador, "Qual o mais barato?", cfg, {"query": "sabao em po", "produtos": [{"item_id": 1}]})
+    assert decisao["parameters"]["endpoint"] == "/produtos/busca"
+    assert decisao["parameters"]["body"]["query"] == "sabao em po"
+    assert decisao["parameters"]["body"]["ordenar_por"] == "preco_asc"
+
+
+def test_mais_barato_sem_busca_anterior_segue_para_o_llm(roteador, cfg):
+    assert _rotear(roteador, "qual o mais barato?", cfg, {}) is None
+    assert _rotear(roteador, "qual o mais barato?", cfg) is None
+
+
+def test_decidir_ferramenta_mais_barato_refaz_a_busca_por_preco(roteador, monkeypatch):
+    async def prompt_e_exemplos(**_):
+        return {"nome": "prompt_mestre", "template": "selector"}, []
+
+    async def contexto_do_banco(sessao_id):
+        assert sessao_id == "sessao-1"
+        return {"contexto_estruturado": {"query": "detergente", "produtos": [{"item_id": 12345}]}}
+
+    async def llm(**_):
+        raise AssertionError("o pré-roteador deveria decidir sem LLM")
+
+    monkeypatch.setattr(executor_regras, "obter_prompt_e_exemplos", prompt_e_exemplos)
+    monkeypatch.setattr(executor_regras, "_buscar_contexto_do_banco", contexto_do_banco)
+    monkeypatch.setattr(executor_regras, "completar_para_json_async", llm)
+
+    manifesto = registro_manifesto.obter()
+    decisao = asyncio.run(executor_regras._decidir_ferramenta(
+        {"texto": "qual o mais barato?", "sessao_id": "sessao-1"},
+        manifesto.primeira_regra("decisao_llm"), manifesto,
+    ))
+
+    assert decisao == {
+        "tool_name": "api_call_with_presentation",
+        "parameters": {
+            "endpoint": "/produtos/busca",
+            "method": "POST",
+            "body": {"query": "detergente", "codfilial": 2, "limit": 10, "ordenar_por": "preco_asc"},
+        },
+    }
+    assert roteador.acertos_por_origem["regra:mais_barato"] == 1
@@ -0,0 +1,66 @@
+# gav-autonomo/tests/test_seletor_exemplos.py
+
+from app.servicos.seletor_exemplos import IndiceExemplos, SeletorExemplos, vetorizar
+
+ENTRADAS = [
+    "quero coca cola", "tem cerveja lata", "ver meu carrinho", "adicionar 2 do 12345",
+    "quero sabao em po", "tem arroz 5kg", "oi tudo bem", "detergente caixa com 24",
+    "quero feijao preto", "mostrar carrinho",
+]
+
+
+def _exemplos(entradas=ENTRADAS):
+    return [{"id": i, "exemplo_input": e, "exemplo_output_json": "{}"} for i, e in enumerate(entradas, 1)]
+
+
+def _prompt(**extra):
+    return {"id": 7, "nome": "prompt_mestre", "versao": 1, "atualizado_em": "2026-01-01", **extra}
+
+
+def test_vetorizar_ignora_caixa_e_acento():
+    assert (vetorizar("Sabão em Pó") == vetorizar("sabao em po")).all()
+
+
+def test_buscar_ordena_por_similaridade():
+    indice = IndiceExemplos()
+    indice.sincronizar(_exemplos())
+    encontrados = indice.buscar("quero uma coca", 2)
+    assert encontrados[0][0]["exemplo_input"] == "quero coca cola"
+    assert encontrados[0][1] >= encontrados[1][1]
+
+
+def test_sincronizar_vetoriza_so_exemplos_novos():
+    indice = IndiceExemplos()
+    assert indice.sincronizar(_exemplos())
+    assert indice.vetorizados == len(ENTRADAS)
+    assert not indice.sincronizar(_exemplos())
+    assert indice.sincronizar(_exemplos(ENTRADAS + ["tem leite integral"]))
+    assert indice.vetorizados == len(ENTRADAS) + 1
+    assert indice.buscar("leite integral", 1)[0][0]["exemplo_input"] == "tem leite integral"
+
+
+def test_selecionar_com_poucos_exemplos_envia_todos_no_prefixo():
+    exemplos = _exemplos(ENTRADAS[:3])
+    assert SeletorExemplos().selecionar(_prompt(), exemplos, "coca", {"min_exemplos": 8}) == (exemplos, [])
+
+
+def test_selecionar_mantem_fixos_e_top_k_sem_repetir():
+    exemplos = _exemplos()
+    cfg = {"min_exemplos": 4, "top_k": 2, "fixos": {"prompt_mestre": [3]}, "similaridade_minima": 0.0}
+    fixos, selecionados = SeletorExemplos().selecionar(_prompt(), exemplos, "ver o carrinho", cfg)
+    assert [ex["id"] for ex in fixos] == [3]
+    assert len(selecionados) == 2
+    assert 3 not in [ex["id"] for ex in selecionados]
+    assert selecionados[0]["exemplo_input"] == "mostrar carrinho"
+
+
+def test_selecionar_respeita_similaridade_minima():
+    cfg = {"min_exemplos": 4, "top_k": 4, "similaridade_minima": 0.99}
+    assert SeletorExemplos().selecionar(_prompt(), _exemplos(), "xyzw", cfg)[1] == []
+
+
+def test_indice_reconstruido_quando_o_prompt_muda():
+    seletor = SeletorExemplos()
+    seletor.indice(_prompt(), _exemplos(ENTRADAS[:5]))
+    indice = seletor.indice(_prompt(atualizado_em="2026-02-01"), _exemplos())
+    assert len(indice.exemplos) == len(ENTRADAS)
@@ -0,0 +1,75 @@
+# gav-autonomo/tests/test_templates_apresentacao.py
+
+import pytest
+
+from app.config.manifesto import descongelar, registro_manifesto
+from app.servicos.templates_apresentacao import MotorTemplates, _moeda
+
+
+@pytest.fixture
+def cfg():
+    return descongelar(registro_manifesto.obter().secao("apresentacao", {}))
+
+
+def _variaveis(**extra):
+    return {"resultado": {}, "mensagem_original": "", "endpoint": "", "acao": None, "total_encontrados": None, **extra}
+
+
+def test_moeda():
+    assert _moeda(1234.5) == "R$ 1.234,50"
+    assert _moeda("abc") == "abc"
+
+
+def test_carrinho_visualizado(cfg):
+    resultado = {"valor_total": 15.5, "itens": [
+        {"quantidade": 2, "descricao_produto": "Coca 2L", "subtotal": 15.5},
+    ]}
+    resposta = MotorTemplates().renderizar(
+        "prompt_apresentador_carrinho", _variaveis(resultado=resultado, acao="carrinho_visualizado"), cfg
+    )
+    assert resposta["tipo"] == "carrinho"
+    assert "2x Coca 2L — R$ 15,50" in resposta["mensagem"]
+    assert resposta["mensagem"].endswith("Total: R$ 15,50")
+    assert resposta["contexto_estruturado"] == {}
+
+
+def test_busca_vazia(cfg):
+    motor = MotorTemplates()
+    resposta = motor.renderizar(
+        "prompt_apresentador_busca", _variaveis(mensagem_original="xyz", total_encontrados=0), cfg
+    )
+    assert resposta["tipo"] == "busca_vazia"
+    assert '"xyz"' in resposta["mensagem"]
+    assert motor.estatisticas()["renderizacoes_por_template"] == {"busca_vazia": 1}
+
+
+def test_sem_template_que_case_usa_o_llm(cfg):
+    motor = MotorTemplates()
+    assert motor.renderizar("prompt_apresentador_busca", _variaveis(total_encontrados=3), cfg) is None
+    assert motor.sem_template == 1
+
+
+def test_usar_llm_dentro_do_orcamento():
+    cfg = {"templates": [
+        {"id": "t", "prompt": "p", "mensagem": "ok", "usar_llm_ate_ms": 500},
+    ]}
+    motor = MotorTemplates()
+    assert motor.renderizar("p", {}, cfg)["mensagem"] == "ok"
+    motor.registrar_latencia_llm("p", 0.2)
+    assert motor.renderizar("p", {}, cfg) is None
+    assert motor.llm_por_orcamento == 1
+
+
+def test_erro_de_renderizacao_cai_no_llm():
+    cfg = {"templates": [{"id": "t", "prompt": "p", "mensagem": "{{ resultado.itens[0].nome }}"}]}
+    motor = MotorTemplates()
+    assert motor.renderizar("p", {"resultado": {}}, cfg) is None
+    assert motor.erros == 1
+
+
+def test_manifesto_invalido_mantem_os_templates_anteriores():
+    motor = MotorTemplates()
+    validos = ({"id": "t", "prompt": "p", "mensagem": "ok"},)
+    assert motor.renderizar("p", {}, {"templates": validos})["mensagem"] == "ok"
+    invalidos = ({"id": "t", "prompt": "p", "mensagem": "{% for %}"},)
+    assert motor.renderizar("p", {}, {"templates": invalidos})["mensagem"] == "ok"
@@ -0,0 +1,28 @@
+-- /infra/banco_dados/migracoes/001_versoes_dados.sql
+-- Contador de versão por tabela, para invalidar caches em memória da api-negocio.
+-- Bancos criados antes desta migração: psql -f 001_versoes_dados.sql
+
+CREATE TABLE IF NOT EXISTS versoes_dados (
+    nome VARCHAR(100) PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMPTZ DEFAULT NOW()
+);
+COMMENT ON TABLE versoes_dados IS 'Versão incrementada por trigger a cada alteração na tabela monitorada.';
+
+CREATE OR REPLACE FUNCTION incrementar_versao_dados()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO versoes_dados (nome, versao, atualizado_em)
+    VALUES (TG_ARGV[0], 1, NOW())
+    ON CONFLICT (nome) DO UPDATE
+        SET versao = versoes_dados.versao + 1, atualizado_em = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+INSERT INTO versoes_dados (nome) VALUES ('unidade_aliases') ON CONFLICT (nome) DO NOTHING;
+
+DROP TRIGGER IF EXISTS trg_versao_unidade_aliases ON unidade_aliases;
+CREATE TRIGGER trg_versao_unidade_aliases
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON unidade_aliases
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('unidade_aliases');
@@ -0,0 +1,21 @@
+-- /infra/banco_dados/migracoes/002_versao_catalogo.sql
+-- Versão do catálogo (chave do cache de busca da api-negocio): qualquer carga
+-- do ETL em produtos, produto_itens ou produto_precos incrementa 'catalogo'.
+-- Requer 001_versoes_dados.sql.
+
+INSERT INTO versoes_dados (nome) VALUES ('catalogo') ON CONFLICT (nome) DO NOTHING;
+
+DROP TRIGGER IF EXISTS trg_versao_catalogo_produtos ON produtos;
+CREATE TRIGGER trg_versao_catalogo_produtos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON produtos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('catalogo');
+
+DROP TRIGGER IF EXISTS trg_versao_catalogo_itens ON produto_itens;
+CREATE TRIGGER trg_versao_catalogo_itens
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON produto_itens
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('catalogo');
+
+DROP TRIGGER IF EXISTS trg_versao_catalogo_precos ON produto_precos;
+CREATE TRIGGER trg_versao_catalogo_precos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON produto_precos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('catalogo');
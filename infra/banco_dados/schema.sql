@@ -234,3 +234,45 @@ BEGIN
     );
 END;
 $$ LANGUAGE plpgsql;
+
+-- === VERSÕES DE DADOS (invalidação de caches da api-negocio) ===
+-- Mesmo conteúdo de migracoes/001_versoes_dados.sql, para bancos novos.
+
+CREATE TABLE IF NOT EXISTS versoes_dados (
+    nome VARCHAR(100) PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMPTZ DEFAULT NOW()
+);
+COMMENT ON TABLE versoes_dados IS 'Versão incrementada por trigger a cada alteração na tabela monitorada.';
+
+CREATE OR REPLACE FUNCTION incrementar_versao_dados()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO versoes_dados (nome, versao, atualizado_em)
+    VALUES (TG_ARGV[0], 1, NOW())
+    ON CONFLICT (nome) DO UPDATE
+        SET versao = versoes_dados.versao + 1, atualizado_em = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+INSERT INTO versoes_dados (nome) VALUES ('unidade_aliases') ON CONFLICT (nome) DO NOTHING;
+
+CREATE TRIGGER trg_versao_unidade_aliases
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON unidade_aliases
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('unidade_aliases');
+
+-- Versão do catálogo (cache de busca): mesmo conteúdo de migracoes/002_versao_catalogo.sql
+INSERT INTO versoes_dados (nome) VALUES ('catalogo') ON CONFLICT (nome) DO NOTHING;
+
+CREATE TRIGGER trg_versao_catalogo_produtos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON produtos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('catalogo');
+
+CREATE TRIGGER trg_versao_catalogo_itens
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON produto_itens
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('catalogo');
+
+CREATE TRIGGER trg_versao_catalogo_precos
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON produto_precos
+    FOR EACH STATEMENT EXECUTE FUNCTION incrementar_versao_dados('catalogo');